@@ -235,6 +235,18 @@ else:
         '/admin/*': 'master',
     }
 
+# Cache
+# https://docs.djangoproject.com/en/2.2/ref/settings/#caches
+# Production must use a backend shared by all the processes (e.g. memcached), the invalidations of the
+# reference data only reach the processes sharing the cache, the others pick them up after REFERENCE_DATA_MAX_AGE
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/1.11/ref/settings/#auth-password-validators
 
@@ -265,7 +277,7 @@ REST_FRAMEWORK = {
         'rest_framework.renderers.JSONRenderer',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'openbook_auth.authentication.RelationshipsSnapshotTokenAuthentication',
     )
 }
 
@@ -359,8 +371,38 @@ CATEGORY_DESCRIPTION_MAX_LENGTH = 64
 DEVICE_NAME_MAX_LENGTH = 32
 DEVICE_UUID_MAX_LENGTH = 64
 SEARCH_QUERIES_MAX_LENGTH = 120
+# Most results a search ranks, listings page through the best ones
+SEARCH_MAX_RESULTS = int(os.environ.get('SEARCH_MAX_RESULTS', '100'))
+# Seconds after which the in-memory reference data is reloaded even if its version in the cache did not change
+REFERENCE_DATA_MAX_AGE = int(os.environ.get('REFERENCE_DATA_MAX_AGE', '60'))
+# Seconds after which the in-memory typeahead indexes are reloaded with the changes made by other processes
+TYPEAHEAD_INDEX_MAX_AGE = int(os.environ.get('TYPEAHEAD_INDEX_MAX_AGE', '300'))
 FEATURE_VIDEO_POSTS_ENABLED = os.environ.get('FEATURE_VIDEO_POSTS_ENABLED', 'True') == 'True'
 FEATURE_IMPORTER_ENABLED = os.environ.get('FEATURE_IMPORTER_ENABLED', 'True') == 'True'
+# Whether the home timeline is served from the fan-out on write TimelineEntry table.
+# Run the backfill_timeline_entries command before enabling it.
+FEATURE_MATERIALIZED_TIMELINE_ENABLED = os.environ.get('FEATURE_MATERIALIZED_TIMELINE_ENABLED', 'False') == 'True'
+
+# TRENDING POSTS
+# Refreshed by the refresh_trending_posts command, see TrendingPost
+TRENDING_POSTS_COUNT = int(os.environ.get('TRENDING_POSTS_COUNT', '30'))
+# Age of the oldest posts that can trend
+TRENDING_POSTS_WINDOW_HOURS = int(os.environ.get('TRENDING_POSTS_WINDOW_HOURS', '12'))
+# How many reactions a comment is worth
+TRENDING_POSTS_COMMENT_WEIGHT = float(os.environ.get('TRENDING_POSTS_COMMENT_WEIGHT', '2'))
+# How fast the score of posts decays with their age
+TRENDING_POSTS_GRAVITY = float(os.environ.get('TRENDING_POSTS_GRAVITY', '1.5'))
+
+# TRENDING COMMUNITIES
+# Refreshed by the refresh_trending_communities command, see TrendingCommunity
+TRENDING_COMMUNITIES_COUNT = int(os.environ.get('TRENDING_COMMUNITIES_COUNT', '30'))
+# The members that joined within this window count TRENDING_COMMUNITIES_GROWTH_WEIGHT times
+TRENDING_COMMUNITIES_GROWTH_WINDOW_HOURS = int(os.environ.get('TRENDING_COMMUNITIES_GROWTH_WINDOW_HOURS', '168'))
+TRENDING_COMMUNITIES_GROWTH_WEIGHT = float(os.environ.get('TRENDING_COMMUNITIES_GROWTH_WEIGHT', '5'))
+
+# COMMUNITY BULK MODERATION
+# How many users can be banned, unbanned or removed from a community at once
+COMMUNITY_BULK_MODERATION_MAX_USERNAMES = int(os.environ.get('COMMUNITY_BULK_MODERATION_MAX_USERNAMES', '100'))
 
 # Email Config
 
@@ -405,3 +447,49 @@ if IS_PRODUCTION:
 # ONE SIGNAL
 ONE_SIGNAL_APP_ID = os.environ.get('ONE_SIGNAL_APP_ID')
 ONE_SIGNAL_API_KEY = os.environ.get('ONE_SIGNAL_API_KEY')
+
+# PUSH NOTIFICATIONS
+# Push notifications are queued in the outbox and delivered by the send_push_notifications command
+PUSH_NOTIFICATIONS_SENDER = os.environ.get('PUSH_NOTIFICATIONS_SENDER',
+                                           'openbook_notifications.push_notifications.backends.'
+                                           'OneSignalPushNotificationsSender')
+if TESTING:
+    PUSH_NOTIFICATIONS_SENDER = 'openbook_notifications.push_notifications.backends.FakePushNotificationsSender'
+PUSH_NOTIFICATIONS_MAX_ATTEMPTS = int(os.environ.get('PUSH_NOTIFICATIONS_MAX_ATTEMPTS', '5'))
+# Seconds before the first retry, doubled on every further attempt
+PUSH_NOTIFICATIONS_RETRY_DELAY = int(os.environ.get('PUSH_NOTIFICATIONS_RETRY_DELAY', '30'))
+# Seconds a worker has to send the push notifications it claimed before other workers pick them up
+PUSH_NOTIFICATIONS_CLAIM_TIMEOUT = int(os.environ.get('PUSH_NOTIFICATIONS_CLAIM_TIMEOUT', '300'))
+
+# NOTIFICATIONS RETENTION
+# Days read notifications are kept before the prune_notifications command deletes them, by notification type
+NOTIFICATIONS_RETENTION_DAYS = {
+    'PR': int(os.environ.get('POST_REACTION_NOTIFICATIONS_RETENTION_DAYS', '30')),
+    'PC': int(os.environ.get('POST_COMMENT_NOTIFICATIONS_RETENTION_DAYS', '60')),
+    'CR': int(os.environ.get('CONNECTION_REQUEST_NOTIFICATIONS_RETENTION_DAYS', '90')),
+    'CC': int(os.environ.get('CONNECTION_CONFIRMED_NOTIFICATIONS_RETENTION_DAYS', '60')),
+    'F': int(os.environ.get('FOLLOW_NOTIFICATIONS_RETENTION_DAYS', '60')),
+    'CI': int(os.environ.get('COMMUNITY_INVITE_NOTIFICATIONS_RETENTION_DAYS', '90')),
+}
+# Days after which the post reaction and comment notifications of a user for the same post are collapsed
+# into the latest one
+NOTIFICATIONS_COMPACTION_DAYS = int(os.environ.get('NOTIFICATIONS_COMPACTION_DAYS', '7'))
+
+# POST REACTION NOTIFICATIONS
+# Seconds during which the reactions to a post are added to the same notification
+POST_REACTION_NOTIFICATIONS_AGGREGATION_WINDOW = int(
+    os.environ.get('POST_REACTION_NOTIFICATIONS_AGGREGATION_WINDOW', '86400'))
+# Amount of latest reactors kept in a post reaction notification
+POST_REACTION_NOTIFICATIONS_LAST_REACTORS_COUNT = int(
+    os.environ.get('POST_REACTION_NOTIFICATIONS_LAST_REACTORS_COUNT', '3'))
+
+# NOTIFICATIONS LONG POLLING
+# Tells the requests waiting on the new notifications endpoint when notifications are created.
+# The in process pubsub only wakes the requests of the process creating the notification, the others find it
+# on their next check of the database. Set it to the CacheNotificationsPubSub along with a shared CACHE_BACKEND.
+NOTIFICATIONS_PUBSUB = os.environ.get('NOTIFICATIONS_PUBSUB',
+                                      'openbook_notifications.pubsub.InProcessNotificationsPubSub')
+# Seconds the requests waiting for new notifications wait between checks of the database and of the cache
+NOTIFICATIONS_PUBSUB_POLL_INTERVAL = float(os.environ.get('NOTIFICATIONS_PUBSUB_POLL_INTERVAL', '1'))
+# Most seconds a request to the new notifications endpoint waits for them
+NOTIFICATIONS_LONG_POLL_MAX_TIMEOUT = int(os.environ.get('NOTIFICATIONS_LONG_POLL_MAX_TIMEOUT', '30'))
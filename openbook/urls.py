@@ -21,7 +21,7 @@ from django.conf.urls.static import static
 
 from openbook_categories.views import Categories
 from openbook_circles.views import Circles, CircleItem, CircleNameCheck
-from openbook_common.views import Time, Health, EmojiGroups
+from openbook_common.views import Time, Health, EmojiGroups, Typeahead
 from openbook_auth.views import Register, UsernameCheck, EmailCheck, EmailVerify, Login, AuthenticatedUser, Users, \
     UserSettings, LinkedUsers, SearchLinkedUsers, UserItem, AuthenticatedUserNotificationsSettings, \
     AuthenticatedUserDelete, PasswordResetRequest, PasswordResetVerify
@@ -31,9 +31,10 @@ from openbook_communities.views.communities.views import Communities, TrendingCo
 from openbook_communities.views.community.administrators.views import CommunityAdministratorItem, \
     CommunityAdministrators, SearchCommunityAdministrators
 from openbook_communities.views.community.banned_users.views import BanUser, UnbanUser, CommunityBannedUsers, \
-    SearchCommunityBannedUsers
+    SearchCommunityBannedUsers, BulkBanUsers, BulkUnbanUsers
 from openbook_communities.views.community.members.views import CommunityMembers, JoinCommunity, \
-    LeaveCommunity, InviteCommunityMember, SearchCommunityMembers, UninviteCommunityMember
+    LeaveCommunity, InviteCommunityMember, SearchCommunityMembers, UninviteCommunityMember, \
+    BulkRemoveCommunityMembers
 from openbook_communities.views.community.moderators.views import CommunityModeratorItem, CommunityModerators, \
     SearchCommunityModerators
 from openbook_communities.views.community.posts.views import CommunityPosts
@@ -43,7 +44,8 @@ from openbook_connections.views import ConnectWithUser, Connections, DisconnectF
 from openbook_devices.views import Devices, DeviceItem
 from openbook_follows.views import Follows, FollowUser, UnfollowUser, UpdateFollowUser
 from openbook_lists.views import Lists, ListItem, ListNameCheck
-from openbook_notifications.views import Notifications, NotificationItem, ReadNotifications, ReadNotification
+from openbook_notifications.views import Notifications, NotificationItem, ReadNotifications, ReadNotification, \
+    NewNotifications
 from openbook_posts.views.post.views import PostComments, PostCommentItem, PostItem, PostReactions, PostReactionItem, \
     PostReactionsEmojiCount, PostReactionEmojiGroups, MutePost, UnmutePost
 from openbook_posts.views.posts.views import Posts, TrendingPosts
@@ -117,6 +119,7 @@ community_members_patterns = [
     path('leave/', LeaveCommunity.as_view(), name='community-leave'),
     path('invite/', InviteCommunityMember.as_view(), name='community-invite'),
     path('uninvite/', UninviteCommunityMember.as_view(), name='community-uninvite'),
+    path('bulk-remove/', BulkRemoveCommunityMembers.as_view(), name='community-bulk-remove-members'),
 ]
 
 community_posts_patterns = [
@@ -128,6 +131,8 @@ community_banned_users_patterns = [
     path('search/', SearchCommunityBannedUsers.as_view(), name='search-community-banned-users'),
     path('ban/', BanUser.as_view(), name='community-ban-user'),
     path('unban/', UnbanUser.as_view(), name='community-unban-user'),
+    path('bulk-ban/', BulkBanUsers.as_view(), name='community-bulk-ban-users'),
+    path('bulk-unban/', BulkUnbanUsers.as_view(), name='community-bulk-unban-users'),
 ]
 
 community_patterns = [
@@ -198,6 +203,7 @@ notification_patterns = [
 notifications_patterns = [
     path('', Notifications.as_view(), name='notifications'),
     path('read/', ReadNotifications.as_view(), name='read-notifications'),
+    path('new/', NewNotifications.as_view(), name='new-notifications'),
     path('<int:notification_id>/', include(notification_patterns)),
 ]
 
@@ -219,6 +225,7 @@ api_patterns = [
     path('devices/', include(devices_patterns)),
     url('time/', Time.as_view(), name='time'),
     url('emojis/groups/', EmojiGroups.as_view(), name='emoji-groups'),
+    path('typeahead/', Typeahead.as_view(), name='typeahead'),
 ]
 
 if settings.FEATURE_IMPORTER_ENABLED:
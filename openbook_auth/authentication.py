@@ -0,0 +1,13 @@
+from rest_framework.authentication import TokenAuthentication
+
+
+class RelationshipsSnapshotTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that answers the relationship predicates of the authenticated user
+    from a snapshot for the rest of the request
+    """
+
+    def authenticate_credentials(self, key):
+        user, token = super(RelationshipsSnapshotTokenAuthentication, self).authenticate_credentials(key)
+        user.enable_relationships_snapshot()
+        return user, token
@@ -0,0 +1,84 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+import logging
+
+from django.db import transaction
+from faker import Faker
+
+from openbook_common.utils.model_loaders import get_user_model, get_user_search_entry_model
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Times exact, prefix and substring users searches against the search index. With --populate it first ' \
+           'fills the index with fake users, for scratch databases only.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--populate', type=int, default=0,
+                            help='Amount of fake users to create and index before the benchmark')
+        parser.add_argument('--runs', type=int, default=200, help='Amount of searches of each kind to time')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        UserSearchEntry = get_user_search_entry_model()
+
+        if options['populate']:
+            self._populate(options['populate'])
+
+        usernames = list(UserSearchEntry.objects.order_by('?').values_list('username', flat=True)[:options['runs']])
+
+        if not usernames:
+            self.stdout.write(self.style.ERROR('There are no users to search, use --populate'))
+            return
+
+        queries = {
+            'exact': usernames,
+            'prefix': [username[:3] for username in usernames],
+            'substring': [username[1:5] for username in usernames],
+        }
+
+        self.stdout.write('Searching %d users' % UserSearchEntry.objects.count())
+
+        for kind, kind_queries in queries.items():
+            timings = []
+
+            for query in kind_queries:
+                started = time.perf_counter()
+                list(User.get_public_users_with_query(query)[:20])
+                timings.append((time.perf_counter() - started) * 1000)
+
+            timings.sort()
+            self.stdout.write('%s: p50 %.1fms p95 %.1fms p99 %.1fms' % (
+                kind, _percentile(timings, 50), _percentile(timings, 95), _percentile(timings, 99)))
+
+    def _populate(self, amount):
+        User = get_user_model()
+        UserSearchEntry = get_user_search_entry_model()
+
+        fake = Faker()
+        chunk_size = 1000
+        created_count = 0
+
+        while created_count < amount:
+            chunk_amount = min(chunk_size, amount - created_count)
+            users = [User(username='%s%d' % (fake.user_name()[:20], random.randint(0, 999999)),
+                          email='benchmark%d@%s' % (created_count + i, fake.domain_name())) for i in
+                     range(0, chunk_amount)]
+
+            with transaction.atomic():
+                # The users are bulk created, so they get no profile, counts or circles
+                User.objects.bulk_create(users)
+                users_ids = list(User.objects.filter(email__in=[user.email for user in users]).values_list(
+                    'id', flat=True))
+                UserSearchEntry.rebuild_entries_for_users_with_ids(users_ids)
+
+            created_count += chunk_amount
+            logger.info('Populated %d fake users' % created_count)
+
+
+def _percentile(sorted_values, percentile):
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * percentile / 100))
+    return sorted_values[index]
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+import logging
+
+from django.db import transaction
+
+from openbook_common.utils.model_loaders import get_user_model, get_user_counts_model
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the stored followers, following, connections, posts and unread notifications counts of users ' \
+           'and fixes the ones that drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Amount of users to reconcile at once')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        UserCounts = get_user_counts_model()
+
+        chunk_size = options['chunk_size']
+        users_ids = User.objects.order_by('pk').values_list('pk', flat=True)
+
+        reconciled_users_count = 0
+        last_user_id = 0
+
+        while True:
+            chunk_users_ids = list(users_ids.filter(pk__gt=last_user_id)[:chunk_size])
+            if not chunk_users_ids:
+                break
+
+            with transaction.atomic():
+                reconciled_users_count += UserCounts.reconcile_counts_for_users_with_ids(chunk_users_ids)
+
+            last_user_id = chunk_users_ids[-1]
+            logger.info('Reconciled counts of users up to id %d' % last_user_id)
+
+        self.stdout.write(self.style.SUCCESS('Reconciled the counts of %d users' % reconciled_users_count))
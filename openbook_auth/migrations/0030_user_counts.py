@@ -0,0 +1,31 @@
+# Generated by Django 2.2.28 on 2026-10-16 20:56
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('openbook_auth', '0029_auto_20190311_1752'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserCounts',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('followers_count', models.PositiveIntegerField(default=0, verbose_name='followers count')),
+                ('following_count', models.PositiveIntegerField(default=0, verbose_name='following count')),
+                ('connections_count', models.PositiveIntegerField(default=0, verbose_name='connections count')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='posts count')),
+                ('public_posts_count', models.PositiveIntegerField(default=0, verbose_name='public posts count')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='counts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'user counts',
+                'verbose_name_plural': 'users counts',
+            },
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 2.2.28 on 2026-10-16 22:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+from openbook_common.utils.search import normalize_search_text, make_search_trigrams
+
+
+def populate_user_search_entries(apps, schema_editor):
+    User = apps.get_model('openbook_auth', 'User')
+    UserSearchEntry = apps.get_model('openbook_auth', 'UserSearchEntry')
+    UserSearchTrigram = apps.get_model('openbook_auth', 'UserSearchTrigram')
+
+    users = User.objects.order_by('pk').values_list('id', 'username', 'profile__name')
+    last_user_id = 0
+
+    while True:
+        chunk_users = list(users.filter(pk__gt=last_user_id)[:1000])
+        if not chunk_users:
+            break
+
+        UserSearchEntry.objects.bulk_create(
+            [UserSearchEntry(user_id=user_id, username=normalize_search_text(username),
+                             name=normalize_search_text(name)) for user_id, username, name in chunk_users])
+
+        last_user_id = chunk_users[-1][0]
+        entries = UserSearchEntry.objects.filter(user_id__gt=chunk_users[0][0] - 1, user_id__lte=last_user_id)
+
+        UserSearchTrigram.objects.bulk_create(
+            [UserSearchTrigram(entry_id=entry.pk, trigram=trigram) for entry in entries for trigram in
+             make_search_trigrams(entry.username) | make_search_trigrams(entry.name)])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('openbook_auth', '0031_usercounts_unread_notifications_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSearchEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('username', models.CharField(db_index=True, max_length=30)),
+                ('name', models.CharField(db_index=True, max_length=192)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='search_entry', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserSearchTrigram',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigrams', to='openbook_auth.UserSearchEntry')),
+            ],
+            options={
+                'unique_together': {('trigram', 'entry')},
+            },
+        ),
+        migrations.RunPython(populate_user_search_entries, migrations.RunPython.noop),
+    ]
@@ -6,7 +6,8 @@ import uuid
 from django.contrib.auth.validators import UnicodeUsernameValidator, ASCIIUsernameValidator
 from django.db import models
 from django.contrib.auth.models import AbstractUser
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.db import transaction
 from django.dispatch import receiver
 from django.utils import six
 from django.template.loader import render_to_string
@@ -16,19 +17,24 @@ from imagekit.models import ProcessedImageField
 from pilkit.processors import ResizeToFill, ResizeToFit
 from rest_framework.authtoken.models import Token
 from rest_framework.exceptions import ValidationError, NotFound, PermissionDenied, AuthenticationFailed
-from django.db.models import Q
+from django.db.models import Q, F, Count
 from django.core.mail import EmailMultiAlternatives
 
 from openbook.settings import USERNAME_MAX_LENGTH
 from openbook_auth.helpers import upload_to_user_cover_directory, upload_to_user_avatar_directory
+from openbook_auth.relationships import UserRelationshipsSnapshot
 from openbook_common.models import Badge
-from openbook_common.utils.helpers import delete_file_field
+from openbook_common.utils.helpers import delete_file_field, make_cursor_query
+from openbook_common.utils.typeahead import get_users_typeahead_index, make_user_typeahead_item
+from openbook_common.utils.search import normalize_search_text, make_search_trigrams, search_entries_keys, \
+    make_search_ranking
 from openbook_common.utils.model_loaders import get_connection_model, get_circle_model, get_follow_model, \
     get_post_model, get_list_model, get_post_comment_model, get_post_reaction_model, \
     get_emoji_group_model, get_user_invite_model, get_community_model, get_community_invite_model, get_tag_model, \
     get_post_comment_notification_model, get_follow_notification_model, get_connection_confirmed_notification_model, \
     get_connection_request_notification_model, get_post_reaction_notification_model, get_device_model, \
-    get_post_mute_model, get_community_invite_notification_model
+    get_post_mute_model, get_community_invite_notification_model, get_timeline_entry_model, get_notification_model, \
+    get_community_membership_model
 from openbook_common.validators import name_characters_validator
 from openbook_notifications.push_notifications import senders
 
@@ -99,7 +105,7 @@ class User(AbstractUser):
             return False
 
     @classmethod
-    def get_public_posts_for_user_with_username(cls, username, max_id=None):
+    def get_public_posts_for_user_with_username(cls, username, max_id=None, max_cursor=None):
         Circle = get_circle_model()
         world_circle_id = Circle.get_world_circle_id()
 
@@ -108,6 +114,9 @@ class User(AbstractUser):
         if max_id:
             final_query.add(Q(id__lt=max_id), Q.AND)
 
+        if max_cursor:
+            final_query.add(make_cursor_query(max_cursor), Q.AND)
+
         Post = get_post_model()
         result = Post.objects.filter(final_query)
 
@@ -137,9 +146,8 @@ class User(AbstractUser):
 
     @classmethod
     def get_public_users_with_query(cls, query):
-        users_query = Q(username__icontains=query)
-        users_query.add(Q(profile__name__icontains=query), Q.OR)
-        return cls.objects.filter(users_query)
+        users_ids = UserSearchEntry.search_users_ids(query)
+        return cls.objects.filter(pk__in=users_ids).order_by(make_search_ranking(users_ids))
 
     @classmethod
     def get_user_for_password_reset_token(cls, password_verification_token):
@@ -216,6 +224,39 @@ class User(AbstractUser):
     def count_connections(self):
         return self.connections.count()
 
+    def get_followers_count(self):
+        return self._get_counts().followers_count
+
+    def get_following_count(self):
+        return self._get_counts().following_count
+
+    def get_connections_count(self):
+        return self._get_counts().connections_count
+
+    def get_posts_count(self):
+        return self._get_counts().posts_count
+
+    def get_public_posts_count(self):
+        return self._get_counts().public_posts_count
+
+    def get_unread_notifications_count(self):
+        return self._get_counts().unread_notifications_count
+
+    def get_posts_count_for_user_with_id(self, id):
+        """
+        Same as count_posts_for_user_with_id but reads the stored counts unless the posts
+        visible to the other user depend on their connection circles
+        :param id:
+        :return: count
+        """
+        if id == self.pk:
+            return self.get_posts_count()
+
+        if self.is_connected_with_user_with_id(id):
+            return self.count_posts_for_user_with_id(id)
+
+        return self.get_public_posts_count()
+
     def delete_with_password(self, password):
         self._check_password_matches(password=password)
         self.delete()
@@ -339,10 +380,22 @@ class User(AbstractUser):
         )
         return notifications_settings
 
+    def enable_relationships_snapshot(self):
+        """
+        Answers the relationship predicates of this user instance from memory from now on,
+        meant for the authenticated user of a request
+        """
+        self._relationships_snapshot = UserRelationshipsSnapshot(user=self)
+
     def is_fully_connected_with_user_with_id(self, user_id):
         if not self.is_connected_with_user_with_id(user_id):
             return False
 
+        relationships_snapshot = self._get_relationships_snapshot()
+        if relationships_snapshot:
+            return bool(relationships_snapshot.get_connections_circles_ids()[int(user_id)]) and int(
+                user_id) in relationships_snapshot.get_confirmed_connections_users_ids()
+
         connection = self.connections.filter(
             target_connection__user_id=user_id).get()
 
@@ -358,6 +411,10 @@ class User(AbstractUser):
         if not self.is_connected_with_user_with_id(user_id):
             return False
 
+        relationships_snapshot = self._get_relationships_snapshot()
+        if relationships_snapshot:
+            return not relationships_snapshot.get_connections_circles_ids()[int(user_id)]
+
         connection = self.connections.filter(
             target_connection__user_id=user_id).get()
 
@@ -367,6 +424,10 @@ class User(AbstractUser):
         return self.is_connected_with_user_with_id(user.pk)
 
     def is_connected_with_user_with_id(self, user_id):
+        relationships_snapshot = self._get_relationships_snapshot()
+        if relationships_snapshot:
+            return int(user_id) in relationships_snapshot.get_connections_circles_ids()
+
         return self.connections.select_related('target_connection__user_id').filter(
             target_connection__user_id=user_id).exists()
 
@@ -379,6 +440,10 @@ class User(AbstractUser):
         return self.is_connected_with_user_with_id_in_circle_with_id(user.pk, circle.pk)
 
     def is_connected_with_user_with_id_in_circle_with_id(self, user_id, circle_id):
+        relationships_snapshot = self._get_relationships_snapshot()
+        if relationships_snapshot:
+            return int(circle_id) in relationships_snapshot.get_connections_circles_ids().get(int(user_id), ())
+
         return self.connections.select_related('target_connection__user_id').filter(
             target_connection__user_id=user_id,
             circles__id=circle_id).exists()
@@ -388,6 +453,11 @@ class User(AbstractUser):
         return self.is_connected_with_user_with_id_in_circles_with_ids(user.pk, circles_ids)
 
     def is_connected_with_user_with_id_in_circles_with_ids(self, user_id, circles_ids):
+        relationships_snapshot = self._get_relationships_snapshot()
+        if relationships_snapshot:
+            connection_circles_ids = relationships_snapshot.get_connections_circles_ids().get(int(user_id), ())
+            return any(int(circle_id) in connection_circles_ids for circle_id in circles_ids)
+
         count = self.connections.filter(
             target_connection__user_id=user_id,
             circles__id__in=circles_ids).count()
@@ -397,6 +467,10 @@ class User(AbstractUser):
         return self.is_following_user_with_id(user.pk)
 
     def is_following_user_with_id(self, user_id):
+        relationships_snapshot = self._get_relationships_snapshot()
+        if relationships_snapshot:
+            return int(user_id) in relationships_snapshot.get_followed_users_ids()
+
         return self.follows.filter(followed_user__id=user_id).exists()
 
     def is_following_user_with_username(self, user_username):
@@ -427,6 +501,10 @@ class User(AbstractUser):
         return self.posts.filter(id=post_id).exists()
 
     def has_muted_post_with_id(self, post_id):
+        relationships_snapshot = self._get_relationships_snapshot()
+        if relationships_snapshot:
+            return int(post_id) in relationships_snapshot.get_muted_posts_ids()
+
         return self.post_mutes.filter(post_id=post_id).exists()
 
     def has_circles_with_ids(self, circles_ids):
@@ -440,21 +518,49 @@ class User(AbstractUser):
                                                        community__name=community_name).exists()
 
     def is_administrator_of_community_with_name(self, community_name):
+        relationships_snapshot = self._get_relationships_snapshot()
+        if relationships_snapshot:
+            is_administrator, is_moderator = relationships_snapshot.get_communities_memberships().get(community_name,
+                                                                                                     (False, False))
+            return is_administrator
+
         return self.communities_memberships.filter(community__name=community_name, is_administrator=True).exists()
 
     def is_member_of_communities(self):
+        relationships_snapshot = self._get_relationships_snapshot()
+        if relationships_snapshot:
+            return bool(relationships_snapshot.get_communities_memberships())
+
         return self.communities_memberships.all().exists()
 
     def is_member_of_community_with_name(self, community_name):
+        relationships_snapshot = self._get_relationships_snapshot()
+        if relationships_snapshot:
+            return community_name in relationships_snapshot.get_communities_memberships()
+
         return self.communities_memberships.filter(community__name=community_name).exists()
 
     def is_banned_from_community_with_name(self, community_name):
+        relationships_snapshot = self._get_relationships_snapshot()
+        if relationships_snapshot:
+            return community_name in relationships_snapshot.get_banned_of_communities_names()
+
         return self.banned_of_communities.filter(name=community_name).exists()
 
     def is_creator_of_community_with_name(self, community_name):
+        relationships_snapshot = self._get_relationships_snapshot()
+        if relationships_snapshot:
+            return community_name in relationships_snapshot.get_created_communities_names()
+
         return self.created_communities.filter(name=community_name).exists()
 
     def is_moderator_of_community_with_name(self, community_name):
+        relationships_snapshot = self._get_relationships_snapshot()
+        if relationships_snapshot:
+            is_administrator, is_moderator = relationships_snapshot.get_communities_memberships().get(community_name,
+                                                                                                     (False, False))
+            return is_moderator
+
         return self.communities_memberships.filter(community__name=community_name, is_moderator=True).exists()
 
     def is_invited_to_community_with_name(self, community_name):
@@ -462,7 +568,28 @@ class User(AbstractUser):
         return Community.is_user_with_username_invited_to_community_with_name(username=self.username,
                                                                               community_name=community_name)
 
+    def get_roles_in_community_with_name(self, community_name):
+        return self.get_roles_of_user_with_username_in_community_with_name(username=self.username,
+                                                                           community_name=community_name)
+
+    def get_roles_of_user_with_username_in_community_with_name(self, username, community_name):
+        """
+        The roles of a user in a community, cached for the request when the relationships snapshot is enabled
+        :return: dict of the Community.COMMUNITY_ROLES flags
+        """
+        relationships_snapshot = self._get_relationships_snapshot()
+        if relationships_snapshot:
+            return relationships_snapshot.get_community_roles(community_name=community_name, username=username)
+
+        Community = get_community_model()
+        return Community.get_community_with_name_roles_for_user_with_username(community_name=community_name,
+                                                                              username=username)
+
     def has_favorite_community_with_name(self, community_name):
+        relationships_snapshot = self._get_relationships_snapshot()
+        if relationships_snapshot:
+            return community_name in relationships_snapshot.get_favorite_communities_names()
+
         return self.favorite_communities.filter(name=community_name).exists()
 
     def has_list_with_name(self, list_name):
@@ -578,9 +705,12 @@ class User(AbstractUser):
             post_reaction = post.react(reactor=self, emoji_id=emoji_id)
             if post_reaction.post.creator_id != self.pk:
                 # TODO Refactor. This check is being done twice. (Also in _send_post_reaction_push_notification)
+                reactions_count = 1
                 if post.creator.has_reaction_notifications_enabled_for_post_with_id(post_id=post.pk):
-                    self._create_post_reaction_notification(post_reaction=post_reaction)
-                self._send_post_reaction_push_notification(post_reaction=post_reaction)
+                    post_reaction_notification = self._create_post_reaction_notification(post_reaction=post_reaction)
+                    reactions_count = post_reaction_notification.reactions_count
+                self._send_post_reaction_push_notification(post_reaction=post_reaction,
+                                                           reactions_count=reactions_count)
 
         return post_reaction
 
@@ -591,7 +721,8 @@ class User(AbstractUser):
         self._delete_post_reaction_notification(post_reaction=post_reaction)
         post_reaction.delete()
 
-    def get_comments_for_post_with_id(self, post_id, min_id=None, max_id=None):
+    def get_comments_for_post_with_id(self, post_id, min_id=None, max_id=None, min_cursor=None, max_cursor=None):
+        self._check_can_get_comments_for_post_with_id(post_id)
         comments_query = Q(post_id=post_id)
 
         if max_id:
@@ -599,6 +730,11 @@ class User(AbstractUser):
         elif min_id:
             comments_query.add(Q(id__gte=min_id), Q.AND)
 
+        if max_cursor:
+            comments_query.add(make_cursor_query(max_cursor), Q.AND)
+        elif min_cursor:
+            comments_query.add(make_cursor_query(min_cursor, ascending=True), Q.AND)
+
         Post = get_post_model()
         # If comments are private, return only own comments
         if not Post.post_with_id_has_public_comments(post_id):
@@ -629,34 +765,40 @@ class User(AbstractUser):
         post_creator = post.creator
         post_commenter = self
 
-        post_notification_target_users = Post.get_post_comment_notification_target_users(post_id=post.id,
-                                                                                         post_commenter_id=self.pk)
-        PostCommentNotification = get_post_comment_notification_model()
-
-        for post_notification_target_user in post_notification_target_users:
+        post_notification_recipients = list(
+            Post.get_post_comment_notification_recipients(post_id=post.id, post_commenter_id=self.pk))
 
-            post_notification_target_user_is_post_creator = post_notification_target_user.id == post_creator.id
-            post_notification_target_has_comment_notifications_enabled = post_notification_target_user.has_comment_notifications_enabled_for_post_with_id(
-                post_id=post_comment.post_id)
+        if post_notification_recipients:
+            PostCommentNotification = get_post_comment_notification_model()
+            PostCommentNotification.create_post_comment_notifications(
+                post_comment_id=post_comment.pk,
+                owners_ids=[post_notification_recipient.pk for post_notification_recipient in
+                            post_notification_recipients])
 
-            if post_notification_target_has_comment_notifications_enabled:
-                PostCommentNotification.create_post_comment_notification(post_comment_id=post_comment.pk,
-                                                                         owner_id=post_notification_target_user.id)
+            post_creator_recipients = []
+            post_commenter_recipients = []
 
-                if post_notification_target_user_is_post_creator:
-                    notification_message = {
-                        "en": _('@%(post_commenter_username)s commented on your post.') % {
-                            'post_commenter_username': post_commenter.username
-                        }}
+            for post_notification_recipient in post_notification_recipients:
+                if post_notification_recipient.id == post_creator.id:
+                    post_creator_recipients.append(post_notification_recipient)
                 else:
-                    notification_message = {
-                        "en": _('@%(post_commenter_username)s commented on a post you also commented on.') % {
-                            'post_commenter_username': post_commenter.username
-                        }}
-
-                self._send_post_comment_push_notification(post_comment=post_comment,
-                                                          notification_message=notification_message,
-                                                          notification_target_user=post_notification_target_user)
+                    post_commenter_recipients.append(post_notification_recipient)
+
+            post_creator_notification_message = {
+                "en": _('@%(post_commenter_username)s commented on your post.') % {
+                    'post_commenter_username': post_commenter.username
+                }}
+            self._send_post_comment_push_notification(post_comment=post_comment,
+                                                      notification_message=post_creator_notification_message,
+                                                      notification_target_users=post_creator_recipients)
+
+            post_commenter_notification_message = {
+                "en": _('@%(post_commenter_username)s commented on a post you also commented on.') % {
+                    'post_commenter_username': post_commenter.username
+                }}
+            self._send_post_comment_push_notification(post_comment=post_comment,
+                                                      notification_message=post_commenter_notification_message,
+                                                      notification_target_users=post_commenter_recipients)
 
         return post_comment
 
@@ -693,8 +835,12 @@ class User(AbstractUser):
     def delete_circle_with_id(self, circle_id):
         self._check_can_delete_circle_with_id(circle_id)
         circle = self.circles.get(id=circle_id)
+        circle_users_ids = list(circle.connections.values_list('target_user_id', flat=True))
         circle.delete()
 
+        for circle_user_id in circle_users_ids:
+            self._refresh_user_with_id_timeline_entries_from_self(circle_user_id)
+
     def update_circle(self, circle, **kwargs):
         return self.update_circle_with_id(circle.pk, **kwargs)
 
@@ -749,6 +895,7 @@ class User(AbstractUser):
         self._check_is_connected_with_user_with_id_in_circle_with_id(user_id, circle_id)
         connection = self.get_connection_for_user_with_id(user_id)
         connection.circles.remove(circle_id)
+        self._refresh_user_with_id_timeline_entries_from_self(user_id)
         return connection
 
     def add_circle_with_id_to_connection_with_user_with_id(self, user_id, circle_id):
@@ -756,6 +903,7 @@ class User(AbstractUser):
         self._check_is_not_connected_with_user_with_id_in_circle_with_id(user_id, circle_id)
         connection = self.get_connection_for_user_with_id(user_id)
         connection.circles.add(circle_id)
+        self._refresh_user_with_id_timeline_entries_from_self(user_id)
         return connection
 
     def get_circle_with_id(self, circle_id):
@@ -765,8 +913,7 @@ class User(AbstractUser):
     def favorite_community_with_name(self, community_name):
         self._check_can_favorite_community_with_name(community_name=community_name)
 
-        Community = get_community_model()
-        community_to_favorite = Community.objects.get(name=community_name)
+        community_to_favorite = self._get_community_with_name(community_name)
 
         self.favorite_communities.add(community_to_favorite)
 
@@ -775,8 +922,7 @@ class User(AbstractUser):
     def unfavorite_community_with_name(self, community_name):
         self._check_can_unfavorite_community_with_name(community_name=community_name)
 
-        Community = get_community_model()
-        community_to_unfavorite = Community.objects.get(name=community_name)
+        community_to_unfavorite = self._get_community_with_name(community_name)
 
         self.favorite_communities.remove(community_to_unfavorite)
 
@@ -802,8 +948,7 @@ class User(AbstractUser):
     def delete_community_with_name(self, community_name):
         self._check_can_delete_community_with_name(community_name)
 
-        Community = get_community_model()
-        community = Community.objects.get(name=community_name)
+        community = self._get_community_with_name(community_name)
 
         community.delete()
 
@@ -821,8 +966,7 @@ class User(AbstractUser):
         self._check_can_update_community_with_name(community_name)
         self._check_community_data(name)
 
-        Community = get_community_model()
-        community_to_update = Community.objects.get(name=community_name)
+        community_to_update = self._get_community_with_name(community_name)
 
         community_to_update.update(name=name, title=title, description=description,
                                    color=color, type=type, user_adjective=user_adjective,
@@ -835,8 +979,7 @@ class User(AbstractUser):
         self._check_can_update_community_with_name(community_name)
         self._check_community_data(avatar=avatar)
 
-        Community = get_community_model()
-        community_to_update_avatar_from = Community.objects.get(name=community_name)
+        community_to_update_avatar_from = self._get_community_with_name(community_name)
         community_to_update_avatar_from.avatar = avatar
 
         community_to_update_avatar_from.save()
@@ -845,8 +988,7 @@ class User(AbstractUser):
 
     def delete_community_with_name_avatar(self, community_name):
         self._check_can_update_community_with_name(community_name)
-        Community = get_community_model()
-        community_to_delete_avatar_from = Community.objects.get(name=community_name)
+        community_to_delete_avatar_from = self._get_community_with_name(community_name)
         delete_file_field(community_to_delete_avatar_from.avatar)
         community_to_delete_avatar_from.avatar = None
         community_to_delete_avatar_from.save()
@@ -856,8 +998,7 @@ class User(AbstractUser):
         self._check_can_update_community_with_name(community_name)
         self._check_community_data(cover=cover)
 
-        Community = get_community_model()
-        community_to_update_cover_from = Community.objects.get(name=community_name)
+        community_to_update_cover_from = self._get_community_with_name(community_name)
 
         community_to_update_cover_from.cover = cover
 
@@ -868,8 +1009,7 @@ class User(AbstractUser):
     def delete_community_with_name_cover(self, community_name):
         self._check_can_update_community_with_name(community_name)
 
-        Community = get_community_model()
-        community_to_delete_cover_from = Community.objects.get(name=community_name)
+        community_to_delete_cover_from = self._get_community_with_name(community_name)
 
         delete_file_field(community_to_delete_cover_from.cover)
         community_to_delete_cover_from.cover = None
@@ -895,13 +1035,13 @@ class User(AbstractUser):
     def join_community_with_name(self, community_name):
         self._check_can_join_community_with_name(
             community_name=community_name)
-        Community = get_community_model()
-        community_to_join = Community.objects.get(name=community_name)
+        community_to_join = self._get_community_with_name(community_name)
         community_to_join.add_member(self)
+        self._add_community_with_id_to_timeline(community_to_join.pk)
 
         # Clean up any invites
         CommunityInvite = get_community_invite_model()
-        CommunityInvite.objects.filter(community__name=community_name, invited_user__username=self.username).delete()
+        CommunityInvite.objects.filter(community_id=community_to_join.pk, invited_user__username=self.username).delete()
 
         # No need to delete community invite notifications as they are delete cascaded
 
@@ -911,13 +1051,13 @@ class User(AbstractUser):
         self._check_can_leave_community_with_name(
             community_name=community_name)
 
-        Community = get_community_model()
-        community_to_leave = Community.objects.get(name=community_name)
+        community_to_leave = self._get_community_with_name(community_name)
 
         if self.has_favorite_community_with_name(community_name):
             self.unfavorite_community_with_name(community_name=community_name)
 
         community_to_leave.remove_member(self)
+        self._remove_community_with_id_from_timeline(community_to_leave.pk)
 
         return community_to_leave
 
@@ -925,9 +1065,7 @@ class User(AbstractUser):
         self._check_can_invite_user_with_username_to_community_with_name(username=username,
                                                                          community_name=community_name)
 
-        Community = get_community_model()
-
-        community_to_invite_user_to = Community.objects.get(name=community_name)
+        community_to_invite_user_to = self._get_community_with_name(community_name)
         user_to_invite = User.objects.get(username=username)
 
         community_invite = community_to_invite_user_to.create_invite(creator=self, invited_user=user_to_invite)
@@ -968,9 +1106,7 @@ class User(AbstractUser):
             username=username,
             community_name=community_name)
 
-        Community = get_community_model()
-
-        community_to_add_administrator_to = Community.objects.get(name=community_name)
+        community_to_add_administrator_to = self._get_community_with_name(community_name)
         user_to_add_as_administrator = User.objects.get(username=username)
 
         community_to_add_administrator_to.add_administrator(user_to_add_as_administrator)
@@ -988,9 +1124,7 @@ class User(AbstractUser):
             username=username,
             community_name=community_name)
 
-        Community = get_community_model()
-
-        community_to_remove_administrator_from = Community.objects.get(name=community_name)
+        community_to_remove_administrator_from = self._get_community_with_name(community_name)
         user_to_remove_as_administrator = User.objects.get(username=username)
 
         community_to_remove_administrator_from.remove_administrator(user_to_remove_as_administrator)
@@ -1019,9 +1153,7 @@ class User(AbstractUser):
             username=username,
             community_name=community_name)
 
-        Community = get_community_model()
-
-        community_to_add_moderator_to = Community.objects.get(name=community_name)
+        community_to_add_moderator_to = self._get_community_with_name(community_name)
         user_to_add_as_moderator = User.objects.get(username=username)
 
         community_to_add_moderator_to.add_moderator(user_to_add_as_moderator)
@@ -1036,9 +1168,7 @@ class User(AbstractUser):
             username=username,
             community_name=community_name)
 
-        Community = get_community_model()
-
-        community_to_remove_moderator_from = Community.objects.get(name=community_name)
+        community_to_remove_moderator_from = self._get_community_with_name(community_name)
         user_to_remove_as_moderator = User.objects.get(username=username)
 
         community_to_remove_moderator_from.remove_moderator(user_to_remove_as_moderator)
@@ -1064,9 +1194,7 @@ class User(AbstractUser):
     def ban_user_with_username_from_community_with_name(self, username, community_name):
         self._check_can_ban_user_with_username_from_community_with_name(username=username,
                                                                         community_name=community_name)
-        Community = get_community_model()
-
-        community_to_ban_user_from = Community.objects.get(name=community_name)
+        community_to_ban_user_from = self._get_community_with_name(community_name)
         user_to_ban = User.objects.get(username=username)
 
         if user_to_ban.is_member_of_community_with_name(community_name=community_name):
@@ -1080,9 +1208,7 @@ class User(AbstractUser):
     def unban_user_with_username_from_community_with_name(self, username, community_name):
         self._check_can_unban_user_with_username_from_community_with_name(username=username,
                                                                           community_name=community_name)
-        Community = get_community_model()
-
-        community_to_unban_user_from = Community.objects.get(name=community_name)
+        community_to_unban_user_from = self._get_community_with_name(community_name)
         user_to_unban = User.objects.get(username=username)
 
         community_to_unban_user_from.banned_users.remove(user_to_unban)
@@ -1090,6 +1216,46 @@ class User(AbstractUser):
 
         return community_to_unban_user_from
 
+    def ban_users_with_usernames_from_community_with_name(self, usernames, community_name):
+        users_to_ban = self._get_users_with_usernames(usernames)
+        self._check_can_ban_users_with_ids_from_community_with_name(users_ids=[user.pk for user in users_to_ban],
+                                                                    community_name=community_name)
+        community_to_ban_users_from = self._get_community_with_name(community_name)
+
+        members_ids = community_to_ban_users_from.remove_members(users_to_ban)
+        self._remove_community_with_id_from_timelines_of_users_with_ids(community_id=community_to_ban_users_from.pk,
+                                                                        users_ids=members_ids)
+
+        community_to_ban_users_from.banned_users.add(*users_to_ban)
+        community_to_ban_users_from.create_users_ban_logs(source_user=self, target_users=users_to_ban)
+
+        return community_to_ban_users_from
+
+    def unban_users_with_usernames_from_community_with_name(self, usernames, community_name):
+        users_to_unban = self._get_users_with_usernames(usernames)
+        self._check_can_unban_users_with_ids_from_community_with_name(users_ids=[user.pk for user in users_to_unban],
+                                                                      community_name=community_name)
+        community_to_unban_users_from = self._get_community_with_name(community_name)
+
+        community_to_unban_users_from.banned_users.remove(*users_to_unban)
+        community_to_unban_users_from.create_users_unban_logs(source_user=self, target_users=users_to_unban)
+
+        return community_to_unban_users_from
+
+    def remove_members_with_usernames_from_community_with_name(self, usernames, community_name):
+        users_to_remove = self._get_users_with_usernames(usernames)
+        self._check_can_remove_members_with_ids_from_community_with_name(
+            users_ids=[user.pk for user in users_to_remove], community_name=community_name)
+        community_to_remove_members_from = self._get_community_with_name(community_name)
+
+        members_ids = community_to_remove_members_from.remove_members(users_to_remove)
+        self._remove_community_with_id_from_timelines_of_users_with_ids(
+            community_id=community_to_remove_members_from.pk, users_ids=members_ids)
+
+        community_to_remove_members_from.create_members_removal_logs(source_user=self, target_users=users_to_remove)
+
+        return community_to_remove_members_from
+
     def create_list(self, name, emoji_id):
         self._check_list_name_not_taken(name)
         List = get_list_model()
@@ -1171,13 +1337,10 @@ class User(AbstractUser):
 
     def search_linked_users_with_query(self, query):
         linked_users_query = self._make_linked_users_query()
+        linked_users_ids = User.objects.filter(linked_users_query).values('id')
 
-        names_query = Q(username__icontains=query)
-        names_query.add(Q(profile__name__icontains=query), Q.OR)
-
-        linked_users_query.add(names_query, Q.AND)
-
-        return User.objects.filter(linked_users_query).distinct()
+        users_ids = UserSearchEntry.search_users_ids(query, users_ids=linked_users_ids)
+        return User.objects.filter(pk__in=users_ids).order_by(make_search_ranking(users_ids))
 
     def search_communities_with_query(self, query):
         # In the future, the user might have blocked communities which should not be displayed
@@ -1185,20 +1348,16 @@ class User(AbstractUser):
         return Community.search_communities_with_query(query)
 
     def get_community_with_name(self, community_name):
-        Community = get_community_model()
-        return Community.objects.get(name=community_name)
+        return self._get_community_with_name(community_name)
 
     def get_joined_communities(self):
         Community = get_community_model()
         return Community.objects.filter(memberships__user=self)
 
     def search_joined_communities_with_query(self, query):
-        joined_communities_query = Q(memberships__user=self)
-        joined_communities_name_query = Q(name__icontains=query)
-        joined_communities_name_query.add(Q(title__icontains=query), Q.OR)
-        joined_communities_query.add(joined_communities_name_query, Q.AND)
         Community = get_community_model()
-        return Community.objects.filter(joined_communities_query)
+        joined_communities_ids = Community.objects.filter(memberships__user=self).values('id')
+        return Community.search_communities_with_query(query, communities_ids=joined_communities_ids)
 
     def get_favorite_communities(self):
         return self.favorite_communities.all()
@@ -1247,25 +1406,34 @@ class User(AbstractUser):
         if post.has_image():
             delete_file_field(post.image.image)
 
+        post_was_public = post.is_public_post()
+
         # We have to be mindful with using bulk delete as it does not call the delete() method per instance
         Post.objects.filter(id=post_id).delete()
 
-    def get_posts_for_community_with_name(self, community_name, max_id=None):
+        UserCounts.decrement_count_for_users_with_ids([post.creator_id], 'posts_count')
+        if post_was_public:
+            UserCounts.decrement_count_for_users_with_ids([post.creator_id], 'public_posts_count')
+
+    def get_posts_for_community_with_name(self, community_name, max_id=None, max_cursor=None):
         """
         :param community_name:
         :param max_id:
+        :param max_cursor:
         :return:
         """
         self._check_can_get_posts_for_community_with_name(community_name=community_name)
 
-        Community = get_community_model()
-        community = Community.objects.get(name=community_name)
+        community = self._get_community_with_name(community_name)
 
-        posts_query = Q(community__id=community.pk)
+        posts_query = Q(community_id=community.pk)
 
         if max_id:
             posts_query.add(Q(id__lt=max_id), Q.AND)
 
+        if max_cursor:
+            posts_query.add(make_cursor_query(max_cursor), Q.AND)
+
         Post = get_post_model()
         profile_posts = Post.objects.filter(posts_query).distinct()
 
@@ -1277,6 +1445,23 @@ class User(AbstractUser):
         post = Post.objects.get(pk=post_id)
         return post
 
+    def filter_visible_post_ids(self, post_ids):
+        """
+        Decides which of the given posts we can see with a single query
+        :param post_ids:
+        :return: the set of the ids of the given posts we can see
+        """
+        post_ids = list(post_ids)
+
+        if not post_ids:
+            return set()
+
+        visible_posts_query = Q(id__in=post_ids)
+        visible_posts_query.add(self._make_visible_posts_query(), Q.AND)
+
+        Post = get_post_model()
+        return set(Post.objects.filter(visible_posts_query).values_list('id', flat=True).distinct())
+
     def get_community_post_with_id(self, post_id):
         Community = get_community_model()
         post_query = Q(id=post_id)
@@ -1291,10 +1476,11 @@ class User(AbstractUser):
 
         return profile_posts
 
-    def get_posts(self, max_id=None):
+    def get_posts(self, max_id=None, max_cursor=None):
         """
         Get all the posts for ourselves
         :param max_id:
+        :param max_cursor:
         :return:
         """
         posts_query = Q(creator_id=self.id, community__isnull=True)
@@ -1302,110 +1488,119 @@ class User(AbstractUser):
         if max_id:
             posts_query.add(Q(id__lt=max_id), Q.AND)
 
+        if max_cursor:
+            posts_query.add(make_cursor_query(max_cursor), Q.AND)
+
         Post = get_post_model()
         posts = Post.objects.filter(posts_query)
 
         return posts
 
-    def get_posts_for_user_with_username(self, username, max_id=None):
+    def get_posts_for_user_with_username(self, username, max_id=None, max_cursor=None):
         """
         Get all the posts for the given user with username
         :param username:
         :param max_id:
-        :param post_id:
+        :param max_cursor:
         :return:
         """
         user = User.objects.get(username=username)
-        posts_query = self._make_get_posts_query_for_user(user, max_id)
+        posts_query = self._make_get_posts_query_for_user(user, max_id=max_id, max_cursor=max_cursor)
 
         Post = get_post_model()
         profile_posts = Post.objects.filter(posts_query).distinct()
 
         return profile_posts
 
-    def get_timeline_posts(self, lists_ids=None, circles_ids=None, max_id=None):
+    def get_timeline_posts(self, lists_ids=None, circles_ids=None, max_id=None, max_cursor=None):
         """
         Get the timeline posts for self. The results will be dynamic based on follows and connections.
         """
 
         if not circles_ids and not lists_ids:
-            return self._get_timeline_posts_with_no_filters(max_id=max_id)
-
-        return self._get_timeline_posts_with_filters(max_id=max_id, circles_ids=circles_ids, lists_ids=lists_ids)
-
-    def _get_timeline_posts_with_filters(self, max_id=None, circles_ids=None, lists_ids=None):
-        world_circle_id = self._get_world_circle_id()
-
-        if circles_ids:
-            timeline_posts_query = Q(creator=self.pk, circles__id__in=circles_ids)
+            if settings.FEATURE_MATERIALIZED_TIMELINE_ENABLED:
+                return self._get_materialized_timeline_posts(max_id=max_id, max_cursor=max_cursor)
+            timeline_posts = self._get_timeline_posts_with_no_filters(max_id=max_id, max_cursor=max_cursor)
         else:
-            timeline_posts_query = Q()
+            timeline_posts = self._get_timeline_posts_with_filters(max_id=max_id, max_cursor=max_cursor,
+                                                                   circles_ids=circles_ids, lists_ids=lists_ids)
 
-        if lists_ids:
-            followed_users_query = self.follows.filter(lists__id__in=lists_ids)
-        else:
-            followed_users_query = self.follows.all()
+        return timeline_posts.order_by('-created', '-id')
 
-        followed_users = followed_users_query.values('followed_user__id')
+    def _get_materialized_timeline_posts(self, max_id=None, max_cursor=None):
+        """
+        The timeline with no filtering as stored in the TimelineEntry table, ordered by the entries created
+        so it is served by the (owner, -created, -post) index.
+        """
+        timeline_posts_query = Q(timeline_entries__owner_id=self.pk)
 
-        for followed_user in followed_users:
+        if max_id:
+            timeline_posts_query.add(Q(id__lt=max_id), Q.AND)
 
-            followed_user_id = followed_user['followed_user__id']
+        if max_cursor:
+            timeline_posts_query.add(make_cursor_query(max_cursor, created_field='timeline_entries__created'), Q.AND)
 
-            followed_user_query = Q(creator_id=followed_user_id)
+        Post = get_post_model()
+        return Post.objects.filter(timeline_posts_query).order_by('-timeline_entries__created', '-id')
 
-            if circles_ids:
-                followed_user_query.add(Q(creator__connections__target_connection__circles__in=circles_ids), Q.AND)
+    def _get_timeline_posts_with_filters(self, max_id=None, max_cursor=None, circles_ids=None, lists_ids=None):
+        Post = get_post_model()
 
-            followed_user_circles_query = Q(circles__id=world_circle_id)
+        if lists_ids:
+            followed_users_ids = self.follows.filter(lists__id__in=lists_ids).values('followed_user_id')
+        else:
+            followed_users_ids = self.follows.values('followed_user_id')
 
-            followed_user_circles_query.add(Q(circles__connections__target_user_id=self.pk, ), Q.OR)
+        followed_users_query = Q(creator_id__in=followed_users_ids)
 
-            followed_user_query.add(followed_user_circles_query, Q.AND)
+        if circles_ids:
+            own_circles_posts_ids = Post.objects.filter(creator_id=self.pk, circles__id__in=circles_ids).values('id')
+            timeline_posts_query = Q(id__in=own_circles_posts_ids)
 
-            # Add all followed user circles
-            timeline_posts_query.add(followed_user_query, Q.OR)
+            # Only the followed users we have in the given circles
+            Connection = get_connection_model()
+            circles_users_ids = Connection.objects.filter(circles__id__in=circles_ids).values('target_user_id')
+            followed_users_query.add(Q(creator_id__in=circles_users_ids), Q.AND)
+        else:
+            timeline_posts_query = Q()
+
+        followed_users_posts_ids = self._make_visible_posts_ids_query_for_users(followed_users_query)
+        timeline_posts_query.add(Q(id__in=followed_users_posts_ids), Q.OR)
 
         if max_id:
             timeline_posts_query.add(Q(id__lt=max_id), Q.AND)
 
-        Post = get_post_model()
-        return Post.objects.filter(timeline_posts_query).distinct()
+        if max_cursor:
+            timeline_posts_query.add(make_cursor_query(max_cursor), Q.AND)
 
-    def _get_timeline_posts_with_no_filters(self, max_id=None):
+        return Post.objects.filter(timeline_posts_query)
+
+    def _get_timeline_posts_with_no_filters(self, max_id=None, max_cursor=None):
         """
         Being the main action of the network, an optimised call of the get timeline posts call with no filtering.
+        The followed users and communities are resolved with subqueries so the SQL stays the same size no matter
+        how many users we follow.
         """
-        world_circle_id = self._get_world_circle_id()
-
         # Add all own posts
-        timeline_posts_query = Q(creator=self.pk)
+        timeline_posts_query = Q(creator_id=self.pk)
 
         # Add all community posts
-        timeline_posts_query.add(Q(community__memberships__user__id=self.pk), Q.OR)
-
-        followed_users = self.follows.values('followed_user__id')
-
-        for followed_user in followed_users:
-            followed_user_id = followed_user['followed_user__id']
-
-            # Add followed user world circle posts + posts we're encircled with
-
-            followed_user_query = Q(creator_id=followed_user_id)
+        communities_ids = self.communities_memberships.values('community_id')
+        timeline_posts_query.add(Q(community_id__in=communities_ids), Q.OR)
 
-            followed_user_circles_query = Q(circles__id=world_circle_id)
-
-            followed_user_circles_query.add(Q(circles__connections__target_user_id=self.pk, ), Q.OR)
-
-            followed_user_query.add(followed_user_circles_query, Q.AND)
-
-            timeline_posts_query.add(followed_user_query, Q.OR)
+        # Add followed users world circle posts + posts we're encircled with
+        followed_users_ids = self.follows.values('followed_user_id')
+        followed_users_posts_ids = self._make_visible_posts_ids_query_for_users(Q(creator_id__in=followed_users_ids))
+        timeline_posts_query.add(Q(id__in=followed_users_posts_ids), Q.OR)
 
         if max_id:
             timeline_posts_query.add(Q(id__lt=max_id), Q.AND)
 
+        if max_cursor:
+            timeline_posts_query.add(make_cursor_query(max_cursor), Q.AND)
+
         Post = get_post_model()
-        return Post.objects.filter(timeline_posts_query).distinct()
+        return Post.objects.filter(timeline_posts_query)
 
     def follow_user(self, user, lists_ids=None):
         return self.follow_user_with_id(user.pk, lists_ids)
@@ -1425,6 +1620,7 @@ class User(AbstractUser):
 
         Follow = get_follow_model()
         follow = Follow.create_follow(user_id=self.pk, followed_user_id=user_id, lists_ids=lists_ids)
+        self._refresh_timeline_entries_from_user_with_id(user_id)
         self._create_follow_notification(followed_user_id=user_id)
         self._send_follow_push_notification(followed_user_id=user_id)
 
@@ -1438,6 +1634,9 @@ class User(AbstractUser):
         follow = self.follows.get(followed_user_id=user_id)
         self._delete_follow_notification(followed_user_id=user_id)
         follow.delete()
+        UserCounts.decrement_count_for_users_with_ids([self.pk], 'following_count')
+        UserCounts.decrement_count_for_users_with_ids([user_id], 'followers_count')
+        self._refresh_timeline_entries_from_user_with_id(user_id)
 
     def update_follow_for_user(self, user, lists_ids=None):
         return self.update_follow_for_user_with_id(user.pk, lists_ids=lists_ids)
@@ -1489,6 +1688,7 @@ class User(AbstractUser):
 
         Connection = get_connection_model()
         connection = Connection.create_connection(user_id=self.pk, target_user_id=user_id, circles_ids=circles_ids)
+        self._refresh_user_with_id_timeline_entries_from_self(user_id)
 
         # Automatically follow user
         if not self.is_following_user_with_id(user_id):
@@ -1534,6 +1734,7 @@ class User(AbstractUser):
         connection.circles.clear()
         connection.circles.add(*circles_ids)
         connection.save()
+        self._refresh_user_with_id_timeline_entries_from_self(user_id)
 
         return connection
 
@@ -1551,6 +1752,11 @@ class User(AbstractUser):
 
         connection = self.connections.get(target_connection__user_id=user_id)
         connection.delete()
+        # Deleting the connection cascades to the target connection
+        UserCounts.decrement_count_for_users_with_ids([self.pk, user_id], 'connections_count')
+
+        self._refresh_timeline_entries_from_user_with_id(user_id)
+        self._refresh_user_with_id_timeline_entries_from_self(user_id)
 
         return connection
 
@@ -1560,28 +1766,43 @@ class User(AbstractUser):
     def get_follow_for_user_with_id(self, user_id):
         return self.follows.get(followed_user_id=user_id)
 
-    def get_notifications(self, max_id=None):
+    def get_notifications(self, max_id=None, max_cursor=None):
         notifications_query = Q()
 
         if max_id:
             notifications_query.add(Q(id__lt=max_id), Q.AND)
 
+        if max_cursor:
+            notifications_query.add(make_cursor_query(max_cursor), Q.AND)
+
         return self.notifications.filter(notifications_query)
 
+    def get_notifications_after_cursor(self, min_cursor):
+        return self.notifications.filter(make_cursor_query(min_cursor, ascending=True))
+
+    def has_notifications_after_cursor(self, min_cursor):
+        return self.get_notifications_after_cursor(min_cursor).exists()
+
     def read_notifications(self, max_id=None):
         notifications_query = Q(read=False)
 
         if max_id:
             notifications_query.add(Q(id__lte=max_id), Q.AND)
 
-        self.notifications.filter(notifications_query).update(read=True)
+        read_notifications_count = self.notifications.filter(notifications_query).update(read=True)
+
+        if read_notifications_count:
+            UserCounts.decrement_count_for_users_with_ids([self.pk], 'unread_notifications_count',
+                                                          amount=read_notifications_count)
 
     def read_notification_with_id(self, notification_id):
         self._check_can_read_notification_with_id(notification_id)
-        notification = self.notifications.get(id=notification_id)
-        notification.read = True
-        notification.save()
-        return notification
+
+        # Only the request that flips the notification to read decrements the count
+        if self.notifications.filter(id=notification_id, read=False).update(read=True):
+            UserCounts.decrement_count_for_users_with_ids([self.pk], 'unread_notifications_count')
+
+        return self.notifications.get(id=notification_id)
 
     def delete_notification_with_id(self, notification_id):
         self._check_can_delete_notification_with_id(notification_id)
@@ -1589,6 +1810,8 @@ class User(AbstractUser):
         notification.delete()
 
     def delete_notifications(self):
+        # Reading them first resets the unread count with one query instead of one per deleted notification
+        self.read_notifications()
         self.notifications.all().delete()
 
     def create_device(self, uuid, name=None):
@@ -1658,10 +1881,10 @@ class User(AbstractUser):
         email.attach_alternative(html_content, 'text/html')
         email.send()
 
-    def _send_post_comment_push_notification(self, post_comment, notification_message, notification_target_user):
-        senders.send_post_comment_push_notification_with_message(post_comment=post_comment,
-                                                                 message=notification_message,
-                                                                 target_user=notification_target_user)
+    def _send_post_comment_push_notification(self, post_comment, notification_message, notification_target_users):
+        senders.send_post_comment_push_notification_with_message_to_users(post_comment=post_comment,
+                                                                          message=notification_message,
+                                                                          target_users=notification_target_users)
 
     def _delete_post_comment_notification(self, post_comment):
         PostCommentNotification = get_post_comment_notification_model()
@@ -1670,15 +1893,15 @@ class User(AbstractUser):
 
     def _create_post_reaction_notification(self, post_reaction):
         PostReactionNotification = get_post_reaction_notification_model()
-        PostReactionNotification.create_post_reaction_notification(post_reaction_id=post_reaction.pk,
-                                                                   owner_id=post_reaction.post.creator_id)
+        return PostReactionNotification.create_post_reaction_notification(post_reaction=post_reaction,
+                                                                          owner_id=post_reaction.post.creator_id)
 
-    def _send_post_reaction_push_notification(self, post_reaction):
-        senders.send_post_reaction_push_notification(post_reaction=post_reaction)
+    def _send_post_reaction_push_notification(self, post_reaction, reactions_count=1):
+        senders.send_post_reaction_push_notification(post_reaction=post_reaction, reactions_count=reactions_count)
 
     def _delete_post_reaction_notification(self, post_reaction):
         PostReactionNotification = get_post_reaction_notification_model()
-        PostReactionNotification.delete_post_reaction_notification(post_reaction_id=post_reaction.pk,
+        PostReactionNotification.delete_post_reaction_notification(post_reaction=post_reaction,
                                                                    owner_id=post_reaction.post.creator_id)
 
     def _create_community_invite_notification(self, community_invite):
@@ -1730,6 +1953,54 @@ class User(AbstractUser):
         ConnectionRequestNotification.delete_connection_request_notification_for_users_with_ids(user_a_id=self.pk,
                                                                                                 user_b_id=user_id)
 
+    def _refresh_timeline_entries_from_user_with_id(self, user_id):
+        if not settings.FEATURE_MATERIALIZED_TIMELINE_ENABLED:
+            return
+        TimelineEntry = get_timeline_entry_model()
+        TimelineEntry.refresh_entries_for_owner_with_id_from_creator_with_id(owner_id=self.pk, creator_id=user_id)
+
+    def _refresh_user_with_id_timeline_entries_from_self(self, user_id):
+        if not settings.FEATURE_MATERIALIZED_TIMELINE_ENABLED:
+            return
+        TimelineEntry = get_timeline_entry_model()
+        TimelineEntry.refresh_entries_for_owner_with_id_from_creator_with_id(owner_id=user_id, creator_id=self.pk)
+
+    def _add_community_with_id_to_timeline(self, community_id):
+        if not settings.FEATURE_MATERIALIZED_TIMELINE_ENABLED:
+            return
+        TimelineEntry = get_timeline_entry_model()
+        TimelineEntry.create_entries_for_owner_with_id_from_community_with_id(owner_id=self.pk,
+                                                                              community_id=community_id)
+
+    def _remove_community_with_id_from_timeline(self, community_id):
+        if not settings.FEATURE_MATERIALIZED_TIMELINE_ENABLED:
+            return
+        TimelineEntry = get_timeline_entry_model()
+        TimelineEntry.delete_entries_for_owner_with_id_from_community_with_id(owner_id=self.pk,
+                                                                              community_id=community_id)
+
+    def _remove_community_with_id_from_timelines_of_users_with_ids(self, community_id, users_ids):
+        if not settings.FEATURE_MATERIALIZED_TIMELINE_ENABLED or not users_ids:
+            return
+        TimelineEntry = get_timeline_entry_model()
+        TimelineEntry.delete_entries_for_owners_with_ids_from_community_with_id(owners_ids=users_ids,
+                                                                                community_id=community_id)
+
+    def _get_users_with_usernames(self, usernames):
+        """
+        Resolves the usernames with a single query
+        :raises NotFound: when any of them does not exist
+        """
+        usernames = set(usernames)
+        users = list(User.objects.filter(username__in=usernames))
+
+        if len(users) != len(usernames):
+            raise NotFound(
+                _('No user with the provided username exists.'),
+            )
+
+        return users
+
     def _make_linked_users_query(self, max_id=None):
         # All users which are connected with us and we have accepted by adding
         # them to a circle
@@ -1744,12 +2015,46 @@ class User(AbstractUser):
 
         return linked_users_query
 
-    def _make_get_post_with_id_query_for_user(self, user, post_id):
-        posts_query = self._make_get_posts_query_for_user(user)
-        posts_query.add(Q(id=post_id), Q.AND)
-        return posts_query
+    def _make_visible_posts_ids_query_for_users(self, users_query):
+        """
+        Makes a subquery with the ids of the posts from the users matching users_query that
+        were posted to the world circle or to a circle we're part of.
+        """
+        world_circle_id = self._get_world_circle_id()
+
+        Circle = get_circle_model()
+        encircling_circles_ids = Circle.objects.filter(connections__target_user_id=self.pk).values('id')
+
+        circles_query = Q(circles__id=world_circle_id)
+        circles_query.add(Q(circles__id__in=encircling_circles_ids), Q.OR)
+
+        Post = get_post_model()
+        return Post.objects.filter(users_query & circles_query).values('id')
+
+    def _make_visible_posts_query(self):
+        """
+        Makes a query matching the posts we can see: our own, public ones, the ones of public communities or
+        communities we're member of and the ones in circles of users fully connected with us we're part of.
+        """
+        world_circle_id = self._get_world_circle_id()
+
+        # The circles other users placed their connection with us in, if we have confirmed it too
+        Circle = get_circle_model()
+        encircling_circles_ids = Circle.objects.filter(connections__target_user_id=self.pk,
+                                                       connections__target_connection__circles__isnull=False).values(
+            'id')
+
+        Community = get_community_model()
 
-    def _make_get_posts_query_for_user(self, user, max_id=None):
+        visible_posts_query = Q(creator_id=self.pk)
+        visible_posts_query.add(Q(circles__id=world_circle_id), Q.OR)
+        visible_posts_query.add(Q(community__type=Community.COMMUNITY_TYPE_PUBLIC), Q.OR)
+        visible_posts_query.add(Q(community__memberships__user_id=self.pk), Q.OR)
+        visible_posts_query.add(Q(community__isnull=True, circles__id__in=encircling_circles_ids), Q.OR)
+
+        return visible_posts_query
+
+    def _make_get_posts_query_for_user(self, user, max_id=None, max_cursor=None):
         posts_query = Q()
 
         # Add the user world circle posts
@@ -1788,11 +2093,48 @@ class User(AbstractUser):
         if max_id:
             posts_query.add(Q(id__lt=max_id), Q.AND)
 
+        if max_cursor:
+            posts_query.add(make_cursor_query(max_cursor), Q.AND)
+
         return posts_query
 
+    def _get_relationships_snapshot(self):
+        return getattr(self, '_relationships_snapshot', None)
+
+    def _get_community_with_name(self, community_name):
+        """
+        Resolves the name of a community once per request when the relationships snapshot is enabled
+        :raises Community.DoesNotExist:
+        """
+        relationships_snapshot = self._get_relationships_snapshot()
+        if relationships_snapshot:
+            return relationships_snapshot.get_community(community_name)
+
+        Community = get_community_model()
+        return Community.get_community_with_name(community_name)
+
+    def _get_community_id_with_name(self, community_name):
+        """
+        :return: the id of the community, None when there is none with the name
+        """
+        relationships_snapshot = self._get_relationships_snapshot()
+        if relationships_snapshot:
+            return relationships_snapshot.get_community_id(community_name)
+
+        Community = get_community_model()
+        return Community.get_community_id_with_name(community_name)
+
+    def _get_counts(self):
+        try:
+            return self.counts
+        except UserCounts.DoesNotExist:
+            UserCounts.reconcile_counts_for_users_with_ids([self.pk])
+            self.counts = UserCounts.objects.get(user_id=self.pk)
+            return self.counts
+
     def _get_world_circle_id(self):
         Circle = get_circle_model()
-        return Circle.get_world_circle().pk
+        return Circle.get_world_circle_id()
 
     def _get_default_connection_circles(self):
         """
@@ -2009,7 +2351,7 @@ class User(AbstractUser):
     def _check_can_react_with_emoji_id_and_emoji_group_id(self, emoji_id, emoji_group_id):
         EmojiGroup = get_emoji_group_model()
         try:
-            emoji_group = EmojiGroup.objects.get(pk=emoji_group_id, is_reaction_group=True)
+            emoji_group = EmojiGroup.get_reaction_emoji_group_with_id(emoji_group_id)
             if not emoji_group.has_emoji_with_id(emoji_id):
                 raise ValidationError(
                     _('Emoji does not belong to given emoji group.'),
@@ -2023,31 +2365,18 @@ class User(AbstractUser):
         self._check_can_see_post_with_id(post_id)
 
     def _check_can_see_post_with_id(self, post_id):
-        # Check if post is public
-        Post = get_post_model()
-        post = Post.objects.select_related('creator').filter(pk=post_id).get()
-        if post.creator_id == self.pk or post.is_public_post():
+        if self.filter_visible_post_ids([post_id]):
             return
 
-        if post.community:
-            if not self.get_community_post_with_id(post_id=post_id).exists():
-                raise ValidationError(
-                    _('This post is from a private community.'),
-                )
-        else:
-            # Check if we can retrieve the post
-            if not self._can_see_post(post=post):
-                raise ValidationError(
-                    _('This post is private.'),
-                )
-
-    def _can_see_post(self, post):
-        post_query = self._make_get_post_with_id_query_for_user(post.creator, post_id=post.pk)
-
         Post = get_post_model()
-        profile_posts = Post.objects.filter(post_query)
+        if Post.objects.filter(pk=post_id, community__isnull=False).exists():
+            raise ValidationError(
+                _('This post is from a private community.'),
+            )
 
-        return profile_posts.exists()
+        raise ValidationError(
+            _('This post is private.'),
+        )
 
     def _check_follow_lists_ids(self, lists_ids):
         for list_id in lists_ids:
@@ -2092,7 +2421,7 @@ class User(AbstractUser):
             )
 
     def _check_has_not_reached_max_follows(self):
-        if self.count_following() > settings.USER_MAX_FOLLOWS:
+        if self.get_following_count() > settings.USER_MAX_FOLLOWS:
             raise ValidationError(
                 _('Maximum number of follows reached.'),
             )
@@ -2124,7 +2453,7 @@ class User(AbstractUser):
         self._check_has_not_reached_max_connections()
 
     def _check_has_not_reached_max_connections(self):
-        if self.count_connections() > settings.USER_MAX_CONNECTIONS:
+        if self.get_connections_count() > settings.USER_MAX_CONNECTIONS:
             raise ValidationError(
                 _('Maximum number of connections reached.'),
             )
@@ -2271,7 +2600,9 @@ class User(AbstractUser):
             )
 
     def _check_can_invite_user_with_username_to_community_with_name(self, username, community_name):
-        if not self.is_member_of_community_with_name(community_name=community_name):
+        roles = self.get_roles_in_community_with_name(community_name=community_name)
+
+        if not roles['is_member']:
             raise ValidationError(
                 _('You can only invite people to a community you are member of.'),
             )
@@ -2281,18 +2612,16 @@ class User(AbstractUser):
                 _('You have already invited this user to join the community.'),
             )
 
-        Community = get_community_model()
-
-        if Community.is_user_with_username_member_of_community_with_name(username=username,
-                                                                         community_name=community_name):
+        if self.get_roles_of_user_with_username_in_community_with_name(username=username,
+                                                                       community_name=community_name)['is_member']:
             raise ValidationError(
                 _('The user is already part of the community.'),
             )
 
+        Community = get_community_model()
+
         if not Community.is_community_with_name_invites_enabled(community_name=community_name) and not (
-                self.is_administrator_of_community_with_name(
-                    community_name=community_name) or self.is_moderator_of_community_with_name(
-            community_name=community_name)):
+                roles['is_administrator'] or roles['is_moderator']):
             raise ValidationError(
                 _('Invites for this community are not enabled. Only administrators & moderators can invite.'),
             )
@@ -2305,80 +2634,129 @@ class User(AbstractUser):
             )
 
     def _check_can_get_community_with_name_banned_users(self, community_name):
-        if not self.is_administrator_of_community_with_name(
-                community_name=community_name) and not self.is_moderator_of_community_with_name(
-            community_name=community_name):
+        self._check_is_staff_of_community_with_name(
+            community_name=community_name,
+            message=_('Only community administrators & moderators can get banned users.'))
+
+    def _check_is_staff_of_community_with_name(self, community_name, message):
+        roles = self.get_roles_in_community_with_name(community_name=community_name)
+
+        if not roles['is_administrator'] and not roles['is_moderator']:
+            raise ValidationError(message)
+
+    def _check_can_ban_user_with_username_from_community_with_name(self, username, community_name):
+        self._check_is_staff_of_community_with_name(
+            community_name=community_name,
+            message=_('Only community administrators & moderators can ban community members.'))
+
+        user_roles = self.get_roles_of_user_with_username_in_community_with_name(username=username,
+                                                                                 community_name=community_name)
+
+        if user_roles['is_banned']:
             raise ValidationError(
-                _('Only community administrators & moderators can get banned users.'),
+                _('User is already banned'),
             )
 
-    def _check_can_ban_user_with_username_from_community_with_name(self, username, community_name):
-        if not self.is_administrator_of_community_with_name(
-                community_name=community_name) and not self.is_moderator_of_community_with_name(
-            community_name=community_name):
+        if user_roles['is_moderator'] or user_roles['is_administrator']:
             raise ValidationError(
-                _('Only community administrators & moderators can ban community members.'),
+                _('You can\'t ban moderators or administrators of the community'),
             )
 
+    def _check_can_ban_users_with_ids_from_community_with_name(self, users_ids, community_name):
+        self._check_is_staff_of_community_with_name(
+            community_name=community_name,
+            message=_('Only community administrators & moderators can ban community members.'))
+
         Community = get_community_model()
-        if Community.is_user_with_username_banned_from_community_with_name(username=username,
-                                                                           community_name=community_name):
+        community_id = self._get_community_id_with_name(community_name)
+
+        if Community.banned_users.through.objects.filter(community_id=community_id, user_id__in=users_ids).exists():
             raise ValidationError(
                 _('User is already banned'),
             )
 
-        if Community.is_user_with_username_moderator_of_community_with_name(username=username,
-                                                                            community_name=community_name) or Community.is_user_with_username_administrator_of_community_with_name(
-            username=username, community_name=community_name):
+        if self._get_staff_memberships_of_users_with_ids(users_ids=users_ids, community_id=community_id).exists():
             raise ValidationError(
                 _('You can\'t ban moderators or administrators of the community'),
             )
 
-    def _check_can_unban_user_with_username_from_community_with_name(self, username, community_name):
-        if not self.is_administrator_of_community_with_name(
-                community_name=community_name) and not self.is_moderator_of_community_with_name(
-            community_name=community_name):
+    def _check_can_unban_users_with_ids_from_community_with_name(self, users_ids, community_name):
+        self._check_is_staff_of_community_with_name(
+            community_name=community_name,
+            message=_('Only community administrators & moderators can ban community members.'))
+
+        Community = get_community_model()
+        banned_users_count = Community.banned_users.through.objects.filter(
+            community__name=community_name, user_id__in=users_ids).count()
+
+        if banned_users_count != len(users_ids):
             raise ValidationError(
-                _('Only community administrators & moderators can ban community members.'),
+                _('Can\'t unban a not-banned user.'),
             )
 
-        Community = get_community_model()
-        if not Community.is_user_with_username_banned_from_community_with_name(username=username,
-                                                                               community_name=community_name):
+    def _check_can_remove_members_with_ids_from_community_with_name(self, users_ids, community_name):
+        self._check_is_staff_of_community_with_name(
+            community_name=community_name,
+            message=_('Only community administrators & moderators can remove community members.'))
+
+        CommunityMembership = get_community_membership_model()
+        community_id = self._get_community_id_with_name(community_name)
+
+        members_count = CommunityMembership.objects.filter(community_id=community_id, user_id__in=users_ids).count()
+
+        if members_count != len(users_ids):
+            raise ValidationError(
+                _('Can\'t remove a user that is not part of the community.'),
+            )
+
+        if self._get_staff_memberships_of_users_with_ids(users_ids=users_ids, community_id=community_id).exists():
+            raise ValidationError(
+                _('You can\'t remove moderators or administrators of the community'),
+            )
+
+    def _get_staff_memberships_of_users_with_ids(self, users_ids, community_id):
+        CommunityMembership = get_community_membership_model()
+        return CommunityMembership.objects.filter(Q(is_administrator=True) | Q(is_moderator=True),
+                                                  community_id=community_id, user_id__in=users_ids)
+
+    def _check_can_unban_user_with_username_from_community_with_name(self, username, community_name):
+        self._check_is_staff_of_community_with_name(
+            community_name=community_name,
+            message=_('Only community administrators & moderators can ban community members.'))
+
+        if not self.get_roles_of_user_with_username_in_community_with_name(username=username,
+                                                                           community_name=community_name)['is_banned']:
             raise ValidationError(
                 _('Can\'t unban a not-banned user.'),
             )
 
     def _check_can_add_administrator_with_username_to_community_with_name(self, username, community_name):
-        if not self.is_creator_of_community_with_name(community_name=community_name):
+        if not self.get_roles_in_community_with_name(community_name=community_name)['is_creator']:
             raise ValidationError(
                 _('Only the creator of the community can add other administrators.'),
             )
 
-        Community = get_community_model()
+        user_roles = self.get_roles_of_user_with_username_in_community_with_name(username=username,
+                                                                                 community_name=community_name)
 
-        if Community.is_user_with_username_administrator_of_community_with_name(username=username,
-                                                                                community_name=community_name):
+        if user_roles['is_administrator']:
             raise ValidationError(
                 _('User is already an administrator.'),
             )
 
-        if not Community.is_user_with_username_member_of_community_with_name(username=username,
-                                                                             community_name=community_name):
+        if not user_roles['is_member']:
             raise ValidationError(
                 _('Can\'t make administrator a user that is not part of the community.'),
             )
 
     def _check_can_remove_administrator_with_username_to_community_with_name(self, username, community_name):
-        if not self.is_creator_of_community_with_name(community_name=community_name):
+        if not self.get_roles_in_community_with_name(community_name=community_name)['is_creator']:
             raise ValidationError(
                 _('Only the creator of the community can remove other administrators.'),
             )
 
-        Community = get_community_model()
-
-        if not Community.is_user_with_username_administrator_of_community_with_name(username=username,
-                                                                                    community_name=community_name):
+        if not self.get_roles_of_user_with_username_in_community_with_name(
+                username=username, community_name=community_name)['is_administrator']:
             raise ValidationError(
                 _('User to remove is not an administrator.'),
             )
@@ -2388,41 +2766,37 @@ class User(AbstractUser):
         return True
 
     def _check_can_add_moderator_with_username_to_community_with_name(self, username, community_name):
-        if not self.is_administrator_of_community_with_name(community_name=community_name):
+        if not self.get_roles_in_community_with_name(community_name=community_name)['is_administrator']:
             raise ValidationError(
                 _('Only administrators of the community can add other moderators.'),
             )
 
-        Community = get_community_model()
+        user_roles = self.get_roles_of_user_with_username_in_community_with_name(username=username,
+                                                                                 community_name=community_name)
 
-        if Community.is_user_with_username_administrator_of_community_with_name(username=username,
-                                                                                community_name=community_name):
+        if user_roles['is_administrator']:
             raise ValidationError(
                 _('User is an administrator.'),
             )
 
-        if Community.is_user_with_username_moderator_of_community_with_name(username=username,
-                                                                            community_name=community_name):
+        if user_roles['is_moderator']:
             raise ValidationError(
                 _('User is already a moderator.'),
             )
 
-        if not Community.is_user_with_username_member_of_community_with_name(username=username,
-                                                                             community_name=community_name):
+        if not user_roles['is_member']:
             raise ValidationError(
                 _('Can\'t make moderator a user that is not part of the community.'),
             )
 
     def _check_can_remove_moderator_with_username_to_community_with_name(self, username, community_name):
-        if not self.is_administrator_of_community_with_name(community_name=community_name):
+        if not self.get_roles_in_community_with_name(community_name=community_name)['is_administrator']:
             raise ValidationError(
                 _('Only administrators of the community can remove other moderators.'),
             )
 
-        Community = get_community_model()
-
-        if not Community.is_user_with_username_moderator_of_community_with_name(username=username,
-                                                                                community_name=community_name):
+        if not self.get_roles_of_user_with_username_in_community_with_name(
+                username=username, community_name=community_name)['is_moderator']:
             raise ValidationError(
                 _('User to remove is not an moderator.'),
             )
@@ -2662,6 +3036,259 @@ class UserNotificationsSettings(models.Model):
         self.save()
 
 
+class UserCounts(models.Model):
+    """
+    Denormalized counters of a user, so users do not count follows, connections, posts and unread notifications
+    on every read.
+    Kept in sync on write, the count_* methods of the user remain the source of truth to reconcile them.
+    """
+    COUNT_NAMES = ('followers_count', 'following_count', 'connections_count', 'posts_count', 'public_posts_count',
+                   'unread_notifications_count',)
+
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='counts')
+    followers_count = models.PositiveIntegerField(_('followers count'), default=0)
+    following_count = models.PositiveIntegerField(_('following count'), default=0)
+    connections_count = models.PositiveIntegerField(_('connections count'), default=0)
+    posts_count = models.PositiveIntegerField(_('posts count'), default=0)
+    public_posts_count = models.PositiveIntegerField(_('public posts count'), default=0)
+    unread_notifications_count = models.PositiveIntegerField(_('unread notifications count'), default=0)
+
+    class Meta:
+        verbose_name = _('user counts')
+        verbose_name_plural = _('users counts')
+
+    @classmethod
+    def create_counts(cls, user):
+        return cls.objects.create(user=user)
+
+    @classmethod
+    def increment_count_for_users_with_ids(cls, users_ids, count_name):
+        cls.objects.filter(user_id__in=users_ids).update(**{count_name: F(count_name) + 1})
+
+    @classmethod
+    def decrement_count_for_users_with_ids(cls, users_ids, count_name, amount=1):
+        # Never go below zero, a drift is left to reconcile_counts_for_users_with_ids
+        if amount > 1:
+            cls.objects.filter(user_id__in=users_ids, **{'%s__lt' % count_name: amount}).update(**{count_name: 0})
+
+        cls.objects.filter(user_id__in=users_ids, **{'%s__gte' % count_name: amount}).update(
+            **{count_name: F(count_name) - amount})
+
+    @classmethod
+    def reconcile_counts_for_users_with_ids(cls, users_ids):
+        """
+        Recomputes the counts of the given users with one grouped query per counter
+        and fixes the ones that drifted, creating the missing ones.
+        :param users_ids:
+        :return: the amount of users whose counts were fixed or created
+        """
+        Follow = get_follow_model()
+        Connection = get_connection_model()
+        Post = get_post_model()
+        Circle = get_circle_model()
+        Notification = get_notification_model()
+
+        users_ids = list(users_ids)
+        actual_counts = {user_id: dict.fromkeys(cls.COUNT_NAMES, 0) for user_id in users_ids}
+
+        counts_queries = (
+            ('followers_count', Follow.objects.all(), 'followed_user_id'),
+            ('following_count', Follow.objects.all(), 'user_id'),
+            ('connections_count', Connection.objects.all(), 'user_id'),
+            ('posts_count', Post.objects.all(), 'creator_id'),
+            ('public_posts_count', Post.objects.filter(circles__id=Circle.get_world_circle_id()), 'creator_id'),
+            ('unread_notifications_count', Notification.objects.filter(read=False), 'owner_id'),
+        )
+
+        for count_name, queryset, user_field in counts_queries:
+            grouped_counts = queryset.filter(**{'%s__in' % user_field: users_ids}).order_by().values(
+                user_field).annotate(count=Count('id')).values_list(user_field, 'count')
+
+            for user_id, count in grouped_counts:
+                actual_counts[user_id][count_name] = count
+
+        fixed_users_count = 0
+
+        for counts in cls.objects.filter(user_id__in=users_ids):
+            user_actual_counts = actual_counts.pop(counts.user_id)
+            drifted_counts = {count_name: count for count_name, count in user_actual_counts.items() if
+                              getattr(counts, count_name) != count}
+            if drifted_counts:
+                cls.objects.filter(pk=counts.pk).update(**drifted_counts)
+                fixed_users_count += 1
+
+        # What is left are users without counts, e.g. created with bulk_create
+        if actual_counts:
+            cls.objects.bulk_create(
+                [cls(user_id=user_id, **user_actual_counts) for user_id, user_actual_counts in actual_counts.items()])
+            fixed_users_count += len(actual_counts)
+
+        return fixed_users_count
+
+    @classmethod
+    def decrement_counts_of_users_related_to_user_with_id(cls, user_id):
+        """
+        Decrements the counts the follows and connections of the user add to other users, which deleting
+        the user cascades over without updating them
+        """
+        Follow = get_follow_model()
+        Connection = get_connection_model()
+
+        cls.decrement_count_for_users_with_ids(
+            list(Follow.objects.filter(user_id=user_id).values_list('followed_user_id', flat=True)),
+            'followers_count')
+        cls.decrement_count_for_users_with_ids(
+            list(Follow.objects.filter(followed_user_id=user_id).values_list('user_id', flat=True)),
+            'following_count')
+        cls.decrement_count_for_users_with_ids(
+            list(Connection.objects.filter(target_user_id=user_id).values_list('user_id', flat=True)),
+            'connections_count')
+
+
+class UserSearchEntry(models.Model):
+    """
+    The username and profile name of a user normalized for search, with their trigrams in UserSearchTrigram
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='search_entry')
+    username = models.CharField(max_length=settings.USERNAME_MAX_LENGTH, db_index=True)
+    name = models.CharField(max_length=settings.PROFILE_NAME_MAX_LENGTH, db_index=True)
+
+    @classmethod
+    def update_entry_for_user(cls, user):
+        username = normalize_search_text(user.username)
+        name = normalize_search_text(UserProfile.objects.filter(user_id=user.pk).values_list('name', flat=True).first())
+
+        entry = cls.objects.filter(user_id=user.pk).first()
+
+        if entry and entry.username == username and entry.name == name:
+            return entry
+
+        if entry:
+            entry.username = username
+            entry.name = name
+            entry.save()
+            entry.trigrams.all().delete()
+        else:
+            entry = cls.objects.create(user_id=user.pk, username=username, name=name)
+
+        UserSearchTrigram.objects.bulk_create(
+            [UserSearchTrigram(entry=entry, trigram=trigram) for trigram in entry.get_trigrams()])
+
+        return entry
+
+    @classmethod
+    def rebuild_entries_for_users_with_ids(cls, users_ids):
+        """
+        Recreates the search entries of the given users with one insert per table
+        """
+        cls.objects.filter(user_id__in=users_ids).delete()
+
+        entries = [cls(user_id=user_id, username=normalize_search_text(username), name=normalize_search_text(name))
+                   for user_id, username, name in
+                   User.objects.filter(pk__in=users_ids).values_list('id', 'username', 'profile__name')]
+        cls.objects.bulk_create(entries)
+
+        # MySQL does not return the ids of bulk inserted rows
+        entries = cls.objects.filter(user_id__in=users_ids)
+        UserSearchTrigram.objects.bulk_create(
+            [UserSearchTrigram(entry=entry, trigram=trigram) for entry in entries for trigram in entry.get_trigrams()])
+
+        return len(entries)
+
+    @classmethod
+    def search_users_ids(cls, query, users_ids=None, max_results=None):
+        """
+        Returns the ids of the users whose username or profile name match the query, best first:
+        the exact username, then the usernames and names starting with it, then the ones containing it
+        :param users_ids: restricts the search to these users ids or ids subquery
+        """
+        entries = cls.objects.all()
+
+        if users_ids is not None:
+            entries = entries.filter(user_id__in=users_ids)
+
+        return search_entries_keys(entries, UserSearchTrigram, query=query, fields=('username', 'name'),
+                                   key_field='user_id', order_by=('username',),
+                                   max_results=max_results or settings.SEARCH_MAX_RESULTS)
+
+    def get_trigrams(self):
+        return make_search_trigrams(self.username) | make_search_trigrams(self.name)
+
+
+class UserSearchTrigram(models.Model):
+    entry = models.ForeignKey(UserSearchEntry, on_delete=models.CASCADE, related_name='trigrams')
+    trigram = models.CharField(max_length=3)
+
+    class Meta:
+        unique_together = ('trigram', 'entry',)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL, dispatch_uid='update_user_search_entry')
+def update_user_search_entry(sender, instance=None, **kwargs):
+    """"
+    Keep the search entry of the user in sync with its username
+    """
+    UserSearchEntry.update_entry_for_user(instance)
+
+
+@receiver(post_save, sender=UserProfile, dispatch_uid='update_user_profile_search_entry')
+def update_user_profile_search_entry(sender, instance=None, **kwargs):
+    """"
+    Keep the search entry of the user in sync with its profile name
+    """
+    UserSearchEntry.update_entry_for_user(instance.user)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL, dispatch_uid='update_user_typeahead_item')
+def update_user_typeahead_item(sender, instance=None, **kwargs):
+    """"
+    Keep the typeahead index of this process in sync with the username
+    """
+    _update_user_typeahead_item_on_commit(instance.pk)
+
+
+@receiver(post_save, sender=UserProfile, dispatch_uid='update_user_profile_typeahead_item')
+def update_user_profile_typeahead_item(sender, instance=None, **kwargs):
+    """"
+    Keep the typeahead index of this process in sync with the profile avatar
+    """
+    _update_user_typeahead_item_on_commit(instance.user_id)
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL, dispatch_uid='remove_user_typeahead_item')
+def remove_user_typeahead_item(sender, instance=None, **kwargs):
+    user_id = instance.pk
+    transaction.on_commit(lambda: get_users_typeahead_index().remove_item(user_id))
+
+
+def _update_user_typeahead_item_on_commit(user_id):
+    users_typeahead_index = get_users_typeahead_index()
+
+    if not users_typeahead_index.is_loaded():
+        return
+
+    def update_item():
+        user = User.objects.filter(pk=user_id).values_list('id', 'username', 'profile__avatar').first()
+        if user:
+            users_typeahead_index.update_item(*make_user_typeahead_item(*user))
+
+    transaction.on_commit(update_item)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL, dispatch_uid='bootstrap_user_counts')
+def create_user_counts(sender, instance=None, created=False, **kwargs):
+    """"
+    Create the counts for users
+    """
+    if created:
+        bootstrap_user_counts(instance)
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL, dispatch_uid='decrement_related_users_counts')
+def decrement_related_users_counts(sender, instance=None, **kwargs):
+    UserCounts.decrement_counts_of_users_related_to_user_with_id(instance.pk)
+
+
 @receiver(post_save, sender=settings.AUTH_USER_MODEL, dispatch_uid='bootstrap_notifications_settings')
 def create_user_notifications_settings(sender, instance=None, created=False, **kwargs):
     """"
@@ -2680,6 +3307,10 @@ def bootstrap_user_notifications_settings(user):
     return UserNotificationsSettings.create_notifications_settings(user=user)
 
 
+def bootstrap_user_counts(user):
+    return UserCounts.create_counts(user=user)
+
+
 def bootstrap_user_auth_token(user):
     return Token.objects.create(user=user)
 
@@ -0,0 +1,151 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+
+from openbook_common.utils.model_loaders import get_connection_model, get_community_model
+
+# Bumped on every write to a relationship, invalidating all the snapshots loaded before it
+_relationships_generation = 0
+
+
+class UserRelationshipsSnapshot:
+    """
+    The follows, connections, communities and muted posts of a user, each kind loaded into memory
+    the first time it is needed, so the user predicates don't run a query per serialized item.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._relationships = {}
+        self._generation = _relationships_generation
+
+    def get_followed_users_ids(self):
+        return self._get_relationship('followed_users_ids', self._load_followed_users_ids)
+
+    def get_connections_circles_ids(self):
+        """
+        :return: dict of the connected users ids to the ids of the circles their connection is in
+        """
+        return self._get_relationship('connections_circles_ids', self._load_connections_circles_ids)
+
+    def get_confirmed_connections_users_ids(self):
+        """
+        :return: ids of the users whose connection to the user has circles
+        """
+        return self._get_relationship('confirmed_connections_users_ids', self._load_confirmed_connections_users_ids)
+
+    def get_communities_memberships(self):
+        """
+        :return: dict of the names of the communities the user is a member of to (is_administrator, is_moderator)
+        """
+        return self._get_relationship('communities_memberships', self._load_communities_memberships)
+
+    def get_created_communities_names(self):
+        return self._get_relationship('created_communities_names', self._load_created_communities_names)
+
+    def get_banned_of_communities_names(self):
+        return self._get_relationship('banned_of_communities_names', self._load_banned_of_communities_names)
+
+    def get_favorite_communities_names(self):
+        return self._get_relationship('favorite_communities_names', self._load_favorite_communities_names)
+
+    def get_muted_posts_ids(self):
+        return self._get_relationship('muted_posts_ids', self._load_muted_posts_ids)
+
+    def get_community_id(self, community_name):
+        Community = get_community_model()
+        return self._get_relationship(('community_id', community_name),
+                                      lambda: Community.get_community_id_with_name(community_name))
+
+    def get_community(self, community_name):
+        Community = get_community_model()
+        return self._get_relationship(('community', community_name),
+                                      lambda: Community.get_community_with_name(community_name))
+
+    def get_community_roles(self, community_name, username):
+        """
+        :return: the roles of the user with username in the community, see Community.COMMUNITY_ROLES
+        """
+        Community = get_community_model()
+        return self._get_relationship(('community_roles', community_name, username),
+                                      lambda: Community.get_community_with_name_roles_for_user_with_username(
+                                          community_name=community_name, username=username))
+
+    def _get_relationship(self, name, load):
+        if self._generation != _relationships_generation:
+            self._relationships = {}
+            self._generation = _relationships_generation
+
+        if name not in self._relationships:
+            self._relationships[name] = load()
+
+        return self._relationships[name]
+
+    def _load_followed_users_ids(self):
+        return set(self.user.follows.values_list('followed_user_id', flat=True))
+
+    def _load_connections_circles_ids(self):
+        connections_circles_ids = {}
+
+        for user_id, circle_id in self.user.connections.values_list('target_connection__user_id', 'circles__id'):
+            circles_ids = connections_circles_ids.setdefault(user_id, set())
+            if circle_id is not None:
+                circles_ids.add(circle_id)
+
+        return connections_circles_ids
+
+    def _load_confirmed_connections_users_ids(self):
+        Connection = get_connection_model()
+        return set(Connection.objects.filter(target_connection__user_id=self.user.pk,
+                                             circles__isnull=False).values_list('user_id', flat=True))
+
+    def _load_communities_memberships(self):
+        return {community_name: (is_administrator, is_moderator) for community_name, is_administrator, is_moderator in
+                self.user.communities_memberships.values_list('community__name', 'is_administrator',
+                                                              'is_moderator')}
+
+    def _load_created_communities_names(self):
+        return set(self.user.created_communities.values_list('name', flat=True))
+
+    def _load_banned_of_communities_names(self):
+        return set(self.user.banned_of_communities.values_list('name', flat=True))
+
+    def _load_favorite_communities_names(self):
+        return set(self.user.favorite_communities.values_list('name', flat=True))
+
+    def _load_muted_posts_ids(self):
+        return set(self.user.post_mutes.values_list('post_id', flat=True))
+
+
+def invalidate_relationships_snapshots():
+    global _relationships_generation
+    _relationships_generation += 1
+
+
+RELATIONSHIPS_MODELS = (
+    'openbook_follows.Follow',
+    'openbook_connections.Connection',
+    'openbook_communities.Community',
+    'openbook_communities.CommunityMembership',
+    'openbook_communities.CommunityInvite',
+    'openbook_posts.PostMute',
+)
+
+RELATIONSHIPS_THROUGH_MODELS = (
+    'openbook_circles.Circle_connections',
+    'openbook_communities.Community_starrers',
+    'openbook_communities.Community_banned_users',
+)
+
+
+def _invalidate_relationships_snapshots_on_change(sender, **kwargs):
+    invalidate_relationships_snapshots()
+
+
+for relationships_model in RELATIONSHIPS_MODELS:
+    post_save.connect(_invalidate_relationships_snapshots_on_change, sender=relationships_model,
+                      dispatch_uid='invalidate_relationships_snapshots_on_save_%s' % relationships_model)
+    post_delete.connect(_invalidate_relationships_snapshots_on_change, sender=relationships_model,
+                        dispatch_uid='invalidate_relationships_snapshots_on_delete_%s' % relationships_model)
+
+for relationships_through_model in RELATIONSHIPS_THROUGH_MODELS:
+    m2m_changed.connect(_invalidate_relationships_snapshots_on_change, sender=relationships_through_model,
+                        dispatch_uid='invalidate_relationships_snapshots_on_m2m_change_%s' % relationships_through_model)
@@ -2,8 +2,10 @@
 import random
 import tempfile
 import uuid
+from io import StringIO
 from urllib.parse import urlsplit  # Python 3
 from PIL import Image
+from django.core.management import call_command
 from django.urls import reverse
 from faker import Faker
 from unittest import mock
@@ -11,7 +13,7 @@ from django.core import mail
 from rest_framework import status
 from rest_framework.test import APITestCase
 from django.contrib.auth import authenticate
-from openbook_auth.models import User, UserProfile
+from openbook_auth.models import User, UserProfile, UserCounts
 
 import logging
 import json
@@ -19,7 +21,8 @@ import json
 from openbook_auth.views import UserSettings
 from openbook_circles.models import Circle
 from openbook_common.tests.helpers import make_user, make_authentication_headers_for_user, make_user_bio, \
-    make_user_location, make_user_avatar, make_user_cover, make_badge
+    make_user_location, make_user_avatar, make_user_cover, make_badge, make_fake_post_text, make_circle, \
+    make_community
 from openbook_invitations.models import UserInvite
 
 fake = Faker()
@@ -1111,6 +1114,36 @@ class AuthenticatedUserDeleteTests(APITestCase):
 
         self.assertFalse(User.objects.filter(pk=user.pk).exists())
 
+    def test_deleting_user_decrements_counts_of_related_users(self):
+        """
+        should decrement the followers, following and connections counts of the users related to a deleted user
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        user_password = fake.password()
+        user.set_password(user_password)
+        user.save()
+
+        followed_user = make_user()
+        follower = make_user()
+        connected_user = make_user()
+
+        user.follow_user_with_id(followed_user.pk)
+        follower.follow_user_with_id(user.pk)
+        user.connect_with_user_with_id(connected_user.pk)
+        connected_user.confirm_connection_with_user_with_id(user.pk)
+
+        response = self.client.post(self._get_url(), {
+            'password': user_password
+        }, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(UserCounts.objects.get(user_id=followed_user.pk).followers_count, 0)
+        self.assertEqual(UserCounts.objects.get(user_id=follower.pk).following_count, 0)
+        self.assertEqual(UserCounts.objects.get(user_id=connected_user.pk).connections_count, 0)
+
     def test_cant_delete_user_with_wrong_password(self):
         """
         should not be able to delete the authenticated user with a wrong password and return 401
@@ -1238,6 +1271,9 @@ class UserAPITests(APITestCase):
     """
     UserAPI
     """
+    fixtures = [
+        'openbook_circles/fixtures/circles.json'
+    ]
 
     def test_can_retrieve_user(self):
         """
@@ -1258,12 +1294,221 @@ class UserAPITests(APITestCase):
         response_username = parsed_response['username']
         self.assertEqual(response_username, user.username)
 
+    def test_retrieves_posts_count_visible_to_user(self):
+        """
+        should retrieve the public posts count unless the user is connected with the retrieved user
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        foreign_user = make_user()
+        foreign_user.create_public_post(text=make_fake_post_text())
+        circle = make_circle(creator=foreign_user)
+        foreign_user.create_encircled_post(text=make_fake_post_text(), circles_ids=[circle.pk])
+
+        url = self._get_url(foreign_user)
+
+        response = self.client.get(url, **headers)
+        self.assertEqual(json.loads(response.content)['posts_count'], 1)
+
+        foreign_user.connect_with_user_with_id(user.pk, circles_ids=[circle.pk])
+        user.confirm_connection_with_user_with_id(foreign_user.pk)
+
+        response = self.client.get(url, **headers)
+        self.assertEqual(json.loads(response.content)['posts_count'], 2)
+
+    def test_reconcile_user_counts_fixes_drifted_counts(self):
+        """
+        should fix drifted user counts and create the missing ones
+        """
+        user = make_user()
+        follower = make_user()
+        follower.follow_user_with_id(user.pk)
+        user.create_public_post(text=make_fake_post_text())
+
+        UserCounts.objects.filter(user_id=user.pk).update(followers_count=7, posts_count=0)
+        UserCounts.objects.filter(user_id=follower.pk).delete()
+
+        call_command('reconcile_user_counts', stdout=StringIO())
+
+        user_counts = UserCounts.objects.get(user_id=user.pk)
+        self.assertEqual(user_counts.followers_count, 1)
+        self.assertEqual(user_counts.posts_count, 1)
+        self.assertEqual(user_counts.public_posts_count, 1)
+        self.assertEqual(UserCounts.objects.get(user_id=follower.pk).following_count, 1)
+
     def _get_url(self, user):
         return reverse('user', kwargs={
             'user_username': user.username
         })
 
 
+class UserRelationshipsSnapshotTests(APITestCase):
+    """
+    UserRelationshipsSnapshot
+    """
+    fixtures = [
+        'openbook_circles/fixtures/circles.json'
+    ]
+
+    def test_snapshot_predicates_match_queried_predicates(self):
+        """
+        should answer the relationship predicates the same with and without the relationships snapshot
+        """
+        user = make_user()
+        followed_user = make_user()
+        fully_connected_user = make_user()
+        pending_connection_user = make_user()
+        unrelated_user = make_user()
+
+        circle = make_circle(creator=user)
+
+        user.follow_user_with_id(followed_user.pk)
+        user.connect_with_user_with_id(fully_connected_user.pk, circles_ids=[circle.pk])
+        fully_connected_user.confirm_connection_with_user_with_id(user.pk)
+        pending_connection_user.connect_with_user_with_id(user.pk)
+
+        community_creator = make_user()
+        created_community = make_community(creator=user)
+        joined_community = make_community(creator=community_creator)
+        banned_community = make_community(creator=community_creator)
+        user.join_community_with_name(joined_community.name)
+        user.favorite_community_with_name(joined_community.name)
+        community_creator.ban_user_with_username_from_community_with_name(username=user.username,
+                                                                          community_name=banned_community.name)
+
+        post = followed_user.create_public_post(text=make_fake_post_text())
+        user.mute_post_with_id(post.pk)
+
+        snapshot_user = User.objects.get(pk=user.pk)
+        snapshot_user.enable_relationships_snapshot()
+
+        users_ids = [followed_user.pk, fully_connected_user.pk, pending_connection_user.pk, unrelated_user.pk]
+        communities_names = [created_community.name, joined_community.name, banned_community.name]
+
+        predicates = self._get_relationships_predicates(user, users_ids=users_ids, circle_id=circle.pk,
+                                                        communities_names=communities_names, post_id=post.pk)
+        snapshot_predicates = self._get_relationships_predicates(snapshot_user, users_ids=users_ids,
+                                                                 circle_id=circle.pk,
+                                                                 communities_names=communities_names,
+                                                                 post_id=post.pk)
+
+        self.assertEqual(predicates, snapshot_predicates)
+        self.assertEqual(snapshot_predicates['is_fully_connected'], [False, True, False, False])
+        self.assertEqual(snapshot_predicates['is_pending_confirm_connection'], [False, False, True, False])
+        self.assertEqual(snapshot_predicates['is_banned'], [False, False, True])
+
+    def test_snapshot_predicates_do_not_query_once_loaded(self):
+        """
+        should not run a query per checked user once the relationships snapshot is loaded
+        """
+        user = make_user()
+        users = [make_user() for i in range(5)]
+
+        for followed_user in users[:3]:
+            user.follow_user_with_id(followed_user.pk)
+
+        user.enable_relationships_snapshot()
+        user.is_following_user_with_id(users[0].pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual([user.is_following_user_with_id(other_user.pk) for other_user in users],
+                             [True, True, True, False, False])
+
+    def test_snapshot_is_invalidated_by_writes(self):
+        """
+        should reload the relationships snapshot after a relationship changed, even from another user instance
+        """
+        user = make_user()
+        user_to_follow = make_user()
+        community = make_community(creator=user_to_follow)
+
+        user.enable_relationships_snapshot()
+
+        self.assertFalse(user.is_following_user_with_id(user_to_follow.pk))
+        self.assertFalse(user.is_member_of_community_with_name(community.name))
+
+        User.objects.get(pk=user.pk).follow_user_with_id(user_to_follow.pk)
+        self.assertTrue(user.is_following_user_with_id(user_to_follow.pk))
+
+        user.join_community_with_name(community.name)
+        self.assertTrue(user.is_member_of_community_with_name(community.name))
+
+        user.unfollow_user_with_id(user_to_follow.pk)
+        self.assertFalse(user.is_following_user_with_id(user_to_follow.pk))
+
+    def test_community_roles_match_predicates_and_are_cached(self):
+        """
+        should answer the roles of users in a community like the predicates, querying them once per request
+        """
+        user = make_user()
+        community_creator = make_user()
+        community = make_community(creator=community_creator)
+        user.join_community_with_name(community.name)
+        user.favorite_community_with_name(community.name)
+        community_creator.add_moderator_with_username_to_community_with_name(username=user.username,
+                                                                              community_name=community.name)
+
+        invited_user = make_user()
+        community_creator.invite_user_with_username_to_community_with_name(username=invited_user.username,
+                                                                           community_name=community.name)
+
+        community_creator.enable_relationships_snapshot()
+
+        self.assertEqual(community_creator.get_roles_of_user_with_username_in_community_with_name(
+            username=user.username, community_name=community.name), {
+            'is_member': True,
+            'is_administrator': False,
+            'is_moderator': True,
+            'is_creator': False,
+            'is_banned': False,
+            'is_invited': False,
+            'is_favorite': True,
+        })
+        self.assertTrue(community_creator.get_roles_of_user_with_username_in_community_with_name(
+            username=invited_user.username, community_name=community.name)['is_invited'])
+
+        creator_roles = community_creator.get_roles_in_community_with_name(community_name=community.name)
+        self.assertTrue(creator_roles['is_creator'] and creator_roles['is_administrator'])
+
+        with self.assertNumQueries(0):
+            community_creator.get_roles_in_community_with_name(community_name=community.name)
+
+    def test_community_roles_are_answered_with_a_single_query(self):
+        """
+        should answer the roles of a user in a community with a single query without the relationships snapshot
+        """
+        user = make_user()
+        community = make_community(creator=make_user())
+        user.join_community_with_name(community.name)
+
+        with self.assertNumQueries(1):
+            roles = user.get_roles_in_community_with_name(community_name=community.name)
+
+        self.assertTrue(roles['is_member'])
+
+    def _get_relationships_predicates(self, user, users_ids, circle_id, communities_names, post_id):
+        return {
+            'is_following': [user.is_following_user_with_id(user_id) for user_id in users_ids],
+            'is_connected': [user.is_connected_with_user_with_id(user_id) for user_id in users_ids],
+            'is_fully_connected': [user.is_fully_connected_with_user_with_id(user_id) for user_id in users_ids],
+            'is_pending_confirm_connection': [user.is_pending_confirm_connection_for_user_with_id(user_id) for
+                                              user_id in users_ids],
+            'is_connected_in_circle': [user.is_connected_with_user_with_id_in_circle_with_id(user_id, circle_id) for
+                                       user_id in users_ids],
+            'is_connected_in_circles': [user.is_connected_with_user_with_id_in_circles_with_ids(user_id, [circle_id])
+                                        for user_id in users_ids],
+            'is_member': [user.is_member_of_community_with_name(name) for name in communities_names],
+            'is_administrator': [user.is_administrator_of_community_with_name(name) for name in communities_names],
+            'is_moderator': [user.is_moderator_of_community_with_name(name) for name in communities_names],
+            'is_creator': [user.is_creator_of_community_with_name(name) for name in communities_names],
+            'is_banned': [user.is_banned_from_community_with_name(name) for name in communities_names],
+            'has_favorite': [user.has_favorite_community_with_name(name) for name in communities_names],
+            'is_member_of_communities': user.is_member_of_communities(),
+            'has_muted_post': user.has_muted_post_with_id(post_id),
+        }
+
+
 class UsersAPITests(APITestCase):
     """
     UsersAPI
@@ -1304,6 +1549,29 @@ class UsersAPITests(APITestCase):
         for lil_user in lil_users:
             self.assertIn(lil_user.username, response_usernames)
 
+    def test_ranks_queried_users(self):
+        """
+        should list the exact username first, then the usernames and names starting with the query, then
+        the ones containing it
+        """
+        containing_user = make_user(username='thejohnny')
+        prefix_user = make_user(username='johnny')
+        exact_user = make_user(username='john')
+        accented_name_user = make_user()
+        accented_name_user.profile.name = 'Jóhn Doe'
+        accented_name_user.profile.save()
+
+        url = self._get_url()
+        response = self.client.get(url, {
+            'query': 'John'
+        })
+
+        response_users_ids = [user['id'] for user in json.loads(response.content)]
+
+        self.assertEqual(response_users_ids[0], exact_user.pk)
+        self.assertEqual(set(response_users_ids[1:3]), {prefix_user.pk, accented_name_user.pk})
+        self.assertEqual(response_users_ids[3], containing_user.pk)
+
     def test_can_limit_amount_of_queried_users(self):
         total_users = 10
         limited_users = 5
@@ -0,0 +1,18 @@
+# Generated by Django 2.2 on 2026-10-16 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('openbook_categories', '0006_merge_20190402_1244'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='trending_communities_stale',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -1,14 +1,19 @@
 from django.conf import settings
 from django.db import models
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
 from django.utils import timezone
 
 # Create your models here.
 from openbook_auth.models import User
 from django.utils.translation import ugettext_lazy as _
 
+from openbook_common.utils.reference_data import get_reference_data, register_reference_data
 from openbook_common.validators import hex_color_validator
 from openbook_communities.models import Community
 
+CATEGORIES_REFERENCE_DATA = 'categories'
+
 
 class Category(models.Model):
     creator = models.ForeignKey(User, on_delete=models.SET_NULL, related_name='created_categories', null=True)
@@ -23,6 +28,8 @@ class Category(models.Model):
     color = models.CharField(_('color'), max_length=settings.COLOR_ATTR_MAX_LENGTH, blank=False, null=False,
                              validators=[hex_color_validator])
     order = models.IntegerField(unique=False, default=100)
+    # Whether the communities of the category changed since its trending communities were last ranked
+    trending_communities_stale = models.BooleanField(default=False)
 
     @classmethod
     def create_category(cls, creator, name, color, order=None, title=None, description=None, avatar=None):
@@ -32,6 +39,18 @@ class Category(models.Model):
 
         return category
 
+    @classmethod
+    def get_categories(cls):
+        """
+        The categories ordered by order, from the reference data cache
+        :return:
+        """
+        return get_reference_data(CATEGORIES_REFERENCE_DATA, lambda: list(cls.objects.order_by('order')))
+
+    @classmethod
+    def is_name_of_category(cls, category_name):
+        return any(category.name == category_name for category in cls.get_categories())
+
     def save(self, *args, **kwargs):
         if not self.id:
             self.created = timezone.now()
@@ -39,3 +58,26 @@ class Category(models.Model):
 
     def __str__(self):
         return 'Category: ' + self.name
+
+
+register_reference_data(CATEGORIES_REFERENCE_DATA, models=(Category,))
+
+
+@receiver(m2m_changed, sender=Category.communities.through, dispatch_uid='mark_categories_trending_communities_stale')
+def mark_categories_trending_communities_stale(sender, instance=None, action=None, pk_set=None, **kwargs):
+    """"
+    Mark the trending communities of the categories whose communities changed as stale, the
+    refresh_trending_communities command ranks them again
+    """
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if isinstance(instance, Category):
+        categories_ids = [instance.pk]
+    elif action == 'pre_clear':
+        categories_ids = list(instance.categories.values_list('id', flat=True))
+    else:
+        categories_ids = list(pk_set)
+
+    if categories_ids:
+        Category.objects.filter(pk__in=categories_ids).update(trending_communities_stale=True)
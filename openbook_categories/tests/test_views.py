@@ -1,5 +1,7 @@
 import json
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from faker import Faker
 from rest_framework import status
@@ -42,5 +44,31 @@ class CategoriesAPITests(APITestCase):
             response_category_id = response_category.get('id')
             self.assertIn(response_category_id, categories_ids)
 
+    def test_retrieves_categories_from_cache_until_they_change(self):
+        """
+        should not query the categories again until a category is saved
+        """
+        user = make_user()
+        make_category()
+
+        url = self._get_url()
+        headers = make_authentication_headers_for_user(user)
+        self.client.get(url, **headers)
+
+        with CaptureQueriesContext(connection) as queries_context:
+            response = self.client.get(url, **headers)
+
+        self.assertEqual(len(json.loads(response.content)), 1)
+        self.assertFalse(any('openbook_categories_category' in query['sql'] for query in
+                             queries_context.captured_queries))
+
+        new_category = make_category()
+
+        response = self.client.get(url, **headers)
+
+        response_categories_ids = [category['id'] for category in json.loads(response.content)]
+        self.assertEqual(len(response_categories_ids), 2)
+        self.assertIn(new_category.pk, response_categories_ids)
+
     def _get_url(self):
         return reverse('categories')
@@ -8,7 +8,7 @@ from openbook_common.utils.model_loaders import get_category_model
 
 def category_name_exists(category_name):
     Category = get_category_model()
-    if not Category.objects.filter(name=category_name).exists():
+    if not Category.is_name_of_category(category_name):
         raise ValidationError(
             _('No category with the provided name exists.'),
         )
@@ -1,5 +1,7 @@
 from django.conf import settings
 from django.db import models
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 
 # Create your models here.
 from django.utils import timezone
@@ -7,11 +9,14 @@ from django.utils import timezone
 from openbook.settings import CIRCLE_MAX_LENGTH, COLOR_ATTR_MAX_LENGTH
 from openbook_auth.models import User
 from openbook_common.utils.model_loaders import get_connection_model
+from openbook_common.utils.reference_data import get_reference_data, invalidate_reference_data
 from openbook_connections.models import Connection
 from openbook_posts.models import Post
 from openbook_common.validators import hex_color_validator
 from django.utils.translation import ugettext_lazy as _
 
+WORLD_CIRCLE_REFERENCE_DATA = 'world_circle'
+
 
 class Circle(models.Model):
     creator = models.ForeignKey('openbook_auth.User', on_delete=models.CASCADE, related_name='circles', null=True)
@@ -46,7 +51,8 @@ class Circle(models.Model):
 
     @classmethod
     def get_world_circle(cls):
-        return Circle.objects.get(pk=cls.get_world_circle_id())
+        return get_reference_data(WORLD_CIRCLE_REFERENCE_DATA,
+                                  lambda: Circle.objects.get(pk=cls.get_world_circle_id()))
 
     @classmethod
     def get_world_circle_id(cls):
@@ -77,3 +83,13 @@ class Circle(models.Model):
 
     def __str__(self):
         return self.name
+
+
+@receiver(post_save, sender=Circle, dispatch_uid='invalidate_world_circle_on_save')
+@receiver(post_delete, sender=Circle, dispatch_uid='invalidate_world_circle_on_delete')
+def invalidate_world_circle(sender, instance=None, **kwargs):
+    """"
+    Invalidate the cached world circle, the circles of the users change too often to invalidate on every change
+    """
+    if instance.pk == Circle.get_world_circle_id():
+        invalidate_reference_data(WORLD_CIRCLE_REFERENCE_DATA)
@@ -0,0 +1,82 @@
+import random
+import string
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+import logging
+
+from openbook_common.utils.typeahead import TypeaheadIndex, get_users_typeahead_index, \
+    get_communities_typeahead_index
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Times typeahead searches against the users and communities indexes, also while the indexes are ' \
+           'rebuilt. With --synthetic it times an index of fake keys instead, which needs no database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--synthetic', type=int, default=0,
+                            help='Amount of fake keys to build an index with instead of using the database')
+        parser.add_argument('--runs', type=int, default=2000, help='Amount of searches of each kind to time')
+        parser.add_argument('--count', type=int, default=10, help='Most completions each search returns')
+
+    def handle(self, *args, **options):
+        if options['synthetic']:
+            keys = [_make_fake_key() for i in range(0, options['synthetic'])]
+            indexes = {
+                'synthetic': TypeaheadIndex(load_items=lambda: ((i, key, (i, key, None)) for i, key in
+                                                                enumerate(keys))),
+            }
+        else:
+            indexes = {
+                'users': get_users_typeahead_index(),
+                'communities': get_communities_typeahead_index(),
+            }
+
+        for name, index in indexes.items():
+            index.clear()
+
+            started = time.perf_counter()
+            # The first search loads the index
+            index.search('a', 1)
+            self.stdout.write('%s: loaded %d keys in %.1fms' % (name, len(index.keys),
+                                                                 (time.perf_counter() - started) * 1000))
+
+            if not index.keys:
+                self.stdout.write(self.style.ERROR('%s: there is nothing to search' % name))
+                continue
+
+            queries = [random.choice(index.keys)[0][:random.randint(1, 4)] for i in range(0, options['runs'])]
+
+            self._time_searches('%s' % name, index, queries, options['count'])
+
+            # Searching while another thread rebuilds the index
+            index.load_lock.acquire()
+            reloader = threading.Thread(target=index._reload)
+            reloader.start()
+            self._time_searches('%s during rebuild' % name, index, queries, options['count'])
+            reloader.join()
+
+    def _time_searches(self, name, index, queries, count):
+        timings = []
+
+        for query in queries:
+            started = time.perf_counter()
+            index.search(query, count)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        timings.sort()
+        self.stdout.write('%s: p50 %.3fms p95 %.3fms p99 %.3fms' % (
+            name, _percentile(timings, 50), _percentile(timings, 95), _percentile(timings, 99)))
+
+
+def _make_fake_key():
+    return ''.join(random.choice(string.ascii_lowercase + string.digits + '_') for i in
+                   range(0, random.randint(4, 20)))
+
+
+def _percentile(sorted_values, percentile):
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * percentile / 100))
+    return sorted_values[index]
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from openbook_common.utils.reference_data import get_reference_data_stats
+
+
+class Command(BaseCommand):
+    help = 'Prints the hits and misses of the reference data cache, summed over the processes sharing the cache'
+
+    def handle(self, *args, **options):
+        stats = get_reference_data_stats()
+
+        lookups = stats['hits'] + stats['misses']
+        hit_rate = stats['hits'] * 100 / lookups if lookups else 0
+
+        self.stdout.write('hits: %d' % stats['hits'])
+        self.stdout.write('misses: %d' % stats['misses'])
+        self.stdout.write('hit rate: %.1f%%' % hit_rate)
@@ -1,13 +1,18 @@
 # Create your models here.
 # Create your models here.
 from django.db import models
+from django.db.models import Prefetch
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
 # Create your views here.
 from openbook.settings import COLOR_ATTR_MAX_LENGTH
+from openbook_common.utils.reference_data import get_reference_data, register_reference_data
 from openbook_common.validators import hex_color_validator
 
+EMOJI_GROUPS_REFERENCE_DATA = 'emoji_groups'
+BADGES_REFERENCE_DATA = 'badges'
+
 
 class EmojiGroup(models.Model):
     keyword = models.CharField(_('keyword'), max_length=32, blank=False, null=False)
@@ -17,6 +22,29 @@ class EmojiGroup(models.Model):
     created = models.DateTimeField(editable=False)
     is_reaction_group = models.BooleanField(_('is reaction group'), default=False)
 
+    @classmethod
+    def get_emoji_groups(cls, is_reaction_group):
+        """
+        The emoji groups ordered by order, with their emojis ordered by order prefetched, from the reference data cache
+        :param is_reaction_group:
+        :return:
+        """
+        emoji_groups = get_reference_data(EMOJI_GROUPS_REFERENCE_DATA, cls._load_emoji_groups)
+        return [emoji_group for emoji_group in emoji_groups if emoji_group.is_reaction_group == is_reaction_group]
+
+    @classmethod
+    def get_reaction_emoji_group_with_id(cls, emoji_group_id):
+        for emoji_group in cls.get_emoji_groups(is_reaction_group=True):
+            if emoji_group.pk == int(emoji_group_id):
+                return emoji_group
+
+        raise cls.DoesNotExist
+
+    @classmethod
+    def _load_emoji_groups(cls):
+        return list(cls.objects.prefetch_related(
+            Prefetch('emojis', queryset=Emoji.objects.order_by('order'))).order_by('order'))
+
     def __str__(self):
         return 'EmojiGroup: ' + self.keyword
 
@@ -27,7 +55,8 @@ class EmojiGroup(models.Model):
         return super(EmojiGroup, self).save(*args, **kwargs)
 
     def has_emoji_with_id(self, emoji_id):
-        return self.emojis.filter(pk=emoji_id).exists()
+        # Answered from the prefetched emojis when the group comes from get_emoji_groups
+        return any(emoji.pk == int(emoji_id) for emoji in self.emojis.all())
 
 
 class Emoji(models.Model):
@@ -55,7 +84,29 @@ class Badge(models.Model):
     keyword_description = models.CharField(_('keyword_description'), max_length=64, blank=True, null=True, unique=True)
     created = models.DateTimeField(editable=False)
 
+    @classmethod
+    def get_badge_with_keyword(cls, keyword):
+        """
+        The badge with the given keyword from the reference data cache
+        :param keyword:
+        :return:
+        """
+        badges = get_reference_data(BADGES_REFERENCE_DATA, cls._load_badges)
+
+        try:
+            return badges[keyword]
+        except KeyError:
+            raise cls.DoesNotExist
+
+    @classmethod
+    def _load_badges(cls):
+        return {badge.keyword: badge for badge in cls.objects.all()}
+
     def save(self, *args, **kwargs):
         if not self.id:
             self.created = timezone.now()
         return super(Badge, self).save(*args, **kwargs)
+
+
+register_reference_data(EMOJI_GROUPS_REFERENCE_DATA, models=(EmojiGroup, Emoji))
+register_reference_data(BADGES_REFERENCE_DATA, models=(Badge,))
@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import serializers
 
 from openbook_common.models import Emoji, EmojiGroup
@@ -20,7 +21,8 @@ class EmojiGroupSerializer(serializers.ModelSerializer):
     emojis = serializers.SerializerMethodField()
 
     def get_emojis(self, obj):
-        emojis = obj.emojis.all().order_by('order')
+        # Prefetched ordered by order, see EmojiGroup.get_emoji_groups
+        emojis = obj.emojis.all()
 
         request = self.context['request']
         return EmojiSerializer(emojis, many=True, context={'request': request}).data
@@ -36,3 +38,15 @@ class EmojiGroupSerializer(serializers.ModelSerializer):
             'order',
             'emojis',
         )
+
+
+class TypeaheadSerializer(serializers.Serializer):
+    query = serializers.CharField(
+        max_length=settings.SEARCH_QUERIES_MAX_LENGTH,
+        allow_blank=False,
+        required=True
+    )
+    count = serializers.IntegerField(
+        required=False,
+        max_value=10
+    )
@@ -0,0 +1,13 @@
+from rest_framework.fields import Field
+
+from openbook_common.utils.helpers import make_cursor
+
+
+class ItemCursorField(Field):
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super(ItemCursorField, self).__init__(**kwargs)
+
+    def to_representation(self, item):
+        return make_cursor(created=item.created, id=item.pk)
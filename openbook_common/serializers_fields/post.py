@@ -1,7 +1,111 @@
+from django.db.models import Count, QuerySet
 from rest_framework.fields import Field
+from rest_framework.serializers import ListSerializer
 
-from openbook_common.utils.model_loaders import get_post_model
-from openbook_posts.models import PostReaction
+from openbook_common.utils.model_loaders import get_post_model, get_circle_model, \
+    get_community_membership_model, get_post_comment_model
+from openbook_posts.models import PostReaction, PostEmojiCount
+
+
+class PostsListSerializer(ListSerializer):
+    """
+    Loads what the post fields need for a whole list of posts in a fixed amount of grouped queries and
+    hands it to them through the prefetched_posts_data context, so serializing a page of posts does not
+    cost a bunch of queries per post.
+    """
+
+    def to_representation(self, data):
+        posts = data
+        if isinstance(posts, QuerySet):
+            posts = posts.select_related('creator__profile', 'community', 'image', 'video').prefetch_related(
+                'creator__profile__badges')
+        posts = list(posts)
+
+        request = self.context.get('request')
+        self._context['prefetched_posts_data'] = self._prefetch_posts_data(posts=posts, user=request.user)
+
+        return super(PostsListSerializer, self).to_representation(posts)
+
+    def _prefetch_posts_data(self, posts, user):
+        prefetched_posts_data = {
+            'reactions': {},
+            'own_comments_counts': {},
+            'emoji_counts': {},
+            'circles': {},
+            'creators_communities_memberships': {},
+            'communities_memberships': {},
+            'muted_posts_ids': set(),
+            'public_posts_ids': set(),
+        }
+
+        if not posts:
+            return prefetched_posts_data
+
+        posts_ids = [post.pk for post in posts]
+        is_authenticated = not user.is_anonymous
+
+        public_reactions_posts_ids = [post.pk for post in posts if post.public_reactions]
+        if public_reactions_posts_ids:
+            emoji_counts = PostEmojiCount.objects.select_related('emoji').filter(
+                post_id__in=public_reactions_posts_ids).order_by('-count', 'id')
+            for emoji_count in emoji_counts:
+                prefetched_posts_data['emoji_counts'].setdefault(emoji_count.post_id, []).append(
+                    {'emoji': emoji_count.emoji, 'count': emoji_count.count})
+
+        community_posts = [post for post in posts if post.community_id]
+        if community_posts:
+            CommunityMembership = get_community_membership_model()
+            creators_memberships = CommunityMembership.objects.filter(
+                community_id__in={post.community_id for post in community_posts},
+                user_id__in={post.creator_id for post in community_posts})
+            for membership in creators_memberships:
+                prefetched_posts_data['creators_communities_memberships'].setdefault(
+                    (membership.community_id, membership.user_id), []).append(membership)
+
+        Circle = get_circle_model()
+        CirclePost = Circle.posts.through
+        world_circle_id = Circle.get_world_circle_id()
+        prefetched_posts_data['public_posts_ids'] = set(
+            CirclePost.objects.filter(post_id__in=posts_ids, circle_id=world_circle_id).values_list('post_id',
+                                                                                                     flat=True))
+
+        if not is_authenticated:
+            return prefetched_posts_data
+
+        reactions = user.post_reactions.select_related('emoji').filter(post_id__in=posts_ids)
+        prefetched_posts_data['reactions'] = {reaction.post_id: reaction for reaction in reactions}
+
+        # If reactions are private, count only own reactions, which is the one we might have made
+        for post in posts:
+            reaction = prefetched_posts_data['reactions'].get(post.pk)
+            if not post.public_reactions and reaction:
+                prefetched_posts_data['emoji_counts'][post.pk] = [{'emoji': reaction.emoji, 'count': 1}]
+
+        # If comments are private, count only own comments
+        private_comments_posts_ids = [post.pk for post in posts if not post.public_comments]
+        if private_comments_posts_ids:
+            PostComment = get_post_comment_model()
+            own_comments_counts = PostComment.objects.filter(post_id__in=private_comments_posts_ids,
+                                                             commenter_id=user.pk).values('post_id').annotate(
+                count=Count('id')).values_list('post_id', 'count')
+            prefetched_posts_data['own_comments_counts'] = dict(own_comments_counts)
+
+        prefetched_posts_data['muted_posts_ids'] = set(
+            user.post_mutes.filter(post_id__in=posts_ids).values_list('post_id', flat=True))
+
+        own_posts_ids = [post.pk for post in posts if post.creator_id == user.pk]
+        if own_posts_ids:
+            own_posts_circles = CirclePost.objects.select_related('circle').filter(post_id__in=own_posts_ids)
+            for post_circle in own_posts_circles:
+                prefetched_posts_data['circles'].setdefault(post_circle.post_id, []).append(post_circle.circle)
+
+        if community_posts:
+            memberships = user.communities_memberships.filter(
+                community_id__in={post.community_id for post in community_posts})
+            prefetched_posts_data['communities_memberships'] = {membership.community_id: membership for membership
+                                                                in memberships}
+
+        return prefetched_posts_data
 
 
 class ReactionField(Field):
@@ -15,14 +119,21 @@ class ReactionField(Field):
         request = self.context.get('request')
         request_user = request.user
 
+        prefetched_posts_data = self.context.get('prefetched_posts_data')
+
         serialized_reaction = None
 
         if not request_user.is_anonymous:
-            try:
-                reaction = request_user.get_reaction_for_post_with_id(post.pk)
+            if prefetched_posts_data is not None:
+                reaction = prefetched_posts_data['reactions'].get(post.pk)
+            else:
+                try:
+                    reaction = request_user.get_reaction_for_post_with_id(post.pk)
+                except PostReaction.DoesNotExist:
+                    reaction = None
+
+            if reaction:
                 serialized_reaction = self.reaction_serializer(reaction, context={'request': request}).data
-            except PostReaction.DoesNotExist:
-                pass
 
         return serialized_reaction
 
@@ -37,13 +148,17 @@ class CommentsCountField(Field):
         request = self.context.get('request')
         request_user = request.user
 
+        prefetched_posts_data = self.context.get('prefetched_posts_data')
+
         comments_count = None
 
-        if request_user.is_anonymous:
-            if post.public_comments:
-                comments_count = post.count_comments()
-        else:
-            comments_count = request_user.get_comments_count_for_post_with_id(post.pk)
+        if post.public_comments:
+            comments_count = post.comments_count
+        elif not request_user.is_anonymous:
+            if prefetched_posts_data is not None:
+                comments_count = prefetched_posts_data['own_comments_counts'].get(post.pk, 0)
+            else:
+                comments_count = request_user.get_comments_count_for_post_with_id(post.pk)
 
         return comments_count
 
@@ -59,9 +174,13 @@ class ReactionsEmojiCountField(Field):
         request = self.context.get('request')
         request_user = request.user
 
+        prefetched_posts_data = self.context.get('prefetched_posts_data')
+
         reaction_emoji_count = []
 
-        if request_user.is_anonymous:
+        if prefetched_posts_data is not None:
+            reaction_emoji_count = prefetched_posts_data['emoji_counts'].get(post.pk, [])
+        elif request_user.is_anonymous:
             if post.public_reactions:
                 Post = get_post_model()
                 reaction_emoji_count = Post.get_emoji_counts_for_post_with_id(post.pk)
@@ -84,8 +203,12 @@ class CirclesField(Field):
     def to_representation(self, post):
         request = self.context.get('request')
         request_user = request.user
+        prefetched_posts_data = self.context.get('prefetched_posts_data')
+
         circles = []
-        if request_user.has_post_with_id(post.pk):
+        if prefetched_posts_data is not None:
+            circles = prefetched_posts_data['circles'].get(post.pk, [])
+        elif request_user.has_post_with_id(post.pk):
             circles = post.circles
 
         return self.circle_serializer(circles, many=True, context={"request": request, 'post': post}).data
@@ -101,6 +224,7 @@ class PostCreatorField(Field):
 
     def to_representation(self, post):
         request = self.context.get('request')
+        prefetched_posts_data = self.context.get('prefetched_posts_data')
 
         post_creator = post.creator
         post_community = post.community
@@ -108,7 +232,11 @@ class PostCreatorField(Field):
         post_creator_serializer = self.post_creator_serializer(post_creator, context={"request": request}).data
 
         if post_community:
-            post_creator_memberships = post_community.memberships.filter(user=post_creator).all()
+            if prefetched_posts_data is not None:
+                post_creator_memberships = prefetched_posts_data['creators_communities_memberships'].get(
+                    (post.community_id, post.creator_id), [])
+            else:
+                post_creator_memberships = post_community.memberships.filter(user=post_creator).all()
             post_creator_serializer['communities_memberships'] = self.community_membership_serializer(
                 post_creator_memberships,
                 many=True,
@@ -128,9 +256,13 @@ class IsMutedField(Field):
         request = self.context.get('request')
         request_user = request.user
 
+        prefetched_posts_data = self.context.get('prefetched_posts_data')
+
         is_muted = False
 
-        if not request_user.is_anonymous:
+        if prefetched_posts_data is not None:
+            is_muted = post.pk in prefetched_posts_data['muted_posts_ids']
+        elif not request_user.is_anonymous:
             is_muted = request_user.has_muted_post_with_id(post_id=post.pk)
 
         return is_muted
@@ -146,9 +278,14 @@ class IsEncircledField(Field):
         request = self.context.get('request')
         request_user = request.user
 
+        prefetched_posts_data = self.context.get('prefetched_posts_data')
+
         is_encircled = False
 
         if not request_user.is_anonymous:
-            is_encircled = post.is_encircled_post()
+            if prefetched_posts_data is not None:
+                is_encircled = post.pk not in prefetched_posts_data['public_posts_ids'] and not post.community_id
+            else:
+                is_encircled = post.is_encircled_post()
 
         return is_encircled
@@ -1,9 +1,11 @@
 from rest_framework.exceptions import ValidationError
-from rest_framework.fields import URLField, FileField
+from rest_framework.fields import URLField, FileField, CharField
 from django.template.defaultfilters import filesizeformat
 from django.utils.translation import ugettext_lazy as _
 from django.forms import ImageField as DjangoImageField
 
+from openbook_common.utils.helpers import parse_cursor
+
 
 class FriendlyUrlField(URLField):
     def to_internal_value(self, data):
@@ -13,6 +15,20 @@ class FriendlyUrlField(URLField):
         return data
 
 
+class CursorField(CharField):
+    """
+    A cursor as returned in the cursor field of paginated items. Validates into a (created, id) tuple.
+    """
+
+    def to_internal_value(self, data):
+        data = super().to_internal_value(data)
+
+        try:
+            return parse_cursor(data)
+        except ValueError:
+            raise ValidationError(_('Invalid cursor.'))
+
+
 class RestrictedFileSizeField(FileField):
     """
     Same as FileField, but you can specify:
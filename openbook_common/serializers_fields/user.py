@@ -98,7 +98,7 @@ class FollowersCountField(Field):
         if not user.profile.followers_count_visible and user.pk != request_user.pk:
             return None
 
-        return user.count_followers()
+        return user.get_followers_count()
 
 
 class FollowingCountField(Field):
@@ -108,7 +108,7 @@ class FollowingCountField(Field):
         super(FollowingCountField, self).__init__(**kwargs)
 
     def to_representation(self, value):
-        return value.count_following()
+        return value.get_following_count()
 
 
 class PostsCountField(Field):
@@ -121,11 +121,9 @@ class PostsCountField(Field):
         request = self.context.get('request')
 
         if not request.user.is_anonymous:
-            if request.user.pk == value.pk:
-                return value.count_posts()
-            return value.count_posts_for_user_with_id(request.user.pk)
+            return value.get_posts_count_for_user_with_id(request.user.pk)
 
-        return value.count_public_posts()
+        return value.get_public_posts_count()
 
 
 class UnreadNotificationsCountField(Field):
@@ -139,7 +137,7 @@ class UnreadNotificationsCountField(Field):
         request_user = request.user
 
         if not request_user.is_anonymous:
-            return request_user.count_unread_notifications()
+            return request_user.get_unread_notifications_count()
 
         return None
 
@@ -203,7 +201,7 @@ class CommunitiesMembershipsField(Field):
             if not community_name:
                 continue
 
-            if not request_user.is_member_of_community_with_name(community_name=community_name):
+            if not request_user.get_roles_in_community_with_name(community_name=community_name)['is_member']:
                 continue
 
             if not user.is_member_of_community_with_name(community_name=community_name):
@@ -1,3 +1,8 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
@@ -5,7 +10,10 @@ from rest_framework.test import APITestCase
 import logging
 import json
 
-from openbook_common.tests.helpers import make_emoji_group, make_emoji, make_user, make_authentication_headers_for_user
+from openbook_common.tests.helpers import make_emoji_group, make_emoji, make_user, make_authentication_headers_for_user, \
+    make_community
+from openbook_common.utils.reference_data import get_reference_data_stats
+from openbook_common.utils.typeahead import get_users_typeahead_index, get_communities_typeahead_index
 
 logger = logging.getLogger(__name__)
 
@@ -96,5 +104,122 @@ class TestEmojiGroups(APITestCase):
 
         self.assertEqual(len(response_groups), 0)
 
+    def test_retrieves_emoji_groups_from_cache_until_they_change(self):
+        """
+        should not query the emoji groups again until an emoji group or emoji is saved
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        group = make_emoji_group(is_reaction_group=False)
+        make_emoji(group=group)
+
+        url = self._get_url()
+        self.client.get(url, **headers)
+
+        stats = get_reference_data_stats()
+
+        with CaptureQueriesContext(connection) as queries_context:
+            response = self.client.get(url, **headers)
+
+        self.assertFalse(any('openbook_common_emoji' in query['sql'] for query in queries_context.captured_queries))
+        self.assertEqual(get_reference_data_stats()['process_hits'], stats['process_hits'] + 1)
+        self.assertEqual(len(json.loads(response.content)[0]['emojis']), 1)
+
+        make_emoji(group=group)
+
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(len(json.loads(response.content)[0]['emojis']), 2)
+
+    def test_reloads_emoji_groups_once_older_than_max_age(self):
+        """
+        should query the emoji groups again once older than REFERENCE_DATA_MAX_AGE even if they did not change
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        group = make_emoji_group(is_reaction_group=False)
+        make_emoji(group=group)
+
+        url = self._get_url()
+        self.client.get(url, **headers)
+
+        with override_settings(REFERENCE_DATA_MAX_AGE=0):
+            with CaptureQueriesContext(connection) as queries_context:
+                self.client.get(url, **headers)
+
+        self.assertTrue(any('openbook_common_emoji' in query['sql'] for query in queries_context.captured_queries))
+
+    def test_reference_data_stats_command_prints_hits_and_misses(self):
+        """
+        should print the hits and misses of the reference data cache
+        """
+        out = StringIO()
+        call_command('reference_data_stats', stdout=out)
+
+        self.assertIn('hits:', out.getvalue())
+        self.assertIn('misses:', out.getvalue())
+
     def _get_url(self):
         return reverse('emoji-groups')
+
+
+class TypeaheadAPITests(APITestCase):
+    """
+    TypeaheadAPI
+    """
+
+    def setUp(self):
+        # The indexes outlive the test transactions
+        get_users_typeahead_index().clear()
+        get_communities_typeahead_index().clear()
+
+    def test_completes_usernames_and_community_names(self):
+        """
+        should return the users and communities whose username or name start with the query and return 200
+        """
+        user = make_user(username='typeaheaduser')
+        headers = make_authentication_headers_for_user(user)
+
+        make_user(username='someoneelse')
+        community = make_community(creator=user)
+        community.update(name='typeaheadcommunity')
+
+        url = self._get_url()
+        response = self.client.get(url, {
+            'query': 'TypeAhead'
+        }, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        parsed_response = json.loads(response.content)
+
+        self.assertEqual([response_user['id'] for response_user in parsed_response['users']], [user.pk])
+        self.assertEqual(parsed_response['users'][0]['username'], 'typeaheaduser')
+        self.assertEqual([response_community['id'] for response_community in parsed_response['communities']],
+                         [community.pk])
+
+    def test_can_limit_amount_of_completions(self):
+        """
+        should return at most count users and communities
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        for i in range(0, 5):
+            make_user(username='typeahead%d' % i)
+
+        url = self._get_url()
+        response = self.client.get(url, {
+            'query': 'typeahead',
+            'count': 3
+        }, **headers)
+
+        parsed_response = json.loads(response.content)
+
+        self.assertEqual([response_user['username'] for response_user in parsed_response['users']],
+                         ['typeahead0', 'typeahead1', 'typeahead2'])
+
+    def _get_url(self):
+        return reverse('typeahead')
@@ -1,6 +1,9 @@
+import base64
 import secrets
 
+from django.db.models import Q
 from django.http import QueryDict
+from django.utils.dateparse import parse_datetime
 from imagekit.utils import get_cache
 from imagekit.models import ProcessedImageField
 
@@ -61,3 +64,61 @@ def delete_file_field(filefield):
             cache.delete(cache.get(file))
 
         filefield.storage.delete(file.name)
+
+
+def add_deleted_rows_counts(deleted_rows_counts, deleted_rows):
+    """
+    Adds the deleted rows by model label returned by QuerySet.delete to the running totals in deleted_rows_counts
+    """
+    for model_label, deleted_rows_count in deleted_rows.items():
+        deleted_rows_counts[model_label] = deleted_rows_counts.get(model_label, 0) + deleted_rows_count
+
+
+def make_cursor(created, id):
+    """
+    Makes an opaque cursor pointing at the item with the given created and id
+    :param created:
+    :param id:
+    :return:
+    """
+    cursor = '%s|%d' % (created.isoformat(), id)
+    return base64.urlsafe_b64encode(cursor.encode()).decode()
+
+
+def parse_cursor(cursor):
+    """
+    Parses a cursor made with make_cursor into a (created, id) tuple.
+    Raises ValueError if the cursor is malformed.
+    :param cursor:
+    :return:
+    """
+    created, id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+    created = parse_datetime(created)
+
+    if not created:
+        raise ValueError('Invalid cursor created')
+
+    return created, int(id)
+
+
+def make_cursor_query(cursor, ascending=False, created_field='created', id_field='id'):
+    """
+    Makes a keyset query for the items after a parsed cursor in the (created, id) order.
+    Descending by default, so it returns the items older than the cursor.
+    :param cursor:
+    :param ascending:
+    :param created_field:
+    :param id_field:
+    :return:
+    """
+    created, id = cursor
+    lookup = 'gt' if ascending else 'lt'
+
+    after_cursor_query = Q(**{'%s__%s' % (created_field, lookup): created})
+    after_cursor_query.add(Q(**{created_field: created, '%s__%s' % (id_field, lookup): id}), Q.OR)
+
+    # Redundant with the above but lets the database seek the (created, id) indexes instead of scanning them
+    cursor_query = Q(**{'%s__%se' % (created_field, lookup): created})
+    cursor_query.add(after_cursor_query, Q.AND)
+
+    return cursor_query
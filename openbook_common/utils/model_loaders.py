@@ -17,6 +17,10 @@ def get_post_model():
     return apps.get_model('openbook_posts.Post')
 
 
+def get_timeline_entry_model():
+    return apps.get_model('openbook_posts.TimelineEntry')
+
+
 def get_post_mute_model():
     return apps.get_model('openbook_posts.PostMute')
 
@@ -37,6 +41,14 @@ def get_community_log_model():
     return apps.get_model('openbook_communities.CommunityLog')
 
 
+def get_community_search_entry_model():
+    return apps.get_model('openbook_communities.CommunitySearchEntry')
+
+
+def get_trending_community_model():
+    return apps.get_model('openbook_communities.TrendingCommunity')
+
+
 def get_post_comment_model():
     return apps.get_model('openbook_posts.PostComment')
 
@@ -45,6 +57,14 @@ def get_post_reaction_model():
     return apps.get_model('openbook_posts.PostReaction')
 
 
+def get_post_emoji_count_model():
+    return apps.get_model('openbook_posts.PostEmojiCount')
+
+
+def get_trending_post_model():
+    return apps.get_model('openbook_posts.TrendingPost')
+
+
 def get_emoji_model():
     return apps.get_model('openbook_common.Emoji')
 
@@ -101,9 +121,21 @@ def get_notification_model():
     return apps.get_model('openbook_notifications.Notification')
 
 
+def get_push_notification_model():
+    return apps.get_model('openbook_notifications.PushNotification')
+
+
 def get_device_model():
     return apps.get_model('openbook_devices.Device')
 
 
 def get_user_model():
     return apps.get_model('openbook_auth.User')
+
+
+def get_user_counts_model():
+    return apps.get_model('openbook_auth.UserCounts')
+
+
+def get_user_search_entry_model():
+    return apps.get_model('openbook_auth.UserSearchEntry')
@@ -0,0 +1,131 @@
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+
+REFERENCE_DATA_CACHE_KEY_PREFIX = 'reference_data'
+
+# Hits and misses are added to the shared counters in the cache every this many lookups
+REFERENCE_DATA_STATS_FLUSH_INTERVAL = 100
+
+# Reference data name to a (version, loaded at, value) tuple
+_reference_data = {}
+
+_stats = {'hits': 0, 'misses': 0}
+_unflushed_stats = {'hits': 0, 'misses': 0}
+
+
+def get_reference_data(name, load):
+    """
+    Returns the reference data with the given name from memory, calling load to (re)build it
+    the first time, whenever its version in the cache changed and once it is older than REFERENCE_DATA_MAX_AGE
+    seconds, which bounds how stale it gets in processes that do not share the cache with the one invalidating it.
+    :param name:
+    :param load:
+    :return:
+    """
+    version = _get_reference_data_version(name)
+
+    cached_reference_data = _reference_data.get(name)
+
+    if cached_reference_data and cached_reference_data[0] == version and \
+            time.monotonic() - cached_reference_data[1] < settings.REFERENCE_DATA_MAX_AGE:
+        _count_lookup('hits')
+        return cached_reference_data[2]
+
+    _count_lookup('misses')
+    value = load()
+    _reference_data[name] = (version, time.monotonic(), value)
+    return value
+
+
+def invalidate_reference_data(name):
+    """
+    Changes the version of the reference data with the given name in the cache, so the processes sharing
+    the cache reload it on their next lookup and the others once their copy is REFERENCE_DATA_MAX_AGE old.
+    Done right away and again once the transaction commits, so a process loading it in between
+    does not keep the data from before the commit.
+    :param name:
+    """
+    _bump_reference_data_version(name)
+    transaction.on_commit(lambda: _bump_reference_data_version(name))
+
+
+def register_reference_data(name, models):
+    """
+    Invalidates the reference data with the given name whenever an instance of any of the given models
+    is saved or deleted.
+    :param name:
+    :param models:
+    """
+
+    def invalidate_on_change(sender, **kwargs):
+        invalidate_reference_data(name)
+
+    for model in models:
+        post_save.connect(invalidate_on_change, sender=model, weak=False,
+                          dispatch_uid='invalidate_reference_data_%s_on_save_%s' % (name, model))
+        post_delete.connect(invalidate_on_change, sender=model, weak=False,
+                            dispatch_uid='invalidate_reference_data_%s_on_delete_%s' % (name, model))
+
+
+def get_reference_data_stats():
+    """
+    :return: the hits and misses of this process and the totals flushed to the cache by all processes
+    """
+    return {
+        'process_hits': _stats['hits'],
+        'process_misses': _stats['misses'],
+        'hits': cache.get(_make_stats_key('hits'), 0) + _unflushed_stats['hits'],
+        'misses': cache.get(_make_stats_key('misses'), 0) + _unflushed_stats['misses'],
+    }
+
+
+def _get_reference_data_version(name):
+    version_key = _make_version_key(name)
+    version = cache.get(version_key)
+
+    if version is None:
+        # Never set or evicted, a new version makes every process reload
+        cache.add(version_key, uuid.uuid4().hex, None)
+        version = cache.get(version_key)
+
+    return version
+
+
+def _bump_reference_data_version(name):
+    cache.set(_make_version_key(name), uuid.uuid4().hex, None)
+
+
+def _count_lookup(result):
+    _stats[result] += 1
+    _unflushed_stats[result] += 1
+
+    if _unflushed_stats['hits'] + _unflushed_stats['misses'] >= REFERENCE_DATA_STATS_FLUSH_INTERVAL:
+        _flush_stats()
+
+
+def _flush_stats():
+    for result, count in _unflushed_stats.items():
+        if not count:
+            continue
+
+        stats_key = _make_stats_key(result)
+        cache.add(stats_key, 0, None)
+        try:
+            cache.incr(stats_key, count)
+        except ValueError:
+            # Evicted in between
+            cache.set(stats_key, count, None)
+        _unflushed_stats[result] = 0
+
+
+def _make_version_key(name):
+    return '%s:%s:version' % (REFERENCE_DATA_CACHE_KEY_PREFIX, name)
+
+
+def _make_stats_key(result):
+    return '%s:stats:%s' % (REFERENCE_DATA_CACHE_KEY_PREFIX, result)
@@ -0,0 +1,89 @@
+import unicodedata
+
+from django.db.models import Q, Count, Case, When, IntegerField
+
+
+def normalize_search_text(text):
+    """
+    Lowercases the text, strips its accents and collapses its whitespace, the form search entries are stored in
+    """
+    if not text:
+        return ''
+
+    decomposed_text = unicodedata.normalize('NFKD', text)
+    text = ''.join(character for character in decomposed_text if not unicodedata.combining(character))
+    return ' '.join(text.lower().split())
+
+
+def make_search_trigrams(text):
+    """
+    Returns the distinct three characters long fragments of the normalized text
+    """
+    return {text[i:i + 3] for i in range(0, len(text) - 2)}
+
+
+def search_entries_keys(entries, trigram_model, query, fields, key_field, max_results, order_by=('pk',)):
+    """
+    Searches the normalized fields of the entries, ranking first the entries whose first field is the query,
+    then the ones with a field starting with it and last the ones with a field containing it.
+    Substrings are found through the trigrams of the entries and only for queries of three characters or more.
+    :param entries: queryset of the entries to search in
+    :param trigram_model: model with an entry foreign key and a trigram for each trigram of the entries
+    :param fields: names of the normalized fields of the entries
+    :param key_field: field of the entries to return
+    :param order_by: ordering of the entries within the same rank
+    :return: list of the key_field of the matching entries, best first
+    """
+    query = normalize_search_text(query)
+
+    if not query:
+        return []
+
+    prefix_query = Q()
+    substring_query = Q()
+
+    # The entries are stored normalized already. The case insensitive lookups are there because MySQL
+    # does not use the index of a case insensitive column for the case sensitive LIKE BINARY.
+    for field in fields:
+        prefix_query.add(Q(**{'%s__istartswith' % field: query}), Q.OR)
+        substring_query.add(Q(**{'%s__icontains' % field: query}), Q.OR)
+
+    ranked_entries = [
+        entries.filter(**{fields[0]: query}),
+        entries.filter(prefix_query),
+    ]
+
+    trigrams = make_search_trigrams(query)
+
+    if trigrams:
+        trigrams_entries_ids = trigram_model.objects.filter(trigram__in=trigrams).values('entry_id').annotate(
+            trigrams_count=Count('id')).filter(trigrams_count=len(trigrams)).values('entry_id')
+        # Having all the trigrams of the query does not mean containing it
+        ranked_entries.append(entries.filter(pk__in=trigrams_entries_ids).filter(substring_query))
+
+    keys = []
+    found_keys = set()
+
+    for rank_entries in ranked_entries:
+        rank_keys = rank_entries.order_by(*order_by).values_list(key_field, flat=True)[:max_results + len(keys)]
+
+        for key in rank_keys:
+            if key not in found_keys:
+                found_keys.add(key)
+                keys.append(key)
+
+        if len(keys) >= max_results:
+            break
+
+    return keys[:max_results]
+
+
+def make_search_ranking(keys, field='pk'):
+    """
+    Makes an expression to order a queryset in the order of the keys returned by search_entries_keys
+    """
+    if not keys:
+        return 'pk'
+
+    return Case(*[When(**{field: key, 'then': rank}) for rank, key in enumerate(keys)],
+                output_field=IntegerField())
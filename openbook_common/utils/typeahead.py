@@ -0,0 +1,178 @@
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import connection
+
+from openbook_common.utils.model_loaders import get_user_model, get_community_model
+from openbook_common.utils.search import normalize_search_text
+
+
+class TypeaheadIndex:
+    """
+    In-memory list of (key, id) pairs sorted by their normalized key, searched by prefix with a binary search.
+    Updated in place with the changes made by this process. Once older than TYPEAHEAD_INDEX_MAX_AGE seconds it
+    is rebuilt from the database in a background thread, which brings in the changes made by other processes,
+    while the searches keep using the current index until the new one is swapped in.
+    """
+
+    def __init__(self, load_items):
+        """
+        :param load_items: callable returning an iterable of (id, key, item) tuples
+        """
+        self.load_items = load_items
+        self.lock = threading.Lock()
+        # Held by the thread (re)building the index, so a single one does at a time
+        self.load_lock = threading.Lock()
+        self.keys = []
+        self.items = {}
+        self.loaded_at = None
+        # Changes made while the index is rebuilt, applied to the new index before swapping it in
+        self.pending_changes = None
+
+    def search(self, query, max_results):
+        """
+        :return: the items whose key starts with the query, in key order
+        """
+        prefix = normalize_search_text(query)
+
+        if not prefix:
+            return []
+
+        self._load_if_stale()
+
+        items = []
+
+        with self.lock:
+            for index in range(bisect_left(self.keys, (prefix,)), len(self.keys)):
+                key, item_id = self.keys[index]
+                if not key.startswith(prefix) or len(items) >= max_results:
+                    break
+                items.append(self.items[item_id][1])
+
+        return items
+
+    def is_loaded(self):
+        return self.loaded_at is not None
+
+    def update_item(self, item_id, key, item):
+        with self.lock:
+            # Until the first search loads the index there is nothing to update
+            if self.loaded_at is not None:
+                self._update_item(self.keys, self.items, item_id, key, item)
+
+            if self.pending_changes is not None:
+                self.pending_changes.append((item_id, key, item))
+
+    def remove_item(self, item_id):
+        with self.lock:
+            self._remove_item(self.keys, self.items, item_id)
+
+            if self.pending_changes is not None:
+                self.pending_changes.append((item_id, None, None))
+
+    def clear(self):
+        with self.lock:
+            self.keys = []
+            self.items = {}
+            self.loaded_at = None
+
+    def _update_item(self, keys, items, item_id, key, item):
+        self._remove_item(keys, items, item_id)
+        key = normalize_search_text(key)
+        insort(keys, (key, item_id))
+        items[item_id] = (key, item)
+
+    def _remove_item(self, keys, items, item_id):
+        if item_id not in items:
+            return
+
+        key = items.pop(item_id)[0]
+        del keys[bisect_left(keys, (key, item_id))]
+
+    def _load_if_stale(self):
+        loaded_at = self.loaded_at
+
+        if loaded_at is None:
+            # Nothing to serve yet, the first search of the process waits for the index
+            with self.load_lock:
+                if self.loaded_at is None:
+                    self._load()
+            return
+
+        if time.monotonic() - loaded_at < settings.TYPEAHEAD_INDEX_MAX_AGE:
+            return
+
+        # Skipped when another thread is rebuilding it already
+        if self.load_lock.acquire(blocking=False):
+            threading.Thread(target=self._reload, daemon=True).start()
+
+    def _reload(self):
+        try:
+            self._load()
+        finally:
+            self.load_lock.release()
+            # Opened by the load in this thread
+            connection.close()
+
+    def _load(self):
+        """
+        Builds a new index from the database and swaps it in, along with the changes made while building it
+        """
+        with self.lock:
+            self.pending_changes = []
+
+        try:
+            items = {}
+
+            for item_id, key, item in self.load_items():
+                items[item_id] = (normalize_search_text(key), item)
+
+            keys = sorted((key, item_id) for item_id, (key, item) in items.items())
+
+            with self.lock:
+                for item_id, key, item in self.pending_changes:
+                    if key is None:
+                        self._remove_item(keys, items, item_id)
+                    else:
+                        self._update_item(keys, items, item_id, key, item)
+
+                self.keys = keys
+                self.items = items
+                self.loaded_at = time.monotonic()
+        finally:
+            with self.lock:
+                self.pending_changes = None
+
+
+def make_user_typeahead_item(user_id, username, avatar):
+    return user_id, username, (user_id, username, avatar or None)
+
+
+def make_community_typeahead_item(community_id, name, avatar):
+    return community_id, name, (community_id, name, avatar or None)
+
+
+def _load_users_typeahead_items():
+    User = get_user_model()
+    users = User.objects.values_list('id', 'username', 'profile__avatar').iterator()
+    return (make_user_typeahead_item(*user) for user in users)
+
+
+def _load_communities_typeahead_items():
+    Community = get_community_model()
+    communities = Community.objects.values_list('id', 'name', 'avatar').iterator()
+    return (make_community_typeahead_item(*community) for community in communities)
+
+
+users_typeahead_index = TypeaheadIndex(load_items=_load_users_typeahead_items)
+communities_typeahead_index = TypeaheadIndex(load_items=_load_communities_typeahead_items)
+
+
+def get_users_typeahead_index():
+    return users_typeahead_index
+
+
+def get_communities_typeahead_index():
+    return communities_typeahead_index
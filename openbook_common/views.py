@@ -1,3 +1,4 @@
+from django.core.files.storage import default_storage
 from django.utils.timezone import get_current_timezone
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
@@ -5,8 +6,9 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.utils import timezone
 
-from openbook_common.serializers import EmojiGroupSerializer, EmojiSerializer
+from openbook_common.serializers import EmojiGroupSerializer, EmojiSerializer, TypeaheadSerializer
 from openbook_common.utils.model_loaders import get_emoji_group_model, get_emoji_model
+from openbook_common.utils.typeahead import get_users_typeahead_index, get_communities_typeahead_index
 
 
 class Time(APIView):
@@ -40,7 +42,46 @@ class EmojiGroups(APIView):
 
     def get(self, request):
         EmojiGroup = get_emoji_group_model()
-        emoji_groups = EmojiGroup.objects.filter(is_reaction_group=False).all().order_by('order')
+        emoji_groups = EmojiGroup.get_emoji_groups(is_reaction_group=False)
         serializer = EmojiGroupSerializer(emoji_groups, many=True, context={'request': request})
 
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class Typeahead(APIView):
+    """
+    API for completing usernames and community names as they are typed, served from in-memory indexes
+    """
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request):
+        query_params = request.query_params.dict()
+        serializer = TypeaheadSerializer(data=query_params)
+        serializer.is_valid(raise_exception=True)
+
+        data = serializer.validated_data
+
+        count = data.get('count', 5)
+        query = data.get('query')
+
+        users = get_users_typeahead_index().search(query, max_results=count)
+        communities = get_communities_typeahead_index().search(query, max_results=count)
+
+        return Response({
+            'users': [{
+                'id': user_id,
+                'username': username,
+                'avatar': self._get_avatar_url(request, avatar)
+            } for user_id, username, avatar in users],
+            'communities': [{
+                'id': community_id,
+                'name': name,
+                'avatar': self._get_avatar_url(request, avatar)
+            } for community_id, name, avatar in communities]
+        }, status=status.HTTP_200_OK)
+
+    def _get_avatar_url(self, request, avatar):
+        if not avatar:
+            return None
+
+        return request.build_absolute_uri(default_storage.url(avatar))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+import logging
+
+from django.db import transaction
+
+from openbook_common.utils.model_loaders import get_community_model, get_community_search_entry_model
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Recreates the search entries and trigrams of all the communities'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Amount of communities to index at once')
+
+    def handle(self, *args, **options):
+        Community = get_community_model()
+        CommunitySearchEntry = get_community_search_entry_model()
+
+        chunk_size = options['chunk_size']
+        communities_ids = Community.objects.order_by('pk').values_list('pk', flat=True)
+
+        indexed_communities_count = 0
+        last_community_id = 0
+
+        while True:
+            chunk_communities_ids = list(communities_ids.filter(pk__gt=last_community_id)[:chunk_size])
+            if not chunk_communities_ids:
+                break
+
+            with transaction.atomic():
+                indexed_communities_count += CommunitySearchEntry.rebuild_entries_for_communities_with_ids(
+                    chunk_communities_ids)
+
+            last_community_id = chunk_communities_ids[-1]
+            logger.info('Indexed communities up to id %d' % last_community_id)
+
+        self.stdout.write(self.style.SUCCESS('Indexed %d communities' % indexed_communities_count))
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+import logging
+
+from openbook_common.utils.model_loaders import get_trending_community_model
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the trending communities rankings of every category and of all the communities'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float,
+                            help='Keep refreshing the rankings every this many seconds instead of once')
+        parser.add_argument('--stale-interval', type=float,
+                            help='Between the refreshes, rank the categories whose communities changed every this '
+                                 'many seconds')
+
+    def handle(self, *args, **options):
+        TrendingCommunity = get_trending_community_model()
+
+        interval = options['interval']
+        stale_interval = options['stale_interval']
+
+        while True:
+            ranked_communities_count = TrendingCommunity.refresh_trending_communities()
+            logger.info('Ranked %d trending communities' % ranked_communities_count)
+
+            if not interval:
+                break
+
+            next_refresh = time.monotonic() + interval
+
+            while stale_interval and time.monotonic() + stale_interval < next_refresh:
+                time.sleep(stale_interval)
+                stale_ranked_communities_count = TrendingCommunity.refresh_stale_trending_communities()
+                if stale_ranked_communities_count:
+                    logger.info('Ranked %d trending communities of stale categories' % stale_ranked_communities_count)
+
+            time.sleep(max(0, next_refresh - time.monotonic()))
+
+        self.stdout.write(self.style.SUCCESS('Ranked %d trending communities' % ranked_communities_count))
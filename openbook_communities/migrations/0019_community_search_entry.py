@@ -0,0 +1,67 @@
+# Generated by Django 2.2.28 on 2026-10-16 23:10
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+from openbook_common.utils.search import normalize_search_text, make_search_trigrams
+
+
+def populate_community_search_entries(apps, schema_editor):
+    Community = apps.get_model('openbook_communities', 'Community')
+    CommunitySearchEntry = apps.get_model('openbook_communities', 'CommunitySearchEntry')
+    CommunitySearchTrigram = apps.get_model('openbook_communities', 'CommunitySearchTrigram')
+
+    communities = Community.objects.order_by('pk').annotate(memberships_count=Count('memberships')).values_list(
+        'id', 'name', 'title', 'memberships_count')
+    last_community_id = 0
+
+    while True:
+        chunk_communities = list(communities.filter(pk__gt=last_community_id)[:1000])
+        if not chunk_communities:
+            break
+
+        CommunitySearchEntry.objects.bulk_create(
+            [CommunitySearchEntry(community_id=community_id, name=normalize_search_text(name),
+                                  title=normalize_search_text(title), members_count=memberships_count)
+             for community_id, name, title, memberships_count in chunk_communities])
+
+        last_community_id = chunk_communities[-1][0]
+        entries = CommunitySearchEntry.objects.filter(community_id__gt=chunk_communities[0][0] - 1,
+                                                      community_id__lte=last_community_id)
+
+        CommunitySearchTrigram.objects.bulk_create(
+            [CommunitySearchTrigram(entry_id=entry.pk, trigram=trigram) for entry in entries for trigram in
+             make_search_trigrams(entry.name) | make_search_trigrams(entry.title)])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('openbook_communities', '0018_auto_20190309_1527'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommunitySearchEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(db_index=True, max_length=32)),
+                ('title', models.CharField(db_index=True, max_length=32)),
+                ('members_count', models.PositiveIntegerField(default=0)),
+                ('community', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='search_entry', to='openbook_communities.Community')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CommunitySearchTrigram',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigrams', to='openbook_communities.CommunitySearchEntry')),
+            ],
+            options={
+                'unique_together': {('trigram', 'entry')},
+            },
+        ),
+        migrations.RunPython(populate_community_search_entries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 2.2.28 on 2026-10-17 00:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('openbook_categories', '0006_merge_20190402_1244'),
+        ('openbook_communities', '0019_community_search_entry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingCommunity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('scored', models.DateTimeField()),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='trending_communities', to='openbook_categories.Category')),
+                ('community', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trending_entries', to='openbook_communities.Community')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='trendingcommunity',
+            index=models.Index(fields=['category', '-score'], name='trending_community_category'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-17 01:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('openbook_communities', '0020_trendingcommunity'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='communitylog',
+            name='action_type',
+            field=models.CharField(choices=[('B', 'Ban'), ('U', 'Unban'), ('AM', 'Add Moderator'), ('RM', 'Remove Moderator'), ('AA', 'Add Administrator'), ('RA', 'Remove Administrator'), ('RP', 'Remove Post'), ('RPC', 'Remove Post Comment'), ('RMB', 'Remove Member')], editable=False, max_length=5),
+        ),
+    ]
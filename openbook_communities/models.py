@@ -1,9 +1,14 @@
+import heapq
+from datetime import timedelta
+
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 
 # Create your models here.
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Q, F, Exists, OuterRef
 from django.db.models import Count
 from pilkit.processors import ResizeToFill, ResizeToFit
 
@@ -12,7 +17,10 @@ from openbook_auth.models import User
 from django.utils.translation import ugettext_lazy as _
 
 from openbook_common.utils.model_loaders import get_community_invite_model, \
-    get_community_log_model, get_category_model
+    get_community_log_model, get_category_model, get_user_search_entry_model
+from openbook_common.utils.typeahead import get_communities_typeahead_index, make_community_typeahead_item
+from openbook_common.utils.search import normalize_search_text, make_search_trigrams, search_entries_keys, \
+    make_search_ranking
 from openbook_common.validators import hex_color_validator
 from openbook_communities.helpers import upload_to_community_avatar_directory, upload_to_community_cover_directory
 from openbook_communities.validators import community_name_characters_validator
@@ -57,6 +65,20 @@ class Community(models.Model):
     class Meta:
         verbose_name_plural = 'communities'
 
+    @classmethod
+    def get_community_id_with_name(cls, community_name):
+        """
+        :return: the id of the community, None when there is no community with the name
+        """
+        return cls.objects.filter(name=community_name).values_list('id', flat=True).first()
+
+    @classmethod
+    def get_community_with_name(cls, community_name):
+        """
+        :raises Community.DoesNotExist:
+        """
+        return cls.objects.get(name=community_name)
+
     @classmethod
     def is_user_with_username_invited_to_community_with_name(cls, username, community_name):
         CommunityInvite = get_community_invite_model()
@@ -81,6 +103,34 @@ class Community(models.Model):
     def is_user_with_username_banned_from_community_with_name(cls, username, community_name):
         return cls.objects.filter(name=community_name, banned_users__username=username).exists()
 
+    COMMUNITY_ROLES = ('is_member', 'is_administrator', 'is_moderator', 'is_creator', 'is_banned', 'is_invited',
+                       'is_favorite',)
+
+    @classmethod
+    def get_community_with_name_roles_for_user_with_username(cls, community_name, username):
+        """
+        Answers all the predicates about a user and a community in a single query
+        :return: dict of the COMMUNITY_ROLES flags, all False when the community does not exist
+        """
+        CommunityInvite = get_community_invite_model()
+
+        memberships = CommunityMembership.objects.filter(community_id=OuterRef('pk'), user__username=username)
+
+        roles = cls.objects.filter(name=community_name).annotate(
+            is_member=Exists(memberships),
+            is_administrator=Exists(memberships.filter(is_administrator=True)),
+            is_moderator=Exists(memberships.filter(is_moderator=True)),
+            is_creator=Exists(cls.objects.filter(pk=OuterRef('pk'), creator__username=username)),
+            is_banned=Exists(cls.banned_users.through.objects.filter(community_id=OuterRef('pk'),
+                                                                     user__username=username)),
+            is_invited=Exists(CommunityInvite.objects.filter(community_id=OuterRef('pk'),
+                                                             invited_user__username=username)),
+            is_favorite=Exists(cls.starrers.through.objects.filter(community_id=OuterRef('pk'),
+                                                                   user__username=username)),
+        ).values(*cls.COMMUNITY_ROLES).first()
+
+        return roles or {role: False for role in cls.COMMUNITY_ROLES}
+
     @classmethod
     def is_community_with_name_invites_enabled(cls, community_name):
         return cls.objects.filter(name=community_name, invites_enabled=True).exists()
@@ -90,20 +140,25 @@ class Community(models.Model):
         return cls.objects.filter(name=community_name, type='T').exists()
 
     @classmethod
-    def search_communities_with_query(cls, query):
-        communities_query = Q(name__icontains=query)
-        communities_query.add(Q(title__icontains=query), Q.OR)
-        return cls.objects.filter(communities_query)
+    def search_communities_with_query(cls, query, communities_ids=None):
+        """
+        :param communities_ids: restricts the search to these communities ids or ids subquery
+        """
+        communities_ids = CommunitySearchEntry.search_communities_ids(query, communities_ids=communities_ids)
+        return cls.objects.filter(pk__in=communities_ids).order_by(make_search_ranking(communities_ids))
 
     @classmethod
     def get_trending_communities(cls, category_name=None):
-        trending_communities_query = Q()
-
+        """
+        Returns the communities of the latest trending communities ranking of the category, or of all the
+        communities when there is no category, see TrendingCommunity.refresh_trending_communities
+        """
         if category_name:
-            trending_communities_query.add(Q(categories__name=category_name), Q.AND)
+            trending_communities_query = Q(trending_entries__category__name=category_name)
+        else:
+            trending_communities_query = Q(trending_entries__category__isnull=True)
 
-        return cls.objects.annotate(Count('memberships')).filter(trending_communities_query).order_by(
-            '-memberships__count', '-created')
+        return cls.objects.filter(trending_communities_query).order_by('-trending_entries__score', '-created')
 
     @classmethod
     def create_community(cls, name, title, creator, color, type=None, user_adjective=None, users_adjective=None,
@@ -155,17 +210,12 @@ class Community(models.Model):
     def search_community_with_name_members(cls, community_name, query, exclude_keywords=None):
         db_query = Q(communities_memberships__community__name=community_name)
 
-        community_members_query = Q(communities_memberships__user__username__icontains=query)
-        community_members_query.add(Q(communities_memberships__user__profile__name__icontains=query), Q.OR)
-
-        db_query.add(community_members_query, Q.AND)
-
         if exclude_keywords:
             db_query.add(
                 cls._get_exclude_members_query_for_keywords(exclude_keywords=exclude_keywords),
                 Q.AND)
 
-        return User.objects.filter(db_query)
+        return cls._search_users_with_query(query=query, users_query=db_query)
 
     @classmethod
     def _get_exclude_members_query_for_keywords(cls, exclude_keywords):
@@ -194,12 +244,7 @@ class Community(models.Model):
         db_query = Q(communities_memberships__community__name=community_name,
                      communities_memberships__is_administrator=True)
 
-        community_members_query = Q(communities_memberships__user__username__icontains=query)
-        community_members_query.add(Q(communities_memberships__user__profile__name__icontains=query), Q.OR)
-
-        db_query.add(community_members_query, Q.AND)
-
-        return User.objects.filter(db_query)
+        return cls._search_users_with_query(query=query, users_query=db_query)
 
     @classmethod
     def get_community_with_name_moderators(cls, community_name, moderators_max_id=None):
@@ -216,12 +261,7 @@ class Community(models.Model):
         db_query = Q(communities_memberships__community__name=community_name,
                      communities_memberships__is_moderator=True)
 
-        community_members_query = Q(communities_memberships__user__username__icontains=query)
-        community_members_query.add(Q(communities_memberships__user__profile__name__icontains=query), Q.OR)
-
-        db_query.add(community_members_query, Q.AND)
-
-        return User.objects.filter(db_query)
+        return cls._search_users_with_query(query=query, users_query=db_query)
 
     @classmethod
     def get_community_with_name_banned_users(cls, community_name, users_max_id):
@@ -236,9 +276,16 @@ class Community(models.Model):
     @classmethod
     def search_community_with_name_banned_users(cls, community_name, query):
         community = Community.objects.get(name=community_name)
-        community_banned_users_query = Q(username__icontains=query)
-        community_banned_users_query.add(Q(profile__name__icontains=query), Q.OR)
-        return community.banned_users.filter(community_banned_users_query)
+        return cls._search_users_with_query(query=query, users_query=Q(banned_of_communities=community))
+
+    @classmethod
+    def _search_users_with_query(cls, query, users_query):
+        """
+        Searches the users matching the users_query through the users search index, best matches first
+        """
+        UserSearchEntry = get_user_search_entry_model()
+        users_ids = UserSearchEntry.search_users_ids(query, users_ids=User.objects.filter(users_query).values('id'))
+        return User.objects.filter(pk__in=users_ids).order_by(make_search_ranking(users_ids))
 
     @property
     def members_count(self):
@@ -315,6 +362,20 @@ class Community(models.Model):
         user_membership = self.memberships.get(user=user)
         user_membership.delete()
 
+    def remove_members(self, users):
+        """
+        Removes the memberships and favorites of the users in the community that are members of it
+        :return: the ids of the users that were members
+        """
+        users_ids = [user.pk for user in users]
+        memberships = self.memberships.filter(user_id__in=users_ids)
+        members_ids = list(memberships.values_list('user_id', flat=True))
+
+        self.starrers.through.objects.filter(community_id=self.pk, user_id__in=members_ids).delete()
+        memberships.delete()
+
+        return members_ids
+
     def set_categories_with_names(self, categories_names):
         self.clear_categories()
         Category = get_category_model()
@@ -338,6 +399,21 @@ class Community(models.Model):
                                 source_user=source_user,
                                 target_user=target_user)
 
+    def create_users_ban_logs(self, source_user, target_users):
+        return self._bulk_create_logs(action_type='B',
+                                      source_user=source_user,
+                                      target_users=target_users)
+
+    def create_users_unban_logs(self, source_user, target_users):
+        return self._bulk_create_logs(action_type='U',
+                                      source_user=source_user,
+                                      target_users=target_users)
+
+    def create_members_removal_logs(self, source_user, target_users):
+        return self._bulk_create_logs(action_type='RMB',
+                                      source_user=source_user,
+                                      target_users=target_users)
+
     def create_add_administrator_log(self, source_user, target_user):
         return self._create_log(action_type='AA',
                                 source_user=source_user,
@@ -375,6 +451,13 @@ class Community(models.Model):
                                                                     action_type=action_type,
                                                                     source_user=source_user)
 
+    def _bulk_create_logs(self, action_type, source_user, target_users):
+        CommunityModeratorUserActionLog = get_community_log_model()
+        return CommunityModeratorUserActionLog.bulk_create_community_logs(community=self,
+                                                                          target_users=target_users,
+                                                                          action_type=action_type,
+                                                                          source_user=source_user)
+
     def save(self, *args, **kwargs):
         ''' On save, update timestamps '''
         if not self.id:
@@ -394,6 +477,126 @@ class Community(models.Model):
         return self.name
 
 
+class CommunitySearchEntry(models.Model):
+    """
+    The name and title of a community normalized for search, with their trigrams in CommunitySearchTrigram
+    """
+    community = models.OneToOneField(Community, on_delete=models.CASCADE, related_name='search_entry')
+    name = models.CharField(max_length=settings.COMMUNITY_NAME_MAX_LENGTH, db_index=True)
+    title = models.CharField(max_length=settings.COMMUNITY_TITLE_MAX_LENGTH, db_index=True)
+    # Breaks the ties between equally ranked communities, kept in sync with the memberships
+    members_count = models.PositiveIntegerField(default=0)
+
+    @classmethod
+    def update_entry_for_community(cls, community):
+        name = normalize_search_text(community.name)
+        title = normalize_search_text(community.title)
+
+        entry = cls.objects.filter(community_id=community.pk).first()
+
+        if entry and entry.name == name and entry.title == title:
+            return entry
+
+        if entry:
+            entry.name = name
+            entry.title = title
+            entry.save()
+            entry.trigrams.all().delete()
+        else:
+            entry = cls.objects.create(community_id=community.pk, name=name, title=title,
+                                       members_count=CommunityMembership.objects.filter(
+                                           community_id=community.pk).count())
+
+        CommunitySearchTrigram.objects.bulk_create(
+            [CommunitySearchTrigram(entry=entry, trigram=trigram) for trigram in entry.get_trigrams()])
+
+        return entry
+
+    @classmethod
+    def rebuild_entries_for_communities_with_ids(cls, communities_ids):
+        """
+        Recreates the search entries of the given communities with one insert per table
+        """
+        cls.objects.filter(community_id__in=communities_ids).delete()
+
+        communities = Community.objects.filter(pk__in=communities_ids).annotate(
+            memberships_count=Count('memberships')).values_list('id', 'name', 'title', 'memberships_count')
+
+        entries = [cls(community_id=community_id, name=normalize_search_text(name),
+                       title=normalize_search_text(title), members_count=memberships_count)
+                   for community_id, name, title, memberships_count in communities]
+        cls.objects.bulk_create(entries)
+
+        # MySQL does not return the ids of bulk inserted rows
+        entries = cls.objects.filter(community_id__in=communities_ids)
+        CommunitySearchTrigram.objects.bulk_create(
+            [CommunitySearchTrigram(entry=entry, trigram=trigram) for entry in entries for trigram in
+             entry.get_trigrams()])
+
+        return len(entries)
+
+    @classmethod
+    def search_communities_ids(cls, query, communities_ids=None, max_results=None):
+        """
+        Returns the ids of the communities whose name or title match the query, best first:
+        the exact name, then the names and titles starting with it, then the ones containing it.
+        Within each of them, the communities with the most members come first.
+        :param communities_ids: restricts the search to these communities ids or ids subquery
+        """
+        entries = cls.objects.all()
+
+        if communities_ids is not None:
+            entries = entries.filter(community_id__in=communities_ids)
+
+        return search_entries_keys(entries, CommunitySearchTrigram, query=query, fields=('name', 'title'),
+                                   key_field='community_id', order_by=('-members_count', 'name'),
+                                   max_results=max_results or settings.SEARCH_MAX_RESULTS)
+
+    @classmethod
+    def increment_members_count_for_community_with_id(cls, community_id):
+        cls.objects.filter(community_id=community_id).update(members_count=F('members_count') + 1)
+
+    @classmethod
+    def decrement_members_count_for_community_with_id(cls, community_id):
+        # Subtracting from an unsigned zero errors on MySQL
+        cls.objects.filter(community_id=community_id, members_count__gt=0).update(
+            members_count=F('members_count') - 1)
+
+    def get_trigrams(self):
+        return make_search_trigrams(self.name) | make_search_trigrams(self.title)
+
+
+class CommunitySearchTrigram(models.Model):
+    entry = models.ForeignKey(CommunitySearchEntry, on_delete=models.CASCADE, related_name='trigrams')
+    trigram = models.CharField(max_length=3)
+
+    class Meta:
+        unique_together = ('trigram', 'entry',)
+
+
+@receiver(post_save, sender=Community, dispatch_uid='update_community_search_entry')
+def update_community_search_entry(sender, instance=None, **kwargs):
+    """"
+    Keep the search entry of the community in sync with its name and title
+    """
+    CommunitySearchEntry.update_entry_for_community(instance)
+
+
+@receiver(post_save, sender=Community, dispatch_uid='update_community_typeahead_item')
+def update_community_typeahead_item(sender, instance=None, **kwargs):
+    """"
+    Keep the typeahead index of this process in sync with the name and avatar of the community
+    """
+    item = make_community_typeahead_item(instance.pk, instance.name, instance.avatar.name)
+    transaction.on_commit(lambda: get_communities_typeahead_index().update_item(*item))
+
+
+@receiver(post_delete, sender=Community, dispatch_uid='remove_community_typeahead_item')
+def remove_community_typeahead_item(sender, instance=None, **kwargs):
+    community_id = instance.pk
+    transaction.on_commit(lambda: get_communities_typeahead_index().remove_item(community_id))
+
+
 class CommunityMembership(models.Model):
     """
     An object representing the membership of a user in a community
@@ -423,6 +626,17 @@ class CommunityMembership(models.Model):
         return super(CommunityMembership, self).save(*args, **kwargs)
 
 
+@receiver(post_save, sender=CommunityMembership, dispatch_uid='increment_community_search_entry_members_count')
+def increment_community_search_entry_members_count(sender, instance=None, created=False, **kwargs):
+    if created:
+        CommunitySearchEntry.increment_members_count_for_community_with_id(instance.community_id)
+
+
+@receiver(post_delete, sender=CommunityMembership, dispatch_uid='decrement_community_search_entry_members_count')
+def decrement_community_search_entry_members_count(sender, instance=None, **kwargs):
+    CommunitySearchEntry.decrement_members_count_for_community_with_id(instance.community_id)
+
+
 class CommunityLog(models.Model):
     """
     A log for community moderators user actions such as banning/unbanning
@@ -445,6 +659,7 @@ class CommunityLog(models.Model):
         ('RA', 'Remove Administrator'),
         ('RP', 'Remove Post'),
         ('RPC', 'Remove Post Comment'),
+        ('RMB', 'Remove Member'),
     )
     action_type = models.CharField(editable=False, blank=False, null=False, choices=ACTION_TYPES, max_length=5)
 
@@ -453,6 +668,15 @@ class CommunityLog(models.Model):
         return cls.objects.create(community=community, action_type=action_type, source_user=source_user,
                                   target_user=target_user)
 
+    @classmethod
+    def bulk_create_community_logs(cls, community, action_type, source_user, target_users):
+        # bulk_create does not call save
+        created = timezone.now()
+        return cls.objects.bulk_create([
+            cls(community=community, action_type=action_type, source_user=source_user, target_user=target_user,
+                created=created) for target_user in target_users
+        ])
+
     def save(self, *args, **kwargs):
         ''' On save, update timestamps '''
         if not self.id:
@@ -478,3 +702,115 @@ class CommunityInvite(models.Model):
     @classmethod
     def is_user_with_username_invited_to_community_with_name(cls, username, community_name):
         return cls.objects.filter(community__name=community_name, invited_user__username=username).exists()
+
+
+class TrendingCommunity(models.Model):
+    """
+    A community of the trending communities ranking of a category, or of all the communities when it has no
+    category. Rewritten by the refresh_trending_communities command.
+    """
+    community = models.ForeignKey(Community, on_delete=models.CASCADE, related_name='trending_entries')
+    category = models.ForeignKey('openbook_categories.Category', on_delete=models.CASCADE,
+                                 related_name='trending_communities', null=True)
+    score = models.FloatField()
+    # When the ranking the community is part of was computed
+    scored = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['category', '-score'], name='trending_community_category'),
+        ]
+
+    @classmethod
+    def refresh_trending_communities(cls, categories_ids=None):
+        """
+        Replaces the ranking of all the communities and the ones of every category with the current best
+        TRENDING_COMMUNITIES_COUNT communities, or only the rankings of the given categories
+        :return: the amount of ranked communities
+        """
+        Category = get_category_model()
+        CategoryCommunity = Category.communities.through
+
+        categories_communities = CategoryCommunity.objects.all()
+
+        if categories_ids is None:
+            # Cleared before ranking so that the changes made while ranking mark the categories stale again
+            Category.objects.filter(trending_communities_stale=True).update(trending_communities_stale=False)
+            categories_ids = list(Category.objects.values_list('id', flat=True))
+            communities = Community.objects.all()
+            rankings_categories_ids = [None] + categories_ids
+        else:
+            categories_communities = categories_communities.filter(category_id__in=categories_ids)
+            communities = Community.objects.filter(categories__id__in=categories_ids)
+            rankings_categories_ids = categories_ids
+
+        now = timezone.now()
+        communities_scores = cls._get_communities_scores(communities=communities, now=now)
+
+        rankings_communities_ids = {category_id: [] for category_id in rankings_categories_ids}
+
+        if None in rankings_communities_ids:
+            rankings_communities_ids[None] = list(communities_scores.keys())
+
+        for category_id, community_id in categories_communities.values_list('category_id', 'community_id'):
+            if category_id in rankings_communities_ids and community_id in communities_scores:
+                rankings_communities_ids[category_id].append(community_id)
+
+        ranked_communities_count = 0
+
+        for category_id in rankings_categories_ids:
+            best_communities = heapq.nlargest(settings.TRENDING_COMMUNITIES_COUNT,
+                                              ((communities_scores[community_id], community_id) for community_id in
+                                               rankings_communities_ids[category_id]))
+
+            # Readers keep seeing the previous ranking until the new one is complete
+            with transaction.atomic():
+                cls.objects.filter(category_id=category_id).delete()
+                cls.objects.bulk_create(
+                    [cls(community_id=community_id, category_id=category_id, score=score, scored=now) for
+                     score, community_id in best_communities])
+
+            ranked_communities_count += len(best_communities)
+
+        return ranked_communities_count
+
+    @classmethod
+    def refresh_stale_trending_communities(cls):
+        """
+        Replaces the rankings of the categories whose communities changed since they were last ranked
+        :return: the amount of ranked communities
+        """
+        Category = get_category_model()
+
+        stale_categories = Category.objects.filter(trending_communities_stale=True)
+        categories_ids = list(stale_categories.values_list('id', flat=True))
+
+        if not categories_ids:
+            return 0
+
+        # Cleared before ranking so that the changes made while ranking mark the categories stale again
+        Category.objects.filter(pk__in=categories_ids).update(trending_communities_stale=False)
+
+        return cls.refresh_trending_communities(categories_ids=categories_ids)
+
+    @classmethod
+    def _get_communities_scores(cls, communities, now):
+        """
+        Scores the communities by their members, counting the ones that joined within
+        TRENDING_COMMUNITIES_GROWTH_WINDOW_HOURS TRENDING_COMMUNITIES_GROWTH_WEIGHT times
+        :return: dict with the score of every community with members
+        """
+        memberships = CommunityMembership.objects.filter(community__in=communities)
+
+        members_counts = memberships.values('community_id').annotate(count=Count('id')).values_list('community_id',
+                                                                                                   'count')
+        new_members_counts = dict(memberships.filter(
+            created__gte=now - timedelta(hours=settings.TRENDING_COMMUNITIES_GROWTH_WINDOW_HOURS)).values(
+            'community_id').annotate(count=Count('id')).values_list('community_id', 'count'))
+
+        growth_weight = settings.TRENDING_COMMUNITIES_GROWTH_WEIGHT
+
+        return {
+            community_id: members_count + new_members_counts.get(community_id, 0) * growth_weight
+            for community_id, members_count in members_counts
+        }
@@ -16,7 +16,7 @@ class IsInvitedField(Field):
         if request_user.is_anonymous:
             return False
 
-        return request_user.is_invited_to_community_with_name(community.name)
+        return request_user.get_roles_in_community_with_name(community.name)['is_invited']
 
 
 class IsCreatorField(Field):
@@ -32,7 +32,7 @@ class IsCreatorField(Field):
         if request_user.is_anonymous:
             return False
 
-        return request_user.is_creator_of_community_with_name(community.name)
+        return request_user.get_roles_in_community_with_name(community.name)['is_creator']
 
 
 class IsFavoriteField(Field):
@@ -48,7 +48,7 @@ class IsFavoriteField(Field):
         if request_user.is_anonymous:
             return False
 
-        return request_user.has_favorite_community_with_name(community.name)
+        return request_user.get_roles_in_community_with_name(community.name)['is_favorite']
 
 
 class RulesField(Field):
@@ -64,8 +64,8 @@ class RulesField(Field):
         request = self.context.get('request')
         request_user = request.user
 
-        if request_user.is_anonymous or not request_user.is_member_of_community_with_name(
-                community_name=community.name):
+        if request_user.is_anonymous or not request_user.get_roles_in_community_with_name(community.name)[
+            'is_member']:
             return None
 
         return community.rules
@@ -111,12 +111,19 @@ class CommunityMembershipsField(Field):
     def to_representation(self, community):
         request = self.context.get('request')
         request_user = request.user
+        prefetched_posts_data = self.context.get('prefetched_posts_data')
 
-        if request_user.is_anonymous or not request_user.is_member_of_community_with_name(
-                community_name=community.name):
+        if request_user.is_anonymous:
             return None
 
-        membership = community.memberships.get(user=request_user)
+        if prefetched_posts_data is not None:
+            membership = prefetched_posts_data['communities_memberships'].get(community.pk)
+            if not membership:
+                return None
+        elif not request_user.get_roles_in_community_with_name(community.name)['is_member']:
+            return None
+        else:
+            membership = community.memberships.get(user=request_user)
 
         return self.community_membership_serializer([membership], context={"request": request}, many=True).data
 
@@ -133,8 +140,8 @@ class UserCommunitiesMembershipsField(Field):
         request_user = request.user
         community = self.context.get('community')
 
-        if not community or request_user.is_anonymous or not request_user.is_member_of_community_with_name(
-                community_name=community.name):
+        if not community or request_user.is_anonymous or not request_user.get_roles_in_community_with_name(
+                community.name)['is_member']:
             return None
 
         membership = community.memberships.get(user=request_user)
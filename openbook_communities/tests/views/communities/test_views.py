@@ -1,6 +1,8 @@
 # Create your tests here.
 import random
+from io import StringIO
 
+from django.core.management import call_command
 from django.urls import reverse
 from django.conf import settings
 from faker import Faker
@@ -14,6 +16,7 @@ import json
 from openbook_common.tests.helpers import make_user, make_authentication_headers_for_user, \
     make_community_avatar, make_community_cover, make_category, make_community_users_adjective, \
     make_community_user_adjective, make_community
+from openbook_common.utils.model_loaders import get_trending_community_model
 from openbook_communities.models import Community
 
 logger = logging.getLogger(__name__)
@@ -696,6 +699,98 @@ class SearchJoinedCommunitiesAPITests(APITestCase):
         return reverse('search-joined-communities')
 
 
+class TrendingCommunitiesAPITests(APITestCase):
+    """
+    TrendingCommunitiesAPI
+    """
+
+    def test_retrieves_ranked_trending_communities(self):
+        """
+        should retrieve the communities of the last ranking, the ones with the most members first
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        small_community = make_community(creator=make_user())
+        big_community = make_community(creator=make_user())
+
+        for i in range(0, 3):
+            make_user().join_community_with_name(big_community.name)
+
+        call_command('refresh_trending_communities', stdout=StringIO())
+
+        response = self.client.get(self._get_url(), **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_communities_ids = [response_community['id'] for response_community in
+                                    json.loads(response.content)]
+
+        self.assertEqual(response_communities_ids, [big_community.pk, small_community.pk])
+
+    def test_retrieves_ranked_trending_communities_of_category(self):
+        """
+        should retrieve only the communities of the category from the last ranking
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        community = make_community(creator=make_user())
+        make_community(creator=make_user())
+
+        call_command('refresh_trending_communities', stdout=StringIO())
+
+        response = self.client.get(self._get_url(), {
+            'category': community.categories.get().name
+        }, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_communities_ids = [response_community['id'] for response_community in
+                                    json.loads(response.content)]
+
+        self.assertEqual(response_communities_ids, [community.pk])
+
+    def test_ranks_communities_added_to_category_once_stale_categories_are_refreshed(self):
+        """
+        should keep the last ranking of a category when its communities change until its stale ranking is refreshed
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        community = make_community(creator=make_user())
+        category = community.categories.get()
+
+        call_command('refresh_trending_communities', stdout=StringIO())
+
+        other_community = make_community(creator=make_user())
+        make_user().join_community_with_name(other_community.name)
+        category.communities.add(other_community)
+
+        response = self.client.get(self._get_url(), {
+            'category': category.name
+        }, **headers)
+
+        response_communities_ids = [response_community['id'] for response_community in
+                                    json.loads(response.content)]
+
+        self.assertEqual(response_communities_ids, [community.pk])
+
+        get_trending_community_model().refresh_stale_trending_communities()
+
+        response = self.client.get(self._get_url(), {
+            'category': category.name
+        }, **headers)
+
+        response_communities_ids = [response_community['id'] for response_community in
+                                    json.loads(response.content)]
+
+        self.assertEqual(response_communities_ids, [other_community.pk, community.pk])
+
+    def _get_url(self):
+        return reverse('trending-communities')
+
+
 class AdministratedCommunities(APITestCase):
     def test_retrieve_administrated_communities(self):
         """
@@ -1069,5 +1164,30 @@ class SearchCommunitiesAPITests(APITestCase):
             self.assertEqual(retrieved_community['title'], community_title)
             community.delete()
 
+    def test_ranks_queried_communities(self):
+        """
+        should list the exact name first, then the names and titles starting with the query, then the ones
+        containing it, the ones with the most members first within each of them
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        containing_community = mixer.blend(Community, name='thecycling', title='The cycling')
+        prefix_community = mixer.blend(Community, name='cyclingclub', title='Club')
+        popular_prefix_community = mixer.blend(Community, name='cyclingfans', title='Fans')
+        exact_community = mixer.blend(Community, name='cycling', title='Bikes')
+
+        popular_prefix_community.add_member(make_user())
+
+        url = self._get_url()
+        response = self.client.get(url, {
+            'query': 'Cycling'
+        }, **headers)
+
+        response_communities_ids = [community['id'] for community in json.loads(response.content)]
+
+        self.assertEqual(response_communities_ids, [exact_community.pk, popular_prefix_community.pk,
+                                                    prefix_community.pk, containing_community.pk])
+
     def _get_url(self):
         return reverse('search-communities')
@@ -1,5 +1,6 @@
 import random
 
+from django.conf import settings
 from django.urls import reverse
 from faker import Faker
 from rest_framework import status
@@ -485,6 +486,182 @@ class UnbanCommunityUserAPITest(APITestCase):
         })
 
 
+class BulkBanCommunityUsersAPITest(APITestCase):
+    def test_can_bulk_ban_users_from_community_if_mod(self):
+        """
+        should be able to ban many users from a community if is moderator, removing their memberships and return 200
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        other_user = make_user()
+        community = make_community(creator=other_user, type='P')
+        community_name = community.name
+
+        user.join_community_with_name(community_name)
+        other_user.add_moderator_with_username_to_community_with_name(username=user.username,
+                                                                      community_name=community.name)
+
+        member_to_ban = make_user()
+        member_to_ban.join_community_with_name(community_name)
+        member_to_ban.favorite_community_with_name(community_name)
+
+        users_to_ban = [member_to_ban, make_user(), make_user()]
+
+        url = self._get_url(community_name=community.name)
+        response = self.client.post(url, {
+            'usernames': ','.join([user_to_ban.username for user_to_ban in users_to_ban])
+        }, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        for user_to_ban in users_to_ban:
+            self.assertTrue(user_to_ban.is_banned_from_community_with_name(community.name))
+            self.assertTrue(community.logs.filter(action_type='B',
+                                                  source_user=user,
+                                                  target_user=user_to_ban).exists())
+
+        self.assertFalse(member_to_ban.is_member_of_community_with_name(community.name))
+        self.assertFalse(member_to_ban.has_favorite_community_with_name(community.name))
+
+    def test_cant_bulk_ban_users_from_community_if_any_is_moderator(self):
+        """
+        should not be able to ban many users from a community if any of them is a moderator and return 400
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        community = make_community(creator=user, type='P')
+        community_name = community.name
+
+        moderator = make_user()
+        moderator.join_community_with_name(community_name)
+        user.add_moderator_with_username_to_community_with_name(username=moderator.username,
+                                                                community_name=community_name)
+
+        user_to_ban = make_user()
+
+        url = self._get_url(community_name=community.name)
+        response = self.client.post(url, {
+            'usernames': ','.join([user_to_ban.username, moderator.username])
+        }, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertFalse(user_to_ban.is_banned_from_community_with_name(community.name))
+        self.assertFalse(moderator.is_banned_from_community_with_name(community.name))
+
+    def test_cant_bulk_ban_users_from_community_if_member(self):
+        """
+        should not be able to ban many users from a community if is member and return 400
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        other_user = make_user()
+        community = make_community(creator=other_user, type='P')
+
+        user.join_community_with_name(community.name)
+
+        user_to_ban = make_user()
+
+        url = self._get_url(community_name=community.name)
+        response = self.client.post(url, {
+            'usernames': user_to_ban.username
+        }, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertFalse(user_to_ban.is_banned_from_community_with_name(community.name))
+
+    def test_cant_bulk_ban_more_than_max_users(self):
+        """
+        should not be able to ban more than COMMUNITY_BULK_MODERATION_MAX_USERNAMES users at once and return 400
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        community = make_community(creator=user, type='P')
+
+        usernames = ['user%d' % i for i in range(settings.COMMUNITY_BULK_MODERATION_MAX_USERNAMES + 1)]
+
+        url = self._get_url(community_name=community.name)
+        response = self.client.post(url, {
+            'usernames': ','.join(usernames)
+        }, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def _get_url(self, community_name):
+        return reverse('community-bulk-ban-users', kwargs={
+            'community_name': community_name
+        })
+
+
+class BulkUnbanCommunityUsersAPITest(APITestCase):
+    def test_can_bulk_unban_users_from_community_if_mod(self):
+        """
+        should be able to unban many users from a community if is moderator and return 200
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        other_user = make_user()
+        community = make_community(creator=other_user, type='P')
+        community_name = community.name
+
+        user.join_community_with_name(community_name)
+        other_user.add_moderator_with_username_to_community_with_name(username=user.username,
+                                                                      community_name=community.name)
+
+        users_to_unban = [make_user(), make_user()]
+        other_user.ban_users_with_usernames_from_community_with_name(
+            usernames=[user_to_unban.username for user_to_unban in users_to_unban], community_name=community_name)
+
+        url = self._get_url(community_name=community.name)
+        response = self.client.post(url, {
+            'usernames': ','.join([user_to_unban.username for user_to_unban in users_to_unban])
+        }, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        for user_to_unban in users_to_unban:
+            self.assertFalse(user_to_unban.is_banned_from_community_with_name(community.name))
+            self.assertTrue(community.logs.filter(action_type='U',
+                                                  source_user=user,
+                                                  target_user=user_to_unban).exists())
+
+    def test_cant_bulk_unban_users_from_community_if_any_is_not_banned(self):
+        """
+        should not be able to unban many users from a community if any of them is not banned and return 400
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        community = make_community(creator=user, type='P')
+        community_name = community.name
+
+        banned_user = make_user()
+        user.ban_user_with_username_from_community_with_name(username=banned_user.username,
+                                                             community_name=community_name)
+
+        not_banned_user = make_user()
+
+        url = self._get_url(community_name=community.name)
+        response = self.client.post(url, {
+            'usernames': ','.join([banned_user.username, not_banned_user.username])
+        }, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertTrue(banned_user.is_banned_from_community_with_name(community.name))
+
+    def _get_url(self, community_name):
+        return reverse('community-bulk-unban-users', kwargs={
+            'community_name': community_name
+        })
+
+
 class SearchCommunityBannedUsersAPITests(APITestCase):
     """
     SearchCommunityBannedUsersAPITests
@@ -505,6 +505,96 @@ class UninviteCommunityMembersAPITest(APITestCase):
         })
 
 
+class BulkRemoveCommunityMembersAPITest(APITestCase):
+    def test_can_bulk_remove_members_if_mod(self):
+        """
+        should be able to remove many members from a community if is moderator, logging it and return 200
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        other_user = make_user()
+        community = make_community(creator=other_user, type='P')
+        community_name = community.name
+
+        user.join_community_with_name(community_name)
+        other_user.add_moderator_with_username_to_community_with_name(username=user.username,
+                                                                      community_name=community_name)
+
+        members_to_remove = [make_user(), make_user()]
+
+        for member_to_remove in members_to_remove:
+            member_to_remove.join_community_with_name(community_name)
+
+        url = self._get_url(community_name=community_name)
+        response = self.client.post(url, {
+            'usernames': ','.join([member_to_remove.username for member_to_remove in members_to_remove])
+        }, **headers)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+
+        for member_to_remove in members_to_remove:
+            self.assertFalse(member_to_remove.is_member_of_community_with_name(community_name))
+            self.assertFalse(member_to_remove.is_banned_from_community_with_name(community_name))
+            self.assertTrue(community.logs.filter(action_type='RMB',
+                                                  source_user=user,
+                                                  target_user=member_to_remove).exists())
+
+    def test_cant_bulk_remove_members_if_any_is_not_member(self):
+        """
+        should not be able to remove many members from a community if any of them is not a member and return 400
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        community = make_community(creator=user, type='P')
+        community_name = community.name
+
+        member = make_user()
+        member.join_community_with_name(community_name)
+
+        not_member = make_user()
+
+        url = self._get_url(community_name=community_name)
+        response = self.client.post(url, {
+            'usernames': ','.join([member.username, not_member.username])
+        }, **headers)
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+        self.assertTrue(member.is_member_of_community_with_name(community_name))
+
+    def test_cant_bulk_remove_members_if_member(self):
+        """
+        should not be able to remove many members from a community if is just a member and return 400
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        other_user = make_user()
+        community = make_community(creator=other_user, type='P')
+        community_name = community.name
+
+        user.join_community_with_name(community_name)
+
+        member = make_user()
+        member.join_community_with_name(community_name)
+
+        url = self._get_url(community_name=community_name)
+        response = self.client.post(url, {
+            'usernames': member.username
+        }, **headers)
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+        self.assertTrue(member.is_member_of_community_with_name(community_name))
+
+    def _get_url(self, community_name):
+        return reverse('community-bulk-remove-members', kwargs={
+            'community_name': community_name
+        })
+
+
 class JoinCommunityAPITest(APITestCase):
     def test_can_join_public_community(self):
         """
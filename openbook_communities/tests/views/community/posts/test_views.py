@@ -1,4 +1,5 @@
 from django.urls import reverse
+from django.utils import timezone
 from faker import Faker
 from rest_framework.test import APITestCase
 from rest_framework import status
@@ -88,6 +89,44 @@ class CommunityPostsAPITest(APITestCase):
             response_post_id = response_post.get('id')
             self.assertTrue(response_post_id < max_id)
 
+    def test_can_retrieve_posts_with_max_cursor_and_count(self):
+        """
+        should be able to page through community posts with the max cursor of the last retrieved post
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        other_user = make_user()
+        community = make_community(creator=other_user, type='P')
+        community_name = community.name
+
+        amount_of_community_posts = 5
+        community_posts_ids = []
+
+        for i in range(0, amount_of_community_posts):
+            community_post = other_user.create_community_post(community_name=community_name,
+                                                              text=make_fake_post_text())
+            community_posts_ids.append(community_post.pk)
+
+        # Posts created at the same time are told apart by their id
+        Post.objects.filter(id__in=community_posts_ids).update(created=timezone.now())
+
+        url = self._get_url(community_name=community_name)
+        response = self.client.get(url, {'count': 2}, **headers)
+        first_page_posts = json.loads(response.content)
+
+        response = self.client.get(url, {
+            'count': 10,
+            'max_cursor': first_page_posts[-1]['cursor']
+        }, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        second_page_posts = json.loads(response.content)
+        retrieved_posts_ids = [post['id'] for post in first_page_posts + second_page_posts]
+
+        self.assertEqual(retrieved_posts_ids, sorted(community_posts_ids, reverse=True))
+
     def test_can_retrieve_posts_from_private_community_member_of(self):
         """
         should be able to retrieve the posts for a private community member of and return 200
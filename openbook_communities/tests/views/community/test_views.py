@@ -176,6 +176,29 @@ class CommunityAPITests(APITestCase):
 
         self.assertEqual(community.name, new_community_name)
 
+    def test_updating_community_name_frees_the_old_name(self):
+        """
+        should not retrieve a community by its old name once renamed and return 404
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        community = make_community(creator=user)
+        old_community_name = community.name
+
+        url = self._get_url(community_name=old_community_name)
+
+        # Resolves the old name
+        response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.patch(url, {'name': make_community_name()}, **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_cannot_update_administrated_community_name_to_taken_name(self):
         """
         should not be able to update an administrated community name to an existing one and return 400
@@ -7,9 +7,10 @@ from rest_framework.views import APIView
 from django.utils.translation import gettext as _
 
 from openbook_common.responses import ApiMessageResponse
-from openbook_common.utils.helpers import normalise_request_data
+from openbook_common.utils.helpers import normalise_request_data, nomalize_usernames_in_request_data
 from openbook_communities.views.community.banned_users.serializers import GetCommunityBannedUsersUserSerializer, \
-    GetCommunityBannedUsersSerializer, BanUserSerializer, UnbanUserSerializer, SearchCommunityBannedUsersSerializer
+    GetCommunityBannedUsersSerializer, BanUserSerializer, UnbanUserSerializer, SearchCommunityBannedUsersSerializer, \
+    BulkBanUsersSerializer, BulkUnbanUsersSerializer
 
 
 class CommunityBannedUsers(APIView):
@@ -82,6 +83,54 @@ class UnbanUser(APIView):
         return ApiMessageResponse(_('Unbanned user!'), status=status.HTTP_200_OK)
 
 
+class BulkBanUsers(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request, community_name):
+        request_data = normalise_request_data(request.data)
+        nomalize_usernames_in_request_data(request_data)
+        request_data['community_name'] = community_name
+
+        serializer = BulkBanUsersSerializer(data=request_data)
+        serializer.is_valid(raise_exception=True)
+
+        data = serializer.validated_data
+
+        usernames = data.get('usernames')
+
+        user = request.user
+
+        with transaction.atomic():
+            user.ban_users_with_usernames_from_community_with_name(usernames=usernames,
+                                                                   community_name=community_name)
+
+        return ApiMessageResponse(_('Banned users!'), status=status.HTTP_200_OK)
+
+
+class BulkUnbanUsers(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request, community_name):
+        request_data = normalise_request_data(request.data)
+        nomalize_usernames_in_request_data(request_data)
+        request_data['community_name'] = community_name
+
+        serializer = BulkUnbanUsersSerializer(data=request_data)
+        serializer.is_valid(raise_exception=True)
+
+        data = serializer.validated_data
+
+        usernames = data.get('usernames')
+
+        user = request.user
+
+        with transaction.atomic():
+            user.unban_users_with_usernames_from_community_with_name(usernames=usernames,
+                                                                     community_name=community_name)
+
+        return ApiMessageResponse(_('Unbanned users!'), status=status.HTTP_200_OK)
+
+
 class SearchCommunityBannedUsers(APIView):
     permission_classes = (IsAuthenticated,)
 
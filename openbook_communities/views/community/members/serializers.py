@@ -30,6 +30,19 @@ class InviteCommunityMemberSerializer(serializers.Serializer):
                                            validators=[community_name_characters_validator, community_name_exists])
 
 
+class BulkRemoveCommunityMembersSerializer(serializers.Serializer):
+    usernames = serializers.ListField(
+        child=serializers.CharField(max_length=settings.USERNAME_MAX_LENGTH,
+                                    allow_blank=False,
+                                    validators=[username_characters_validator]),
+        min_length=1,
+        max_length=settings.COMMUNITY_BULK_MODERATION_MAX_USERNAMES,
+    )
+    community_name = serializers.CharField(max_length=settings.COMMUNITY_NAME_MAX_LENGTH,
+                                           allow_blank=False,
+                                           validators=[community_name_characters_validator, community_name_exists])
+
+
 class GetCommunityMembersSerializer(serializers.Serializer):
     max_id = serializers.IntegerField(
         required=False,
@@ -4,10 +4,12 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from openbook_common.utils.helpers import normalise_request_data, normalize_list_value_in_request_data
+from openbook_common.utils.helpers import normalise_request_data, normalize_list_value_in_request_data, \
+    nomalize_usernames_in_request_data
 from openbook_communities.views.community.members.serializers import JoinCommunitySerializer, \
     GetCommunityMembersSerializer, GetCommunityMembersMemberSerializer, LeaveCommunitySerializer, \
-    InviteCommunityMemberSerializer, MembersCommunitySerializer, SearchCommunityMembersSerializer, InviteUserSerializer
+    InviteCommunityMemberSerializer, MembersCommunitySerializer, SearchCommunityMembersSerializer, \
+    InviteUserSerializer, BulkRemoveCommunityMembersSerializer
 
 
 class CommunityMembers(APIView):
@@ -78,6 +80,31 @@ class LeaveCommunity(APIView):
                         status=status.HTTP_200_OK, )
 
 
+class BulkRemoveCommunityMembers(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request, community_name):
+        request_data = normalise_request_data(request.data)
+        nomalize_usernames_in_request_data(request_data)
+        request_data['community_name'] = community_name
+
+        serializer = BulkRemoveCommunityMembersSerializer(data=request_data)
+        serializer.is_valid(raise_exception=True)
+
+        data = serializer.validated_data
+
+        usernames = data.get('usernames')
+
+        user = request.user
+
+        with transaction.atomic():
+            community = user.remove_members_with_usernames_from_community_with_name(usernames=usernames,
+                                                                                   community_name=community_name)
+
+        return Response(MembersCommunitySerializer(community, context={'request': request}).data,
+                        status=status.HTTP_200_OK, )
+
+
 class InviteCommunityMember(APIView):
     permission_classes = (IsAuthenticated,)
 
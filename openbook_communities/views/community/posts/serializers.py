@@ -4,8 +4,9 @@ from rest_framework import serializers
 from openbook_auth.models import User, UserProfile
 from openbook_common.models import Emoji, Badge
 from openbook_common.serializers_fields.post import ReactionsEmojiCountField, CommentsCountField, PostCreatorField, \
-    IsMutedField
-from openbook_common.serializers_fields.request import RestrictedImageFileSizeField
+    IsMutedField, PostsListSerializer
+from openbook_common.serializers_fields.cursor import ItemCursorField
+from openbook_common.serializers_fields.request import RestrictedImageFileSizeField, CursorField
 from openbook_communities.models import CommunityMembership, Community
 from openbook_communities.validators import community_name_characters_validator, community_name_exists
 from openbook_posts.models import PostImage, PostVideo, Post
@@ -15,6 +16,9 @@ class GetCommunityPostsSerializer(serializers.Serializer):
     max_id = serializers.IntegerField(
         required=False,
     )
+    max_cursor = CursorField(
+        required=False,
+    )
     count = serializers.IntegerField(
         required=False,
         max_value=20
@@ -134,9 +138,11 @@ class CommunityPostSerializer(serializers.ModelSerializer):
     comments_count = CommentsCountField()
     community = CommunityPostCommunitySerializer(many=False)
     is_muted = IsMutedField()
+    cursor = ItemCursorField()
 
     class Meta:
         model = Post
+        list_serializer_class = PostsListSerializer
         fields = (
             'id',
             'uuid',
@@ -149,4 +155,5 @@ class CommunityPostSerializer(serializers.ModelSerializer):
             'creator',
             'community',
             'is_muted',
+            'cursor',
         )
@@ -24,11 +24,12 @@ class CommunityPosts(APIView):
 
         count = data.get('count', 10)
         max_id = data.get('max_id')
+        max_cursor = data.get('max_cursor')
 
         user = request.user
 
-        posts = user.get_posts_for_community_with_name(community_name=community_name, max_id=max_id).order_by(
-            '-created')[:count]
+        posts = user.get_posts_for_community_with_name(community_name=community_name, max_id=max_id,
+                                                       max_cursor=max_cursor).order_by('-created', '-id')[:count]
 
         response_serializer = CommunityPostSerializer(posts, many=True,
                                                       context={"request": request})
@@ -2,6 +2,7 @@ from django.db import models
 
 # Create your models here.
 from openbook_auth.models import User
+from openbook_common.utils.model_loaders import get_user_counts_model
 
 
 class Connection(models.Model):
@@ -26,6 +27,9 @@ class Connection(models.Model):
 
         connection.save()
 
+        UserCounts = get_user_counts_model()
+        UserCounts.increment_count_for_users_with_ids([user_id, target_user_id], 'connections_count')
+
         return connection
 
     @classmethod
@@ -95,6 +95,36 @@ class ConnectAPITests(APITestCase):
         self.assertTrue(
             user.is_connected_with_user_with_id_in_circle_with_id(user_to_connect.pk, user.connections_circle_id))
 
+    def test_connect_increments_connections_counts(self):
+        """
+        should increment the connections count of both users
+        """
+        user = mixer.blend(User)
+
+        auth_token = user.auth_token.key
+
+        circle_to_connect = mixer.blend(Circle, creator=user)
+        user_to_connect = mixer.blend(User)
+
+        headers = {'HTTP_AUTHORIZATION': 'Token %s' % auth_token}
+
+        data = {
+            'username': user_to_connect.username,
+            'circles_ids': circle_to_connect.pk
+        }
+
+        url = self._get_url()
+
+        self.client.post(url, data, **headers, format='multipart')
+
+        user.refresh_from_db()
+        user_to_connect.refresh_from_db()
+
+        self.assertEqual(user.counts.connections_count, 1)
+        self.assertEqual(user_to_connect.counts.connections_count, 1)
+        self.assertEqual(user.counts.connections_count, user.count_connections())
+        self.assertEqual(user_to_connect.counts.connections_count, user_to_connect.count_connections())
+
     def test_connect_autofollows(self):
         """
         should autofollow the user it attempts to connect with
@@ -265,6 +295,34 @@ class DisconnectAPITest(APITestCase):
 
         self.assertFalse(user.is_connected_with_user_in_circle(user_to_connect, circle_to_connect))
 
+    def test_disconnect_decrements_connections_counts(self):
+        """
+        should decrement the connections count of both users
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        user_to_connect = make_user()
+
+        user.connect_with_user_with_id(user_to_connect.pk)
+        user_to_connect.confirm_connection_with_user_with_id(user.pk)
+
+        data = {
+            'username': user_to_connect.username
+        }
+
+        url = self._get_url()
+
+        self.client.post(url, data, **headers, format='multipart')
+
+        user.refresh_from_db()
+        user_to_connect.refresh_from_db()
+
+        self.assertEqual(user.counts.connections_count, 0)
+        self.assertEqual(user_to_connect.counts.connections_count, 0)
+        self.assertEqual(user.counts.following_count, 0)
+        self.assertEqual(user_to_connect.counts.followers_count, 0)
+
     def test_disconnect_unfollows(self):
         """
         should automatically unfollow a user it disconnects from
@@ -2,6 +2,7 @@ from django.db import models
 
 # Create your models here.
 from openbook_auth.models import User
+from openbook_common.utils.model_loaders import get_user_counts_model
 
 
 class Follow(models.Model):
@@ -18,4 +19,8 @@ class Follow(models.Model):
         if lists_ids:
             follow.lists.add(*lists_ids)
 
+        UserCounts = get_user_counts_model()
+        UserCounts.increment_count_for_users_with_ids([user_id], 'following_count')
+        UserCounts.increment_count_for_users_with_ids([followed_user_id], 'followers_count')
+
         return follow
@@ -85,6 +85,36 @@ class FollowAPITests(APITestCase):
 
         self.assertTrue(user.is_following_user_in_list(user_to_follow, list_to_follow))
 
+    def test_follow_increments_following_and_followers_counts(self):
+        """
+        should increment the following count of the user and the followers count of the followed user
+        """
+        user = mixer.blend(User)
+
+        auth_token = user.auth_token.key
+
+        list_to_follow = mixer.blend(List, creator=user)
+        user_to_follow = mixer.blend(User)
+
+        headers = {'HTTP_AUTHORIZATION': 'Token %s' % auth_token}
+
+        data = {
+            'username': user_to_follow.username,
+            'lists_ids': list_to_follow.pk
+        }
+
+        url = self._get_url()
+
+        self.client.post(url, data, **headers, format='multipart')
+
+        user.refresh_from_db()
+        user_to_follow.refresh_from_db()
+
+        self.assertEqual(user.counts.following_count, 1)
+        self.assertEqual(user.counts.followers_count, 0)
+        self.assertEqual(user_to_follow.counts.followers_count, 1)
+        self.assertEqual(user_to_follow.counts.following_count, 0)
+
     def test_follow_in_multiple_lists(self):
         """
         should be able to follow another user on multiple lists and return 200
@@ -224,6 +254,35 @@ class UnfollowAPITest(APITestCase):
 
         self.assertFalse(user.is_following_user_in_list(user_to_unfollow, list_to_follow))
 
+    def test_unfollow_decrements_following_and_followers_counts(self):
+        """
+        should decrement the following count of the user and the followers count of the unfollowed user
+        """
+        user = mixer.blend(User)
+
+        auth_token = user.auth_token.key
+
+        list_to_follow = mixer.blend(List, creator=user)
+        user_to_unfollow = mixer.blend(User)
+
+        user.follow_user(user_to_unfollow, lists_ids=[list_to_follow.pk])
+
+        headers = {'HTTP_AUTHORIZATION': 'Token %s' % auth_token}
+
+        data = {
+            'username': user_to_unfollow.username
+        }
+
+        url = self._get_url()
+
+        self.client.post(url, data, **headers, format='multipart')
+
+        user.refresh_from_db()
+        user_to_unfollow.refresh_from_db()
+
+        self.assertEqual(user.counts.following_count, 0)
+        self.assertEqual(user_to_unfollow.counts.followers_count, 0)
+
     def test_cannot_unfollow_from_unexisting_follow(self):
         """
         should not be able to unfollow from an unexisting follow and return 400
@@ -28,7 +28,7 @@ class Command(BaseCommand):
 
         if badge_keyword:
             Badge = get_badge_model()
-            badge = Badge.objects.get(keyword=badge_keyword)
+            badge = Badge.get_badge_with_keyword(badge_keyword)
 
         user_invite = UserInvite.create_invite(name=name, email=email, username=username,
                                                badge=badge)
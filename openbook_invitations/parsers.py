@@ -22,7 +22,7 @@ def parse_kickstarter_csv(filepath):
                     username = get_temporary_username(email)
                     print('Using generated random username @', username)
                 badge_keyword = row[badge_keyword_col]
-                badge = Badge.objects.get(keyword=badge_keyword)
+                badge = Badge.get_badge_with_keyword(badge_keyword)
                 UserInvite = get_user_invite_model()
                 UserInvite.create_invite(name=name, email=email, username=username,
                                          badge=badge)
@@ -43,7 +43,7 @@ def parse_indiegogo_csv(filepath):
                 username = sanitise_username(row[username_col])
                 badge_keyword = row[badge_keyword_col]
                 if badge_keyword:
-                    badge = Badge.objects.get(keyword=badge_keyword)
+                    badge = Badge.get_badge_with_keyword(badge_keyword)
                 else:
                     badge = None
                 UserInvite = get_user_invite_model()
@@ -72,7 +72,7 @@ def parse_indiegogo_csv_and_sanitise_usernames(filepath):
                 username = sanitise_username(row[username_col])
                 badge_keyword = row[badge_keyword_col]
                 if badge_keyword:
-                    badge = Badge.objects.get(keyword=badge_keyword)
+                    badge = Badge.get_badge_with_keyword(badge_keyword)
                 else:
                     badge = None
                 UserInvite = get_user_invite_model()
@@ -0,0 +1,133 @@
+import time
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+import logging
+
+from django.db import transaction, connection
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from openbook_common.utils.helpers import add_deleted_rows_counts
+from openbook_common.utils.model_loaders import get_notification_model, get_post_reaction_notification_model, \
+    get_post_comment_notification_model
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Deletes the read notifications older than their NOTIFICATIONS_RETENTION_DAYS and collapses the post ' \
+           'reaction and comment read notifications older than NOTIFICATIONS_COMPACTION_DAYS'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Amount of notifications to delete in a single transaction')
+        parser.add_argument('--sleep', type=float, default=0,
+                            help='Seconds to wait between chunks, to leave room to other writers')
+
+    def handle(self, *args, **options):
+        Notification = get_notification_model()
+
+        chunk_size = options['chunk_size']
+        sleep = options['sleep']
+        now = timezone.now()
+
+        deleted_rows_counts = {}
+
+        for notification_type, retention_days in settings.NOTIFICATIONS_RETENTION_DAYS.items():
+            created_before = now - timedelta(days=retention_days)
+
+            while True:
+                notifications_ids = Notification.get_read_notifications_ids_created_before(
+                    notification_type=notification_type, created_before=created_before, max_amount=chunk_size)
+                if not notifications_ids:
+                    break
+
+                with transaction.atomic():
+                    add_deleted_rows_counts(deleted_rows_counts,
+                                            Notification.delete_notifications_with_ids(notifications_ids))
+
+                logger.info('Pruned %d read notifications of type %s' % (len(notifications_ids), notification_type))
+                time.sleep(sleep)
+
+        compacted_before = now - timedelta(days=settings.NOTIFICATIONS_COMPACTION_DAYS)
+
+        compacted_notifications = (
+            (get_post_reaction_notification_model(), 'post_reaction__post_id'),
+            (get_post_comment_notification_model(), 'post_comment__post_id'),
+        )
+
+        for notification_model, post_id_field in compacted_notifications:
+            for compacted_ids in _get_compacted_notifications_ids(notification_model, post_id_field,
+                                                                  compacted_before=compacted_before,
+                                                                  chunk_size=chunk_size):
+                with transaction.atomic():
+                    deleted_count, deleted_rows = notification_model.objects.filter(pk__in=compacted_ids).delete()
+                    add_deleted_rows_counts(deleted_rows_counts, deleted_rows)
+
+                logger.info('Compacted %d %s' % (len(compacted_ids), notification_model._meta.verbose_name_plural))
+                time.sleep(sleep)
+
+        reclaimed_bytes = 0
+
+        for model_label, deleted_rows_count in sorted(deleted_rows_counts.items()):
+            average_row_size = _get_average_row_size(apps.get_model(model_label))
+            if average_row_size:
+                reclaimed_bytes += deleted_rows_count * average_row_size
+            self.stdout.write('Deleted %d %s rows' % (deleted_rows_count, model_label))
+
+        self.stdout.write(self.style.SUCCESS('Deleted %d rows, reclaiming about %d bytes' % (
+            sum(deleted_rows_counts.values()), reclaimed_bytes)))
+
+
+def _get_compacted_notifications_ids(notification_model, post_id_field, compacted_before, chunk_size):
+    """
+    Yields in chunks the ids of the read notifications created before compacted_before that are followed
+    by a newer read one of the same owner for the same post. Unread notifications are never compacted.
+    """
+    repeated_notifications = notification_model.objects.filter(notification__created__lt=compacted_before,
+                                                               notification__read=True).values(
+        'notification__owner_id', post_id_field).annotate(notifications_count=Count('id'),
+                                                          latest_id=Max('id')).filter(notifications_count__gt=1)
+
+    compacted_ids = []
+
+    # Listed upfront as the notifications are deleted while going through them
+    for repeated_notification in list(repeated_notifications):
+        compacted_ids.extend(notification_model.objects.filter(**{
+            'notification__owner_id': repeated_notification['notification__owner_id'],
+            post_id_field: repeated_notification[post_id_field],
+            'notification__created__lt': compacted_before,
+            'notification__read': True,
+            'id__lt': repeated_notification['latest_id'],
+        }).values_list('id', flat=True))
+
+        while len(compacted_ids) >= chunk_size:
+            yield compacted_ids[:chunk_size]
+            compacted_ids = compacted_ids[chunk_size:]
+
+    if compacted_ids:
+        yield compacted_ids
+
+
+def _get_average_row_size(model):
+    """
+    Estimates the bytes a row of the model takes from the database statistics, None where there are none
+    """
+    table_name = model._meta.db_table
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute('SELECT AVG_ROW_LENGTH FROM information_schema.TABLES '
+                           'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s', [table_name])
+        elif connection.vendor == 'postgresql':
+            cursor.execute('SELECT pg_total_relation_size(oid) / GREATEST(reltuples, 1) FROM pg_class '
+                           'WHERE relname = %s', [table_name])
+        else:
+            return None
+
+        row = cursor.fetchone()
+
+    return int(row[0]) if row and row[0] else None
@@ -0,0 +1,117 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+import logging
+
+from openbook_common.utils.model_loaders import get_push_notification_model
+from openbook_notifications.push_notifications.backends import get_push_notifications_sender
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Delivers the queued push notifications, retrying the failed ones with a backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Amount of push notifications to claim at once')
+        parser.add_argument('--threads', type=int, default=8, help='Amount of provider calls to make in parallel')
+        parser.add_argument('--sleep', type=float, default=1,
+                            help='Seconds to wait when there are no push notifications to send')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once there are no push notifications left to send')
+
+    def handle(self, *args, **options):
+        PushNotification = get_push_notification_model()
+        sender = get_push_notifications_sender()
+
+        sent_count = 0
+        retried_count = 0
+
+        with ThreadPoolExecutor(max_workers=options['threads']) as executor:
+            while True:
+                push_notifications = PushNotification.claim_push_notifications_to_send(options['batch_size'])
+
+                if not push_notifications:
+                    if options['once']:
+                        break
+                    time.sleep(options['sleep'])
+                    continue
+
+                sent_push_notifications_ids = []
+                retried_push_notifications_ids = []
+
+                sends = _make_sends(push_notifications, max_devices=sender.max_devices_per_send)
+
+                for sent_ids, retried_ids in executor.map(lambda send: _send(sender, send), sends):
+                    sent_push_notifications_ids.extend(sent_ids)
+                    retried_push_notifications_ids.extend(retried_ids)
+
+                PushNotification.delete_sent_push_notifications_with_ids(sent_push_notifications_ids)
+                PushNotification.retry_push_notifications_with_ids(retried_push_notifications_ids)
+
+                sent_count += len(sent_push_notifications_ids)
+                retried_count += len(retried_push_notifications_ids)
+                logger.info('Sent %d and retried %d push notifications' % (
+                    len(sent_push_notifications_ids), len(retried_push_notifications_ids)))
+
+        self.stdout.write(
+            self.style.SUCCESS('Sent %d and retried %d push notifications' % (sent_count, retried_count)))
+
+
+def _make_sends(push_notifications, max_devices=None):
+    """
+    Coalesces the push notifications of a device in the same group into the latest one, then puts the ones
+    with the same content for many devices into a single send of at most max_devices devices
+    :return: list of sends, each a list of (device push notifications, latest push notification) tuples
+    """
+    devices_deliveries = []
+    groups_deliveries = {}
+
+    for push_notification in push_notifications:
+        group_key = (push_notification.device_id, push_notification.group)
+        group_delivery = groups_deliveries.get(group_key) if push_notification.group else None
+
+        if group_delivery:
+            group_delivery.append(push_notification)
+        else:
+            delivery = [push_notification]
+            devices_deliveries.append(delivery)
+            if push_notification.group:
+                groups_deliveries[group_key] = delivery
+
+    sends = []
+    contents_sends = {}
+
+    for delivery in devices_deliveries:
+        latest_push_notification = delivery[-1]
+        content_key = (latest_push_notification.post_body, len(delivery))
+        send = contents_sends.get(content_key)
+
+        if not send or (max_devices and len(send) >= max_devices):
+            send = []
+            sends.append(send)
+            contents_sends[content_key] = send
+
+        send.append((delivery, latest_push_notification))
+
+    return sends
+
+
+def _send(sender, send):
+    """
+    :return: the ids of the sent and of the to be retried push notifications
+    """
+    latest_push_notification = send[0][1]
+    send_ids = [push_notification.pk for delivery, latest in send for push_notification in delivery]
+
+    try:
+        sender.send_push_notification(devices=[latest.device for delivery, latest in send],
+                                      post_body=latest_push_notification.get_post_body(),
+                                      badge_count=len(send[0][0]))
+    except Exception as e:
+        logger.error('Error sending push notification to %d devices with error %s' % (len(send), e))
+        return [], send_ids
+
+    return send_ids, []
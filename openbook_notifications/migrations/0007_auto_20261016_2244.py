@@ -0,0 +1,17 @@
+# Generated by Django 2.2.28 on 2026-10-16 20:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('openbook_notifications', '0006_communityinvitenotification'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['owner', '-created', '-id'], name='notification_owner_created_id'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 2.2.28 on 2026-10-16 21:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('openbook_devices', '0006_auto_20190305_1938'),
+        ('openbook_notifications', '0007_auto_20261016_2244'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PushNotification',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post_body', models.TextField()),
+                ('group', models.CharField(blank=True, max_length=64, null=True)),
+                ('created', models.DateTimeField(editable=False)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt', models.DateTimeField()),
+                ('failed', models.BooleanField(default=False)),
+                ('device', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='push_notifications', to='openbook_devices.Device')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='pushnotification',
+            index=models.Index(fields=['failed', 'next_attempt'], name='push_notification_failed_next'),
+        ),
+    ]
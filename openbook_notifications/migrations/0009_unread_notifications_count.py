@@ -0,0 +1,31 @@
+# Generated by Django 2.2.28 on 2026-10-16 21:41
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_unread_notifications_counts(apps, schema_editor):
+    UserCounts = apps.get_model('openbook_auth', 'UserCounts')
+    Notification = apps.get_model('openbook_notifications', 'Notification')
+
+    grouped_counts = Notification.objects.filter(read=False).order_by().values('owner_id').annotate(
+        count=Count('id')).values_list('owner_id', 'count')
+
+    for owner_id, count in grouped_counts.iterator():
+        UserCounts.objects.filter(user_id=owner_id).update(unread_notifications_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('openbook_auth', '0031_usercounts_unread_notifications_count'),
+        ('openbook_notifications', '0008_push_notification'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['owner', 'read', 'id'], name='notification_owner_read_id'),
+        ),
+        migrations.RunPython(populate_unread_notifications_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.28 on 2026-10-16 21:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('openbook_notifications', '0009_unread_notifications_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['notification_type', 'read', 'created'], name='notification_type_read_created'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 2.2.28 on 2026-10-16 22:05
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, CharField, TextField, Value
+from django.db.models.functions import Cast, Concat
+import django.utils.timezone
+
+
+def populate_post_reaction_notifications(apps, schema_editor):
+    PostReactionNotification = apps.get_model('openbook_notifications', 'PostReactionNotification')
+    PostReaction = apps.get_model('openbook_posts', 'PostReaction')
+
+    post_reactions = PostReaction.objects.filter(pk=OuterRef('post_reaction_id'))
+
+    # The JSON list of the single reactor, built by the database in a single statement
+    PostReactionNotification.objects.update(
+        created=Subquery(post_reactions.values('created')[:1]),
+        last_reactors_ids=Concat(Value('['),
+                                 Cast(Subquery(post_reactions.values('reactor_id')[:1]), output_field=CharField()),
+                                 Value(']'), output_field=TextField()))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('openbook_notifications', '0010_notification_type_read_created'),
+        ('openbook_posts', '0028_populate_user_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postreactionnotification',
+            name='created',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='postreactionnotification',
+            name='last_reactors_ids',
+            field=models.TextField(default='[]'),
+        ),
+        migrations.AddField(
+            model_name='postreactionnotification',
+            name='reactions_count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.RunPython(populate_post_reaction_notifications, migrations.RunPython.noop),
+    ]
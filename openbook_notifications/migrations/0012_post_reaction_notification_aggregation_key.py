@@ -0,0 +1,85 @@
+# Generated by Django 2.2.28 on 2026-10-17 09:30
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, F, Q
+import django.db.models.deletion
+
+
+def populate_post_reaction_notifications_aggregation_key(apps, schema_editor):
+    PostReactionNotification = apps.get_model('openbook_notifications', 'PostReactionNotification')
+    PostReaction = apps.get_model('openbook_posts', 'PostReaction')
+    Notification = apps.get_model('openbook_notifications', 'Notification')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+
+    notifications = Notification.objects.filter(
+        content_type_id__in=ContentType.objects.filter(app_label='openbook_notifications',
+                                                       model='postreactionnotification').values('id'),
+        object_id=OuterRef('pk'))
+
+    # The existing notifications keep their own window, which starts with their first reaction
+    PostReactionNotification.objects.update(
+        owner_id=Subquery(notifications.values('owner_id')[:1]),
+        post_id=Subquery(PostReaction.objects.filter(pk=OuterRef('post_reaction_id')).values('post_id')[:1]),
+        window_start=F('created'))
+
+    # Left behind by deleted notifications
+    PostReactionNotification.objects.filter(Q(owner_id__isnull=True) | Q(post_id__isnull=True)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('openbook_posts', '0029_trendingpost'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('openbook_notifications', '0011_post_reaction_notification_aggregation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postreactionnotification',
+            name='owner',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+',
+                                    to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='postreactionnotification',
+            name='post',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+',
+                                    to='openbook_posts.Post'),
+        ),
+        migrations.AddField(
+            model_name='postreactionnotification',
+            name='window_start',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='postreactionnotification',
+            name='post_reaction',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL,
+                                    to='openbook_posts.PostReaction'),
+        ),
+        migrations.RunPython(populate_post_reaction_notifications_aggregation_key, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='postreactionnotification',
+            name='owner',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+',
+                                    to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='postreactionnotification',
+            name='post',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+',
+                                    to='openbook_posts.Post'),
+        ),
+        migrations.AlterField(
+            model_name='postreactionnotification',
+            name='window_start',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AlterUniqueTogether(
+            name='postreactionnotification',
+            unique_together={('owner', 'post', 'window_start')},
+        ),
+    ]
@@ -1,9 +1,13 @@
-from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
 from django.contrib.contenttypes.models import ContentType
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.utils import timezone
 
-from openbook_auth.models import User
+from openbook_auth.models import User, UserCounts
+from openbook_common.utils.helpers import add_deleted_rows_counts
+from openbook_notifications.pubsub import get_notifications_pubsub
 
 
 class Notification(models.Model):
@@ -34,13 +38,88 @@ class Notification(models.Model):
     object_id = models.PositiveIntegerField()
     content_object = GenericForeignKey()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', '-created', '-id'], name='notification_owner_created_id'),
+            models.Index(fields=['owner', 'read', 'id'], name='notification_owner_read_id'),
+            models.Index(fields=['notification_type', 'read', 'created'], name='notification_type_read_created'),
+        ]
+
     @classmethod
     def create_notification(cls, owner_id, type, content_object):
         return cls.objects.create(notification_type=type, content_object=content_object, owner_id=owner_id)
 
+    @classmethod
+    def get_read_notifications_ids_created_before(cls, notification_type, created_before, max_amount):
+        return list(cls.objects.filter(notification_type=notification_type, read=True,
+                                       created__lt=created_before).values_list('id', flat=True)[:max_amount])
+
+    @classmethod
+    def delete_notifications_with_ids(cls, notifications_ids):
+        """
+        Deletes the notifications through their content objects, which would otherwise be left behind
+        :return: the amount of deleted rows by model label
+        """
+        content_objects_ids = {}
+
+        for content_type_id, object_id in cls.objects.filter(id__in=notifications_ids).values_list('content_type_id',
+                                                                                                  'object_id'):
+            content_objects_ids.setdefault(content_type_id, []).append(object_id)
+
+        deleted_querysets = []
+
+        for content_type_id, objects_ids in content_objects_ids.items():
+            content_object_model = ContentType.objects.get_for_id(content_type_id).model_class()
+
+            # Only the notification models, whose rows exist for their notification alone
+            if any(isinstance(field, GenericRelation) and field.related_model is cls for field in
+                   content_object_model._meta.private_fields):
+                deleted_querysets.append(content_object_model.objects.filter(pk__in=objects_ids))
+
+        # Deleting the content objects cascades to their notifications, this takes the ones left
+        deleted_querysets.append(cls.objects.filter(id__in=notifications_ids))
+
+        deleted_rows_counts = {}
+
+        for deleted_queryset in deleted_querysets:
+            deleted_count, deleted_rows = deleted_queryset.delete()
+            add_deleted_rows_counts(deleted_rows_counts, deleted_rows)
+
+        return deleted_rows_counts
+
     def save(self, *args, **kwargs):
         ''' On save, update timestamps '''
-        if not self.id and not self.created:
+        is_new = not self.id
+
+        if is_new and not self.created:
             self.created = timezone.now()
 
-        return super(Notification, self).save(*args, **kwargs)
+        notification = super(Notification, self).save(*args, **kwargs)
+
+        if is_new:
+            if not self.read:
+                UserCounts.increment_count_for_users_with_ids([self.owner_id], 'unread_notifications_count')
+            publish_notifications([self])
+
+        return notification
+
+
+def publish_notifications(notifications):
+    """
+    Publishes the notifications to the requests waiting for them once the current transaction commits
+    """
+    notifications_pubsub = get_notifications_pubsub()
+    published_notifications = [(notification.owner_id, (notification.created, notification.pk)) for notification in
+                               notifications]
+
+    def publish():
+        for owner_id, notification_cursor in published_notifications:
+            notifications_pubsub.publish(owner_id=owner_id, notification_cursor=notification_cursor)
+
+    transaction.on_commit(publish)
+
+
+@receiver(post_delete, sender=Notification, dispatch_uid='decrement_unread_notifications_count_on_delete')
+def decrement_unread_notifications_count(sender, instance=None, **kwargs):
+    if not instance.read:
+        UserCounts.decrement_count_for_users_with_ids([instance.owner_id], 'unread_notifications_count')
@@ -1,9 +1,12 @@
 from django.contrib.contenttypes.fields import GenericRelation
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
 from django.db.models.signals import pre_delete
 from django.dispatch import receiver
+from django.utils import timezone
 
-from openbook_notifications.models.notification import Notification
+from openbook_auth.models import UserCounts
+from openbook_notifications.models.notification import Notification, publish_notifications
 from openbook_posts.models import PostComment
 
 
@@ -19,6 +22,40 @@ class PostCommentNotification(models.Model):
                                          owner_id=owner_id)
         return post_comment_notification
 
+    @classmethod
+    def create_post_comment_notifications(cls, post_comment_id, owners_ids):
+        """
+        Creates the notifications of a new post comment for many owners with one insert per table
+        """
+        owners_ids = list(owners_ids)
+
+        if not owners_ids:
+            return []
+
+        cls.objects.bulk_create([cls(post_comment_id=post_comment_id) for owner_id in owners_ids])
+
+        # MySQL does not return the ids of bulk inserted rows. The post comment is new, so all its
+        # notifications are the ones we just inserted, in insertion order.
+        post_comment_notifications_ids = cls.objects.filter(post_comment_id=post_comment_id).order_by(
+            'id').values_list('id', flat=True)
+
+        content_type = ContentType.objects.get_for_model(cls)
+        created = timezone.now()
+
+        notifications = Notification.objects.bulk_create(
+            [Notification(notification_type=Notification.POST_COMMENT, content_type=content_type,
+                          object_id=post_comment_notification_id, owner_id=owner_id, created=created) for
+             post_comment_notification_id, owner_id in zip(post_comment_notifications_ids, owners_ids)])
+
+        UserCounts.increment_count_for_users_with_ids(owners_ids, 'unread_notifications_count')
+
+        # MySQL does not return their ids either
+        publish_notifications(
+            Notification.objects.filter(content_type=content_type,
+                                        object_id__in=post_comment_notifications_ids).only('id', 'owner_id', 'created'))
+
+        return notifications
+
     @classmethod
     def delete_post_comment_notification(cls, post_comment_id, owner_id):
         cls.objects.filter(post_comment_id=post_comment_id,
@@ -1,27 +1,267 @@
+import json
+import threading
+from datetime import timedelta, datetime
+
+from django.conf import settings
 from django.contrib.contenttypes.fields import GenericRelation
-from django.db import models
+from django.contrib.contenttypes.models import ContentType
+from django.db import models, transaction
 
 # Create your models here.
-from django.db.models.signals import pre_delete
+from django.db.models import F, Q
+from django.db.models.signals import pre_delete, post_delete
 from django.dispatch import receiver
+from django.utils import timezone
 
-from openbook_notifications.models.notification import Notification
-from openbook_posts.models import PostReaction
+from openbook_auth.models import User, UserCounts
+from openbook_notifications.models.notification import Notification, publish_notifications
+from openbook_posts.models import PostReaction, Post
 
 
 class PostReactionNotification(models.Model):
+    """
+    A notification of the reactions to a post of its owner within a POST_REACTION_NOTIFICATIONS_AGGREGATION_WINDOW
+    long window, pointing to the latest of them
+    """
     notification = GenericRelation(Notification)
-    post_reaction = models.ForeignKey(PostReaction, on_delete=models.CASCADE)
+    # Only null while the reaction it pointed to is being deleted, see remove_deleted_post_reactions
+    post_reaction = models.ForeignKey(PostReaction, on_delete=models.SET_NULL, null=True)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='+')
+    # Start of the aggregation window, see _get_aggregation_window_start
+    window_start = models.DateTimeField(editable=False)
+    # When the first reaction of the aggregation window was created
+    created = models.DateTimeField(editable=False)
+    reactions_count = models.PositiveIntegerField(default=1)
+    # JSON list with the ids of the latest reactors, newest first
+    last_reactors_ids = models.TextField(default='[]')
+
+    class Meta:
+        unique_together = ('owner', 'post', 'window_start',)
 
     @classmethod
-    def create_post_reaction_notification(cls, post_reaction_id, owner_id):
-        post_reaction_notification = cls.objects.create(post_reaction_id=post_reaction_id)
-        Notification.create_notification(type=Notification.POST_REACTION,
-                                         content_object=post_reaction_notification,
-                                         owner_id=owner_id)
+    def create_post_reaction_notification(cls, post_reaction, owner_id):
+        """
+        Adds the reaction to the post reaction notification of the owner for the post in the
+        aggregation window of the reaction, creating one if there is none
+        :return: the post reaction notification
+        """
+        now = timezone.now()
+
+        with transaction.atomic():
+            # The unique aggregation key makes concurrent first reactions insert a single row, get_or_create
+            # gets the row of the winner when its own insert fails with an IntegrityError
+            post_reaction_notification, created = cls.objects.select_for_update().get_or_create(
+                owner_id=owner_id, post_id=post_reaction.post_id,
+                window_start=_get_aggregation_window_start(post_reaction.created),
+                defaults={
+                    'post_reaction': post_reaction,
+                    'created': post_reaction.created,
+                    'last_reactors_ids': json.dumps([post_reaction.reactor_id]),
+                })
+
+            if created:
+                Notification.create_notification(type=Notification.POST_REACTION,
+                                                 content_object=post_reaction_notification,
+                                                 owner_id=owner_id)
+                return post_reaction_notification
+
+            last_reactors_ids = [post_reaction.reactor_id] + [reactor_id for reactor_id in
+                                                              post_reaction_notification.get_last_reactors_ids() if
+                                                              reactor_id != post_reaction.reactor_id]
+
+            cls.objects.filter(pk=post_reaction_notification.pk).update(
+                post_reaction=post_reaction, reactions_count=F('reactions_count') + 1,
+                last_reactors_ids=json.dumps(
+                    last_reactors_ids[:settings.POST_REACTION_NOTIFICATIONS_LAST_REACTORS_COUNT]))
+
+            # Bring the notification back to the top of the list, unread
+            notifications = Notification.objects.filter(content_type=ContentType.objects.get_for_model(cls),
+                                                        object_id=post_reaction_notification.pk)
+
+            if notifications.filter(read=True).update(read=False, created=now):
+                UserCounts.increment_count_for_users_with_ids([owner_id], 'unread_notifications_count')
+            else:
+                notifications.update(created=now)
+
+            # Tell the requests waiting for new notifications, they find it by its new created
+            publish_notifications(list(notifications))
+
+        post_reaction_notification.refresh_from_db()
         return post_reaction_notification
 
     @classmethod
-    def delete_post_reaction_notification(cls, post_reaction_id, owner_id):
-        cls.objects.filter(post_reaction_id=post_reaction_id,
-                           notification__owner_id=owner_id).delete()
+    def delete_post_reaction_notification(cls, post_reaction, owner_id):
+        """
+        Removes the reaction from the post reaction notification it was added to, deleting the notification
+        when it was the only one
+        """
+        with transaction.atomic():
+            # Notifications from before the aggregation windows were fixed are found through their reaction
+            post_reaction_notification = cls.objects.select_for_update().filter(
+                Q(window_start=_get_aggregation_window_start(post_reaction.created)) | Q(
+                    post_reaction_id=post_reaction.pk), owner_id=owner_id, post_id=post_reaction.post_id).first()
+
+            # The reaction is removed here, not once deleted, see collect_deleted_post_reaction
+            post_reaction._post_reaction_notification_removed = True
+
+            if not post_reaction_notification:
+                return
+
+            latest_post_reaction = post_reaction_notification.post_reaction
+
+            if latest_post_reaction is None or latest_post_reaction.pk == post_reaction.pk:
+                latest_post_reaction = post_reaction_notification._get_latest_post_reaction(
+                    exclude_post_reaction_id=post_reaction.pk)
+
+            if post_reaction_notification.reactions_count <= 1 or not latest_post_reaction:
+                post_reaction_notification.delete()
+                return
+
+            last_reactors_ids = [reactor_id for reactor_id in post_reaction_notification.get_last_reactors_ids() if
+                                 reactor_id != post_reaction.reactor_id]
+
+            cls.objects.filter(pk=post_reaction_notification.pk).update(
+                post_reaction=latest_post_reaction, reactions_count=F('reactions_count') - 1,
+                last_reactors_ids=json.dumps(last_reactors_ids))
+
+    @classmethod
+    def remove_deleted_post_reactions(cls, deleted_post_reactions):
+        """
+        Removes the reactions deleted without delete_post_reaction_notification from the notifications they were
+        added to, with one update per notification. The notifications that pointed to a deleted reaction are
+        pointed to the latest one left in their window, the ones with none left are deleted.
+        :param deleted_post_reactions: (id, post_id, window_start, reactor_id) tuples of the deleted reactions
+        """
+        # Reactions whose deletion was rolled back are still there
+        existing_post_reactions_ids = set(PostReaction.objects.filter(
+            pk__in=[post_reaction[0] for post_reaction in deleted_post_reactions]).values_list('id', flat=True))
+
+        deleted_reactors_ids = {}
+
+        for post_reaction_id, post_id, window_start, reactor_id in deleted_post_reactions:
+            if post_reaction_id not in existing_post_reactions_ids:
+                deleted_reactors_ids.setdefault((post_id, window_start), []).append(reactor_id)
+
+        if not deleted_reactors_ids:
+            return
+
+        posts_ids = {post_id for post_id, window_start in deleted_reactors_ids.keys()}
+        windows_starts = {window_start for post_id, window_start in deleted_reactors_ids.keys()}
+
+        with transaction.atomic():
+            # Notifications from before the aggregation windows were fixed are only found once their reaction is gone
+            post_reaction_notifications = cls.objects.select_for_update().filter(
+                Q(window_start__in=windows_starts) | Q(post_reaction__isnull=True), post_id__in=posts_ids)
+
+            for post_reaction_notification in post_reaction_notifications:
+                window_reactors_ids = deleted_reactors_ids.get(
+                    (post_reaction_notification.post_id, post_reaction_notification.window_start), [])
+                # The reactions of the owner are not part of the notification
+                removed_reactors_ids = [reactor_id for reactor_id in window_reactors_ids if
+                                        reactor_id != post_reaction_notification.owner_id]
+
+                latest_post_reaction_id = post_reaction_notification.post_reaction_id
+
+                if latest_post_reaction_id is None:
+                    latest_post_reaction = post_reaction_notification._get_latest_post_reaction()
+                    latest_post_reaction_id = latest_post_reaction.pk if latest_post_reaction else None
+                elif not removed_reactors_ids:
+                    continue
+
+                if post_reaction_notification.reactions_count <= len(removed_reactors_ids) or \
+                        latest_post_reaction_id is None:
+                    post_reaction_notification.delete()
+                    continue
+
+                last_reactors_ids = [reactor_id for reactor_id in post_reaction_notification.get_last_reactors_ids() if
+                                     reactor_id not in removed_reactors_ids]
+
+                cls.objects.filter(pk=post_reaction_notification.pk).update(
+                    post_reaction_id=latest_post_reaction_id,
+                    reactions_count=F('reactions_count') - len(removed_reactors_ids),
+                    last_reactors_ids=json.dumps(last_reactors_ids))
+
+    @classmethod
+    def prefetch_last_reactors(cls, post_reaction_notifications):
+        """
+        Loads the last reactors of many post reaction notifications with a single query
+        """
+        reactors_ids = set()
+
+        for post_reaction_notification in post_reaction_notifications:
+            reactors_ids.update(post_reaction_notification.get_last_reactors_ids())
+
+        reactors = User.objects.select_related('profile').in_bulk(reactors_ids)
+
+        for post_reaction_notification in post_reaction_notifications:
+            post_reaction_notification._last_reactors = [reactors[reactor_id] for reactor_id in
+                                                         post_reaction_notification.get_last_reactors_ids() if
+                                                         reactor_id in reactors]
+
+    def _get_latest_post_reaction(self, exclude_post_reaction_id=None):
+        window_start = max(self.window_start, self.created)
+        post_reactions = PostReaction.objects.filter(post_id=self.post_id, created__gte=window_start,
+                                                     created__lt=self.window_start + _get_aggregation_window())
+        # The notification is about the reactions of others
+        post_reactions = post_reactions.exclude(reactor_id=self.owner_id)
+
+        if exclude_post_reaction_id:
+            post_reactions = post_reactions.exclude(pk=exclude_post_reaction_id)
+
+        return post_reactions.order_by('-created', '-id').first()
+
+    def get_last_reactors_ids(self):
+        return json.loads(self.last_reactors_ids)
+
+    def get_last_reactors(self):
+        if not hasattr(self, '_last_reactors'):
+            self.prefetch_last_reactors([self])
+
+        return self._last_reactors
+
+
+def _get_aggregation_window():
+    return timedelta(seconds=settings.POST_REACTION_NOTIFICATIONS_AGGREGATION_WINDOW)
+
+
+def _get_aggregation_window_start(created):
+    """
+    Returns the start of the fixed POST_REACTION_NOTIFICATIONS_AGGREGATION_WINDOW long window the date falls in,
+    which makes it part of the unique aggregation key of the notifications
+    """
+    window = settings.POST_REACTION_NOTIFICATIONS_AGGREGATION_WINDOW
+    timestamp = int(created.timestamp())
+    return datetime.fromtimestamp(timestamp - timestamp % window, tz=timezone.utc)
+
+
+# The reactions being deleted by the current thread, see remove_deleted_post_reactions
+_deleted_post_reactions = threading.local()
+
+
+@receiver(pre_delete, sender=PostReaction, dispatch_uid='collect_deleted_post_reaction')
+def collect_deleted_post_reaction(sender, instance=None, **kwargs):
+    """
+    Deleting a post, a user or an emoji cascades over many reactions. They are all collected here before any
+    of them is deleted, so that their notifications are updated at once afterwards.
+    """
+    if getattr(instance, '_post_reaction_notification_removed', False):
+        return
+
+    if not hasattr(_deleted_post_reactions, 'post_reactions'):
+        _deleted_post_reactions.post_reactions = []
+
+    _deleted_post_reactions.post_reactions.append(
+        (instance.pk, instance.post_id, _get_aggregation_window_start(instance.created), instance.reactor_id))
+
+
+@receiver(post_delete, sender=PostReaction, dispatch_uid='remove_deleted_post_reactions')
+def remove_deleted_post_reactions(sender, instance=None, **kwargs):
+    """
+    The first reaction deleted removes all the collected ones, the rest find nothing left to do
+    """
+    deleted_post_reactions = getattr(_deleted_post_reactions, 'post_reactions', None)
+
+    if deleted_post_reactions:
+        _deleted_post_reactions.post_reactions = []
+        PostReactionNotification.remove_deleted_post_reactions(deleted_post_reactions)
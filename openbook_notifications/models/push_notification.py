@@ -0,0 +1,119 @@
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.utils import timezone
+
+from openbook_common.utils.model_loaders import get_device_model
+
+
+class PushNotification(models.Model):
+    """
+    A push notification waiting in the outbox to be delivered to a device by the send_push_notifications worker
+    """
+    device = models.ForeignKey('openbook_devices.Device', on_delete=models.CASCADE,
+                               related_name='push_notifications')
+    post_body = models.TextField()
+    # Push notifications of a device in the same group are coalesced into the latest one
+    group = models.CharField(max_length=64, null=True, blank=True)
+    created = models.DateTimeField(editable=False)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt = models.DateTimeField()
+    failed = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['failed', 'next_attempt'], name='push_notification_failed_next'),
+        ]
+
+    @classmethod
+    def enqueue_push_notification_for_user(cls, user, post_body, group=None):
+        """
+        Queues the push notification for all the devices of the user once the current transaction commits
+        """
+        post_body = json.dumps(post_body, cls=DjangoJSONEncoder)
+        transaction.on_commit(lambda: cls.create_push_notifications_for_user(user=user, post_body=post_body,
+                                                                             group=group))
+
+    @classmethod
+    def create_push_notifications_for_user(cls, user, post_body, group=None):
+        now = timezone.now()
+        return cls.objects.bulk_create(
+            [cls(device_id=device_id, post_body=post_body, group=group, created=now, next_attempt=now) for
+             device_id in user.devices.values_list('id', flat=True)])
+
+    @classmethod
+    def enqueue_push_notification_for_users(cls, users, post_body, group=None):
+        """
+        Queues the push notification for all the devices of the users once the current transaction commits
+        """
+        post_body = json.dumps(post_body, cls=DjangoJSONEncoder)
+        users_ids = [user.pk for user in users]
+        transaction.on_commit(lambda: cls.create_push_notifications_for_users_with_ids(users_ids=users_ids,
+                                                                                       post_body=post_body,
+                                                                                       group=group))
+
+    @classmethod
+    def create_push_notifications_for_users_with_ids(cls, users_ids, post_body, group=None):
+        Device = get_device_model()
+        now = timezone.now()
+        return cls.objects.bulk_create(
+            [cls(device_id=device_id, post_body=post_body, group=group, created=now, next_attempt=now) for
+             device_id in Device.objects.filter(owner_id__in=users_ids).values_list('id', flat=True)])
+
+    @classmethod
+    def claim_push_notifications_to_send(cls, max_amount):
+        """
+        Returns the push notifications due to be sent, postponing them by PUSH_NOTIFICATIONS_CLAIM_TIMEOUT
+        so other workers skip them while they are being sent.
+        """
+        now = timezone.now()
+
+        with transaction.atomic():
+            push_notifications_ids = list(
+                cls.objects.select_for_update(skip_locked=True).filter(failed=False, next_attempt__lte=now).order_by(
+                    'next_attempt').values_list('id', flat=True)[:max_amount])
+
+            cls.objects.filter(id__in=push_notifications_ids).update(
+                next_attempt=now + timedelta(seconds=settings.PUSH_NOTIFICATIONS_CLAIM_TIMEOUT))
+
+        return list(cls.objects.select_related('device__owner').filter(id__in=push_notifications_ids).order_by(
+            'created', 'id'))
+
+    @classmethod
+    def delete_sent_push_notifications_with_ids(cls, push_notifications_ids):
+        cls.objects.filter(id__in=push_notifications_ids).delete()
+
+    @classmethod
+    def retry_push_notifications_with_ids(cls, push_notifications_ids):
+        """
+        Schedules the next attempt with an exponential backoff, giving up after PUSH_NOTIFICATIONS_MAX_ATTEMPTS
+        """
+        now = timezone.now()
+        push_notifications = list(cls.objects.filter(id__in=push_notifications_ids))
+
+        for push_notification in push_notifications:
+            push_notification.attempts += 1
+
+            if push_notification.attempts >= settings.PUSH_NOTIFICATIONS_MAX_ATTEMPTS:
+                push_notification.failed = True
+            else:
+                retry_delay = settings.PUSH_NOTIFICATIONS_RETRY_DELAY * 2 ** (push_notification.attempts - 1)
+                push_notification.next_attempt = now + timedelta(seconds=retry_delay)
+
+        cls.objects.bulk_update(push_notifications, ['attempts', 'failed', 'next_attempt'])
+
+    def get_post_body(self):
+        return json.loads(self.post_body)
+
+    def save(self, *args, **kwargs):
+        ''' On save, update timestamps '''
+        if not self.id and not self.created:
+            self.created = timezone.now()
+
+        if not self.next_attempt:
+            self.next_attempt = self.created
+
+        return super(PushNotification, self).save(*args, **kwargs)
@@ -0,0 +1,95 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+
+class BaseNotificationsPubSub(ABC):
+    """
+    Tells the requests waiting for new notifications of a user when one is created
+    """
+
+    @abstractmethod
+    def publish(self, owner_id, notification_cursor):
+        """
+        :param notification_cursor: (created, id) tuple of the created or brought back notification
+        """
+        pass
+
+    @abstractmethod
+    def wait(self, owner_id, min_cursor, timeout):
+        """
+        Blocks until a notification of the owner after the (created, id) min_cursor is published or the
+        timeout passes
+        :return: whether such a notification was published
+        """
+        pass
+
+
+class CacheNotificationsPubSub(BaseNotificationsPubSub):
+    """
+    Keeps the cursor of the latest notification of every user in the cache, which waiters check every
+    NOTIFICATIONS_PUBSUB_POLL_INTERVAL seconds. Only works across processes with a cache backend they all share.
+    """
+    key_prefix = 'notifications_pubsub_latest_cursor_'
+
+    def publish(self, owner_id, notification_cursor):
+        key = self.key_prefix + str(owner_id)
+        latest_notification_cursor = cache.get(key)
+
+        if not latest_notification_cursor or notification_cursor > latest_notification_cursor:
+            cache.set(key, notification_cursor, timeout=settings.NOTIFICATIONS_LONG_POLL_MAX_TIMEOUT * 2)
+
+    def wait(self, owner_id, min_cursor, timeout):
+        key = self.key_prefix + str(owner_id)
+        deadline = time.monotonic() + timeout
+
+        while True:
+            latest_notification_cursor = cache.get(key)
+            if latest_notification_cursor and latest_notification_cursor > min_cursor:
+                return True
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+
+            time.sleep(min(settings.NOTIFICATIONS_PUBSUB_POLL_INTERVAL, remaining))
+
+
+class InProcessNotificationsPubSub(BaseNotificationsPubSub):
+    """
+    Wakes the waiters up as soon as a notification is published, only within the process that created it
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.latest_notifications_cursors = {}
+
+    def publish(self, owner_id, notification_cursor):
+        with self.condition:
+            latest_notification_cursor = self.latest_notifications_cursors.get(owner_id)
+            if not latest_notification_cursor or notification_cursor > latest_notification_cursor:
+                self.latest_notifications_cursors[owner_id] = notification_cursor
+            self.condition.notify_all()
+
+    def wait(self, owner_id, min_cursor, timeout):
+        def is_published():
+            latest_notification_cursor = self.latest_notifications_cursors.get(owner_id)
+            return latest_notification_cursor is not None and latest_notification_cursor > min_cursor
+
+        with self.condition:
+            return self.condition.wait_for(is_published, timeout=timeout)
+
+
+notifications_pubsub = None
+
+
+def get_notifications_pubsub():
+    global notifications_pubsub
+
+    if not notifications_pubsub:
+        notifications_pubsub = import_string(settings.NOTIFICATIONS_PUBSUB)()
+    return notifications_pubsub
@@ -0,0 +1,78 @@
+from abc import ABC, abstractmethod
+from hashlib import sha256
+
+import onesignal as onesignal_sdk
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class BasePushNotificationsSender(ABC):
+    """
+    Delivers a push notification to many devices with a single provider call, raising an exception when it
+    has to be retried
+    """
+    # Most devices the provider accepts in a single call, None if there is no limit
+    max_devices_per_send = None
+
+    @abstractmethod
+    def send_push_notification(self, devices, post_body, badge_count=1):
+        pass
+
+
+class OneSignalPushNotificationsSender(BasePushNotificationsSender):
+    # OneSignal accepts up to 200 filters, each device takes two plus the OR joining it to the previous one
+    max_devices_per_send = 66
+
+    def __init__(self):
+        self.onesignal_client = onesignal_sdk.Client(
+            app_id=settings.ONE_SIGNAL_APP_ID,
+            app_auth_key=settings.ONE_SIGNAL_API_KEY
+        )
+
+    def send_push_notification(self, devices, post_body, badge_count=1):
+        notification = onesignal_sdk.Notification(post_body=post_body)
+
+        notification.set_parameter('ios_badgeType', 'Increase')
+        notification.set_parameter('ios_badgeCount', str(badge_count))
+
+        filters = []
+        users_ids_tags = {}
+
+        for device in devices:
+            user = device.owner
+            user_id_tag = users_ids_tags.get(user.pk)
+
+            if not user_id_tag:
+                user_id_contents = (str(user.uuid) + str(user.id)).encode('utf-8')
+                user_id_tag = sha256(user_id_contents).hexdigest()
+                users_ids_tags[user.pk] = user_id_tag
+
+            if filters:
+                filters.append({"operator": "OR"})
+
+            filters.extend([
+                {"field": "tag", "key": "user_id", "relation": "=", "value": user_id_tag},
+                {"field": "tag", "key": "device_uuid", "relation": "=", "value": device.uuid},
+            ])
+
+        notification.set_filters(filters)
+
+        response = self.onesignal_client.send_notification(notification)
+        response.raise_for_status()
+
+
+# Calls made to the FakePushNotificationsSender, as (devices, post_body, badge_count)
+sent_push_notifications = []
+
+
+class FakePushNotificationsSender(BasePushNotificationsSender):
+    """
+    Keeps the push notifications in memory instead of delivering them, for tests and local development
+    """
+
+    def send_push_notification(self, devices, post_body, badge_count=1):
+        sent_push_notifications.append((list(devices), post_body, badge_count))
+
+
+def get_push_notifications_sender():
+    return import_string(settings.PUSH_NOTIFICATIONS_SENDER)()
@@ -1,24 +1,11 @@
 import onesignal as onesignal_sdk
-from django.conf import settings
-from django.db.models import Q
 from django.utils.translation import ugettext_lazy as _
-from onesignal import OneSignalError
 
-from openbook_common.utils.model_loaders import get_notification_model, get_user_model, get_post_model
+from openbook_common.utils.model_loaders import get_notification_model, get_push_notification_model
 from openbook_notifications.push_notifications.serializers import PushNotificationsSerializers
-from hashlib import sha256
 
-import logging
 
-logger = logging.getLogger(__name__)
-
-onesignal_client = onesignal_sdk.Client(
-    app_id=settings.ONE_SIGNAL_APP_ID,
-    app_auth_key=settings.ONE_SIGNAL_API_KEY
-)
-
-
-def send_post_reaction_push_notification(post_reaction):
+def send_post_reaction_push_notification(post_reaction, reactions_count=1):
     post_creator = post_reaction.post.creator
 
     post_id = post_reaction.post_id
@@ -27,10 +14,18 @@ def send_post_reaction_push_notification(post_reaction):
     if post_creator.has_reaction_notifications_enabled_for_post_with_id(post_id=post_reaction.post_id):
         post_reactor = post_reaction.reactor
 
-        one_signal_notification = onesignal_sdk.Notification(post_body={
-            "contents": {"en": _('@%(post_reactor_username)s reacted to your post.') % {
+        if reactions_count > 1:
+            message = _('@%(post_reactor_username)s and %(others_count)d others reacted to your post.') % {
+                'post_reactor_username': post_reactor.username,
+                'others_count': reactions_count - 1
+            }
+        else:
+            message = _('@%(post_reactor_username)s reacted to your post.') % {
                 'post_reactor_username': post_reactor.username
-            }}
+            }
+
+        one_signal_notification = onesignal_sdk.Notification(post_body={
+            "contents": {"en": message}
         })
 
         NotificationPostReactionSerializer = _get_push_notifications_serializers().NotificationPostReactionSerializer
@@ -46,10 +41,19 @@ def send_post_reaction_push_notification(post_reaction):
         one_signal_notification.set_parameter('!thread_id', notification_group)
         one_signal_notification.set_parameter('android_group', notification_group)
 
-        _send_notification_to_user(notification=one_signal_notification, user=post_creator)
+        _send_notification_to_user(notification=one_signal_notification, user=post_creator,
+                                   notification_group=notification_group)
 
 
 def send_post_comment_push_notification_with_message(post_comment, message, target_user):
+    send_post_comment_push_notification_with_message_to_users(post_comment=post_comment, message=message,
+                                                              target_users=[target_user])
+
+
+def send_post_comment_push_notification_with_message_to_users(post_comment, message, target_users):
+    if not target_users:
+        return
+
     Notification = get_notification_model()
     NotificationPostCommentSerializer = _get_push_notifications_serializers().NotificationPostCommentSerializer
 
@@ -71,7 +75,8 @@ def send_post_comment_push_notification_with_message(post_comment, message, targ
     one_signal_notification.set_parameter('!thread_id', notification_group)
     one_signal_notification.set_parameter('android_group', notification_group)
 
-    _send_notification_to_user(notification=one_signal_notification, user=target_user)
+    _send_notification_to_users(notification=one_signal_notification, users=target_users,
+                                notification_group=notification_group)
 
 
 def send_follow_push_notification(followed_user, following_user):
@@ -148,24 +153,16 @@ def send_community_invite_push_notification(community_invite):
         _send_notification_to_user(notification=one_signal_notification, user=invited_user)
 
 
-def _send_notification_to_user(user, notification):
-    for device in user.devices.all():
-        notification.set_parameter('ios_badgeType', 'Increase')
-        notification.set_parameter('ios_badgeCount', '1')
-
-        user_id_contents = (str(user.uuid) + str(user.id)).encode('utf-8')
-
-        user_id = sha256(user_id_contents).hexdigest()
+def _send_notification_to_user(user, notification, notification_group=None):
+    PushNotification = get_push_notification_model()
+    PushNotification.enqueue_push_notification_for_user(user=user, post_body=notification.post_body,
+                                                        group=notification_group)
 
-        notification.set_filters([
-            {"field": "tag", "key": "user_id", "relation": "=", "value": user_id},
-            {"field": "tag", "key": "device_uuid", "relation": "=", "value": device.uuid},
-        ])
 
-        try:
-            onesignal_client.send_notification(notification)
-        except OneSignalError as e:
-            logger.error('Error sending notification to user_id %s with error %s' % (user.id, e))
+def _send_notification_to_users(users, notification, notification_group=None):
+    PushNotification = get_push_notification_model()
+    PushNotification.enqueue_push_notification_for_users(users=users, post_body=notification.post_body,
+                                                         group=notification_group)
 
 
 push_notifications_serializers = None
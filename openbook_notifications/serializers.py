@@ -1,8 +1,13 @@
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
 from generic_relations.relations import GenericRelatedField
 from rest_framework import serializers
+from rest_framework.serializers import ListSerializer
 
 from openbook_auth.models import User, UserProfile
 from openbook_common.models import Emoji
+from openbook_common.serializers_fields.cursor import ItemCursorField
+from openbook_common.serializers_fields.request import CursorField
 from openbook_communities.models import Community, CommunityInvite
 from openbook_notifications.models import Notification, PostCommentNotification, ConnectionRequestNotification, \
     ConnectionConfirmedNotification, FollowNotification, CommunityInviteNotification
@@ -25,6 +30,24 @@ class GetNotificationsSerializer(serializers.Serializer):
     max_id = serializers.IntegerField(
         required=False,
     )
+    max_cursor = CursorField(
+        required=False,
+    )
+
+
+class GetNewNotificationsSerializer(serializers.Serializer):
+    min_cursor = CursorField(
+        required=True,
+    )
+    count = serializers.IntegerField(
+        required=False,
+        max_value=20
+    )
+    timeout = serializers.IntegerField(
+        required=False,
+        min_value=0,
+        max_value=settings.NOTIFICATIONS_LONG_POLL_MAX_TIMEOUT
+    )
 
 
 class PostCommentCommenterProfileSerializer(serializers.ModelSerializer):
@@ -94,6 +117,14 @@ class NotificationPostSerializer(serializers.ModelSerializer):
     video = PostCommentPostVideoSerializer()
     creator = PostCommentCreatorSerializer()
 
+    def to_representation(self, post):
+        # Posts we can no longer see, e.g. after a disconnection, are left out
+        visible_posts_ids = self.context.get('visible_posts_ids')
+        if visible_posts_ids is not None and post.pk not in visible_posts_ids:
+            return None
+
+        return super(NotificationPostSerializer, self).to_representation(post)
+
     class Meta:
         model = Post
         fields = (
@@ -180,12 +211,15 @@ class PostReactionSerializer(serializers.ModelSerializer):
 
 class PostReactionNotificationSerializer(serializers.ModelSerializer):
     post_reaction = PostReactionSerializer()
+    last_reactors = PostReactionReactorSerializer(many=True, source='get_last_reactors')
 
     class Meta:
         model = PostReactionNotification
         fields = (
             'id',
-            'post_reaction'
+            'post_reaction',
+            'reactions_count',
+            'last_reactors',
         )
 
 
@@ -343,6 +377,76 @@ class CommunityInviteNotificationSerializer(serializers.ModelSerializer):
         )
 
 
+class GetNotificationsNotificationListSerializer(ListSerializer):
+    """
+    Loads the content objects of a page of notifications with one query per notification type
+    and decides which of their posts the user can see with a single query, handing them to
+    NotificationPostSerializer through the visible_posts_ids context
+    """
+
+    content_objects_select_related = {
+        PostCommentNotification: ('post_comment__commenter__profile', 'post_comment__post__creator__profile',
+                                  'post_comment__post__image', 'post_comment__post__video'),
+        PostReactionNotification: ('post_reaction__reactor__profile', 'post_reaction__emoji',
+                                   'post_reaction__post__creator__profile', 'post_reaction__post__image',
+                                   'post_reaction__post__video'),
+        ConnectionRequestNotification: ('connection_requester__profile',),
+        ConnectionConfirmedNotification: ('connection_confirmator__profile',),
+        FollowNotification: ('follower__profile',),
+        CommunityInviteNotification: ('community_invite__creator__profile', 'community_invite__community'),
+    }
+
+    def to_representation(self, data):
+        notifications = list(data)
+
+        self._attach_content_objects(notifications)
+
+        posts_ids = [self._get_notification_post_id(notification) for notification in notifications]
+
+        request = self.context.get('request')
+        self._context['visible_posts_ids'] = request.user.filter_visible_post_ids(
+            [post_id for post_id in posts_ids if post_id])
+
+        return super(GetNotificationsNotificationListSerializer, self).to_representation(notifications)
+
+    def _attach_content_objects(self, notifications):
+        notifications_by_content_type_id = {}
+
+        for notification in notifications:
+            notifications_by_content_type_id.setdefault(notification.content_type_id, []).append(notification)
+
+        for content_type_id, content_type_notifications in notifications_by_content_type_id.items():
+            content_object_model = ContentType.objects.get_for_id(content_type_id).model_class()
+
+            content_objects_query = content_object_model.objects.filter(
+                pk__in=[notification.object_id for notification in content_type_notifications])
+
+            select_related = self.content_objects_select_related.get(content_object_model)
+            if select_related:
+                content_objects_query = content_objects_query.select_related(*select_related)
+
+            content_objects = {content_object.pk: content_object for content_object in content_objects_query}
+
+            for notification in content_type_notifications:
+                content_object = content_objects.get(notification.object_id)
+                if content_object is not None:
+                    notification.content_object = content_object
+
+            if content_object_model is PostReactionNotification:
+                PostReactionNotification.prefetch_last_reactors(list(content_objects.values()))
+
+    def _get_notification_post_id(self, notification):
+        content_object = notification.content_object
+
+        if isinstance(content_object, PostCommentNotification):
+            return content_object.post_comment.post_id
+
+        if isinstance(content_object, PostReactionNotification):
+            return content_object.post_id
+
+        return None
+
+
 class GetNotificationsNotificationSerializer(serializers.ModelSerializer):
     content_object = GenericRelatedField({
         PostCommentNotification: PostCommentNotificationSerializer(),
@@ -352,15 +456,18 @@ class GetNotificationsNotificationSerializer(serializers.ModelSerializer):
         FollowNotification: FollowNotificationSerializer(),
         CommunityInviteNotification: CommunityInviteNotificationSerializer()
     })
+    cursor = ItemCursorField()
 
     class Meta:
         model = Notification
+        list_serializer_class = GetNotificationsNotificationListSerializer
         fields = (
             'id',
             'notification_type',
             'content_object',
             'read',
             'created',
+            'cursor',
         )
 
 
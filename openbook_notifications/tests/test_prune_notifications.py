@@ -0,0 +1,90 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from openbook_common.tests.helpers import make_user, make_fake_post_text, make_fake_post_comment_text
+from openbook_notifications.models import Notification, PostCommentNotification
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@override_settings(NOTIFICATIONS_RETENTION_DAYS={'PC': 30}, NOTIFICATIONS_COMPACTION_DAYS=7)
+class PruneNotificationsCommandTests(TestCase):
+    """
+    prune_notifications
+    """
+
+    def test_deletes_read_notifications_older_than_retention(self):
+        """
+        should delete the read notifications older than their retention along with their content objects
+        """
+        user = make_user()
+        post = user.create_public_post(text=make_fake_post_text())
+
+        for i in range(0, 3):
+            make_user().comment_post_with_id(post_id=post.pk, text=make_fake_post_comment_text())
+
+        old_read_notification, old_unread_notification, recent_read_notification = Notification.objects.filter(
+            owner=user).order_by('id')
+
+        Notification.objects.filter(pk__in=[old_read_notification.pk, old_unread_notification.pk]).update(
+            created=timezone.now() - timedelta(days=31))
+        Notification.objects.filter(pk__in=[old_read_notification.pk, recent_read_notification.pk]).update(
+            read=True)
+
+        call_command('prune_notifications', stdout=StringIO())
+
+        self.assertFalse(Notification.objects.filter(pk=old_read_notification.pk).exists())
+        self.assertFalse(PostCommentNotification.objects.filter(pk=old_read_notification.object_id).exists())
+        self.assertTrue(Notification.objects.filter(pk=old_unread_notification.pk).exists())
+        self.assertTrue(Notification.objects.filter(pk=recent_read_notification.pk).exists())
+
+    def test_compacts_old_post_comment_notifications_into_latest(self):
+        """
+        should keep only the latest of the old read post comment notifications of a user for the same post
+        """
+        user = make_user()
+        post = user.create_public_post(text=make_fake_post_text())
+        other_post = user.create_public_post(text=make_fake_post_text())
+
+        for i in range(0, 3):
+            make_user().comment_post_with_id(post_id=post.pk, text=make_fake_post_comment_text())
+
+        make_user().comment_post_with_id(post_id=other_post.pk, text=make_fake_post_comment_text())
+
+        Notification.objects.filter(owner=user).update(created=timezone.now() - timedelta(days=8), read=True)
+
+        latest_post_comment_notification = PostCommentNotification.objects.filter(
+            post_comment__post=post, notification__owner=user).latest('id')
+
+        call_command('prune_notifications', stdout=StringIO())
+
+        self.assertEqual(list(PostCommentNotification.objects.filter(post_comment__post=post,
+                                                                     notification__owner=user)),
+                         [latest_post_comment_notification])
+        self.assertTrue(PostCommentNotification.objects.filter(post_comment__post=other_post).exists())
+        self.assertEqual(Notification.objects.filter(owner=user).count(), 2)
+
+    def test_does_not_compact_unread_notifications(self):
+        """
+        should keep the old unread post comment notifications of a user for the same post
+        """
+        user = make_user()
+        post = user.create_public_post(text=make_fake_post_text())
+
+        for i in range(0, 3):
+            make_user().comment_post_with_id(post_id=post.pk, text=make_fake_post_comment_text())
+
+        Notification.objects.filter(owner=user).update(created=timezone.now() - timedelta(days=8))
+
+        call_command('prune_notifications', stdout=StringIO())
+
+        self.assertEqual(Notification.objects.filter(owner=user).count(), 3)
+
+        user.refresh_from_db()
+        self.assertEqual(user.get_unread_notifications_count(), 3)
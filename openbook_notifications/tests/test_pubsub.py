@@ -0,0 +1,60 @@
+import threading
+from datetime import datetime
+
+from django.test import SimpleTestCase
+
+from openbook_notifications.pubsub import InProcessNotificationsPubSub, CacheNotificationsPubSub
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationsPubSubTests(SimpleTestCase):
+    """
+    Notifications pubsubs
+    """
+
+    def test_in_process_pubsub_wakes_waiter_up_on_publish(self):
+        """
+        should wake a waiter up when a newer notification of its user is published from another thread
+        """
+        pubsub = InProcessNotificationsPubSub()
+
+        publisher = threading.Timer(0.1, lambda: pubsub.publish(owner_id=1, notification_cursor=(datetime(2019, 1, 1), 5)))
+        publisher.start()
+
+        self.assertTrue(pubsub.wait(owner_id=1, min_cursor=(datetime(2019, 1, 1), 4), timeout=5))
+        publisher.join()
+
+    def test_in_process_pubsub_ignores_other_users_and_older_notifications(self):
+        """
+        should keep waiting when the published notifications belong to other users or are not newer
+        """
+        pubsub = InProcessNotificationsPubSub()
+
+        pubsub.publish(owner_id=2, notification_cursor=(datetime(2019, 1, 2), 10))
+        pubsub.publish(owner_id=1, notification_cursor=(datetime(2019, 1, 1), 3))
+
+        self.assertFalse(pubsub.wait(owner_id=1, min_cursor=(datetime(2019, 1, 1), 4), timeout=0.1))
+
+    def test_cache_pubsub_sees_published_notification(self):
+        """
+        should see a notification after min_cursor once published
+        """
+        pubsub = CacheNotificationsPubSub()
+
+        pubsub.publish(owner_id=3, notification_cursor=(datetime(2019, 1, 1), 7))
+
+        self.assertTrue(pubsub.wait(owner_id=3, min_cursor=(datetime(2019, 1, 1), 6), timeout=0))
+        self.assertFalse(pubsub.wait(owner_id=3, min_cursor=(datetime(2019, 1, 1), 7), timeout=0))
+
+    def test_in_process_pubsub_wakes_waiter_up_on_older_notification_brought_back(self):
+        """
+        should wake a waiter up when a notification with an older id is published with a newer created
+        """
+        pubsub = InProcessNotificationsPubSub()
+
+        pubsub.publish(owner_id=1, notification_cursor=(datetime(2019, 1, 2), 3))
+
+        self.assertTrue(pubsub.wait(owner_id=1, min_cursor=(datetime(2019, 1, 1), 4), timeout=0))
@@ -0,0 +1,169 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from openbook_common.tests.helpers import make_user, make_device
+from openbook_notifications.models import PushNotification
+from openbook_notifications.push_notifications import backends
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class FailingPushNotificationsSender(backends.BasePushNotificationsSender):
+    def send_push_notification(self, devices, post_body, badge_count=1):
+        raise ConnectionError('Push provider unavailable')
+
+
+class LimitedPushNotificationsSender(backends.FakePushNotificationsSender):
+    max_devices_per_send = 2
+
+
+class SendPushNotificationsCommandTests(TestCase):
+    """
+    send_push_notifications
+    """
+
+    def setUp(self):
+        backends.sent_push_notifications.clear()
+
+    def test_queues_push_notifications_after_commit(self):
+        """
+        should not queue the push notifications of a request before its transaction commits
+        """
+        user = make_user()
+        make_device(owner=user)
+        follower = make_user()
+
+        follower.follow_user_with_id(user.pk)
+
+        self.assertFalse(PushNotification.objects.exists())
+
+    def test_sends_queued_push_notifications_to_every_device(self):
+        """
+        should send the queued push notifications to every device of the user and remove them from the outbox
+        """
+        user = make_user()
+        devices = [make_device(owner=user) for i in range(0, 2)]
+
+        PushNotification.create_push_notifications_for_user(user=user, post_body='{"contents": {"en": "Hi"}}')
+
+        call_command('send_push_notifications', once=True, stdout=StringIO())
+
+        self.assertEqual(len(backends.sent_push_notifications), 1)
+        sent_devices, sent_post_body, sent_badge_count = backends.sent_push_notifications[0]
+        self.assertEqual(sorted(device.pk for device in sent_devices), sorted(device.pk for device in devices))
+        self.assertEqual(sent_post_body, {'contents': {'en': 'Hi'}})
+        self.assertFalse(PushNotification.objects.exists())
+
+    def test_sends_the_same_push_notification_to_many_users_at_once(self):
+        """
+        should send a push notification queued for many users with a single provider call
+        """
+        users = [make_user() for i in range(0, 5)]
+        devices = [make_device(owner=user) for user in users]
+
+        for user in users:
+            PushNotification.create_push_notifications_for_user(user=user, post_body='{"contents": {"en": "Hi"}}')
+
+        call_command('send_push_notifications', once=True, stdout=StringIO())
+
+        self.assertEqual(len(backends.sent_push_notifications), 1)
+        sent_devices = backends.sent_push_notifications[0][0]
+        self.assertEqual(sorted(device.pk for device in sent_devices), sorted(device.pk for device in devices))
+
+    @override_settings(
+        PUSH_NOTIFICATIONS_SENDER='openbook_notifications.tests.test_push_notifications.LimitedPushNotificationsSender')
+    def test_chunks_sends_to_the_max_devices_of_the_provider(self):
+        """
+        should split a send to more devices than the provider accepts at once into several calls
+        """
+        user = make_user()
+        for i in range(0, 5):
+            make_device(owner=user)
+
+        PushNotification.create_push_notifications_for_user(user=user, post_body='{}')
+
+        call_command('send_push_notifications', once=True, stdout=StringIO())
+
+        sent_devices_counts = [len(devices) for devices, post_body, badge_count in backends.sent_push_notifications]
+        self.assertEqual(sent_devices_counts, [2, 2, 1])
+
+    def test_coalesces_push_notifications_of_the_same_group(self):
+        """
+        should send a single push notification with the latest content for the same group of a device
+        """
+        user = make_user()
+        make_device(owner=user)
+
+        for i in range(0, 3):
+            PushNotification.create_push_notifications_for_user(user=user, post_body='{"index": %d}' % i,
+                                                                group='post_1')
+
+        PushNotification.create_push_notifications_for_user(user=user, post_body='{"index": 3}', group='post_2')
+
+        call_command('send_push_notifications', once=True, stdout=StringIO())
+
+        sent = [(post_body['index'], badge_count) for device, post_body, badge_count in
+                backends.sent_push_notifications]
+        self.assertEqual(sent, [(2, 3), (3, 1)])
+
+    @override_settings(
+        PUSH_NOTIFICATIONS_SENDER='openbook_notifications.tests.test_push_notifications.FailingPushNotificationsSender',
+        PUSH_NOTIFICATIONS_MAX_ATTEMPTS=2)
+    def test_retries_failed_push_notifications_with_backoff(self):
+        """
+        should postpone the failed push notifications and give up after the max attempts
+        """
+        user = make_user()
+        make_device(owner=user)
+
+        PushNotification.create_push_notifications_for_user(user=user, post_body='{}')
+
+        call_command('send_push_notifications', once=True, stdout=StringIO())
+
+        push_notification = PushNotification.objects.get()
+        self.assertEqual(push_notification.attempts, 1)
+        self.assertFalse(push_notification.failed)
+        self.assertTrue(push_notification.next_attempt > timezone.now())
+
+        PushNotification.objects.update(next_attempt=timezone.now())
+
+        call_command('send_push_notifications', once=True, stdout=StringIO())
+
+        push_notification = PushNotification.objects.get()
+        self.assertEqual(push_notification.attempts, 2)
+        self.assertTrue(push_notification.failed)
+
+
+class OneSignalPushNotificationsSenderTests(TestCase):
+    """
+    OneSignalPushNotificationsSender
+    """
+
+    def test_targets_all_devices_in_a_single_call(self):
+        """
+        should target every device with OR joined tag filters in a single OneSignal call
+        """
+        users = [make_user() for i in range(0, 2)]
+        devices = [make_device(owner=user) for user in users for i in range(0, 2)]
+
+        sender = backends.OneSignalPushNotificationsSender()
+
+        with mock.patch.object(sender.onesignal_client, 'send_notification') as send_notification:
+            sender.send_push_notification(devices=devices, post_body={'contents': {'en': 'Hi'}}, badge_count=2)
+
+        self.assertEqual(send_notification.call_count, 1)
+
+        post_body = send_notification.call_args[0][0].post_body
+        self.assertEqual(post_body['ios_badgeCount'], '2')
+
+        filters = post_body['filters']
+        self.assertEqual(len([f for f in filters if f.get('operator') == 'OR']), len(devices) - 1)
+        self.assertEqual([f['value'] for f in filters if f.get('key') == 'device_uuid'],
+                         [device.uuid for device in devices])
+        self.assertEqual(len({f['value'] for f in filters if f.get('key') == 'user_id'}), len(users))
@@ -1,12 +1,21 @@
 import json
+import threading
+import time
+from unittest import mock
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from faker import Faker
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.test import APITestCase, APITransactionTestCase
 
-from openbook_common.tests.helpers import make_user, make_authentication_headers_for_user, make_notification
+from openbook_common.tests.helpers import make_user, make_authentication_headers_for_user, make_notification, \
+    make_circle, make_fake_post_text, make_fake_post_comment_text, make_emoji, make_reactions_emoji_group
+from openbook_common.utils.helpers import make_cursor
 from openbook_notifications.models import Notification
+from openbook_notifications.pubsub import InProcessNotificationsPubSub
 
 fake = Faker()
 
@@ -16,6 +25,10 @@ class NotificationsAPITests(APITestCase):
     NotificationsAPI
     """
 
+    fixtures = [
+        'openbook_circles/fixtures/circles.json'
+    ]
+
     def test_can_retrieve_notifications(self):
         """
         should be able to retrieve all notifications and return 200
@@ -43,6 +56,110 @@ class NotificationsAPITests(APITestCase):
             response_notification_id = response_notification.get('id')
             self.assertIn(response_notification_id, notifications_ids)
 
+    def test_can_retrieve_notifications_with_max_cursor(self):
+        """
+        should be able to page through all notifications with the max cursor of the last retrieved one
+        """
+        user = make_user()
+
+        amount_of_notifications = 5
+        notifications_ids = []
+
+        for i in range(0, amount_of_notifications):
+            notification = make_notification(owner=user)
+            notifications_ids.append(notification.pk)
+
+        url = self._get_url()
+        headers = make_authentication_headers_for_user(user)
+        retrieved_notifications = []
+        request_data = {'count': 2}
+
+        for page in range(3):
+            response = self.client.get(url, request_data, **headers)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            response_notifications = json.loads(response.content)
+            retrieved_notifications.extend(response_notifications)
+            request_data['max_cursor'] = response_notifications[-1]['cursor']
+
+        retrieved_notifications_ids = [notification['id'] for notification in retrieved_notifications]
+        expected_notifications_ids = list(
+            Notification.objects.filter(owner=user).order_by('-created', '-id').values_list('id', flat=True))
+
+        self.assertEqual(retrieved_notifications_ids, expected_notifications_ids)
+
+    def test_leaves_out_posts_no_longer_visible_from_notifications(self):
+        """
+        should not serialize the post of a notification once the user can no longer see it
+        """
+        post_creator = make_user()
+        user = make_user()
+        commenter = make_user()
+        circle = make_circle(creator=post_creator)
+
+        for connected_user in (user, commenter):
+            post_creator.connect_with_user_with_id(connected_user.pk, circles_ids=[circle.pk])
+            connected_user.confirm_connection_with_user_with_id(post_creator.pk)
+
+        post = post_creator.create_encircled_post(text=make_fake_post_text(), circles_ids=[circle.pk])
+        user.comment_post_with_id(post_id=post.pk, text=make_fake_post_comment_text())
+        commenter.comment_post_with_id(post_id=post.pk, text=make_fake_post_comment_text())
+
+        url = self._get_url()
+        headers = make_authentication_headers_for_user(user)
+
+        response = self.client.get(url, **headers)
+        response_post = self._get_post_comment_notifications_posts(response)[0]
+        self.assertEqual(response_post['id'], post.pk)
+
+        post_creator.disconnect_from_user_with_id(user.pk)
+
+        response = self.client.get(url, **headers)
+        response_posts = self._get_post_comment_notifications_posts(response)
+        self.assertEqual(response_posts, [None])
+
+    def test_get_notifications_queries_count_does_not_grow_with_count(self):
+        """
+        should retrieve a page of notifications with the same amount of queries no matter how many it has
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        emoji_group = make_reactions_emoji_group()
+        emoji = make_emoji(group=emoji_group)
+
+        for i in range(4):
+            # Reactions to the same post are aggregated into one notification
+            post = user.create_public_post(text=make_fake_post_text())
+            foreign_user = make_user()
+            foreign_user.follow_user_with_id(user.pk)
+            foreign_user.comment_post_with_id(post_id=post.pk, text=make_fake_post_comment_text())
+            foreign_user.react_to_post_with_id(post.pk, emoji_id=emoji.pk, emoji_group_id=emoji_group.pk)
+
+        url = self._get_url()
+
+        with CaptureQueriesContext(connection) as small_page_queries:
+            response = self.client.get(url, {'count': 3}, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(json.loads(response.content)), 3)
+
+        with CaptureQueriesContext(connection) as big_page_queries:
+            response = self.client.get(url, {'count': 12}, **headers)
+
+        response_notifications = json.loads(response.content)
+
+        self.assertEqual(len(response_notifications), 12)
+        self.assertEqual(len(big_page_queries), len(small_page_queries))
+
+        for response_notification in response_notifications:
+            self.assertIsNotNone(response_notification['content_object'])
+
+    def _get_post_comment_notifications_posts(self, response):
+        return [notification['content_object']['post_comment']['post'] for notification in
+                json.loads(response.content) if notification['notification_type'] == Notification.POST_COMMENT]
+
     def test_can_delete_notifications(self):
         """
         should be able to delete all notifications and return 200
@@ -68,6 +185,166 @@ class NotificationsAPITests(APITestCase):
         return reverse('notifications')
 
 
+class NewNotificationsAPITests(APITestCase):
+    """
+    NewNotificationsAPI
+    """
+
+    def test_retrieves_notifications_after_min_cursor(self):
+        """
+        should retrieve the notifications after min_cursor right away and return 200
+        """
+        user = make_user()
+
+        for i in range(0, 3):
+            make_notification(owner=user)
+
+        notifications = list(Notification.objects.filter(owner=user).order_by('created', 'id'))
+
+        url = self._get_url()
+        headers = make_authentication_headers_for_user(user)
+        response = self.client.get(url, {'min_cursor': _make_notification_cursor(notifications[0]), 'timeout': 0},
+                                   **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_notifications_ids = [notification['id'] for notification in json.loads(response.content)]
+        self.assertEqual(response_notifications_ids, [notification.pk for notification in notifications[:0:-1]])
+
+    def test_retrieves_no_notifications_after_timeout(self):
+        """
+        should retrieve no notifications once the timeout passes without new ones and return 200
+        """
+        user = make_user()
+
+        notification = make_notification(owner=user)
+
+        url = self._get_url()
+        headers = make_authentication_headers_for_user(user)
+        response = self.client.get(url, {'min_cursor': _make_notification_cursor(notification), 'timeout': 0},
+                                   **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content), [])
+
+    def test_retrieves_notifications_the_pubsub_missed_while_waiting(self):
+        """
+        should retrieve the notifications created while waiting even if the pubsub did not hear about them
+        and return 200
+        """
+        user = make_user()
+
+        notification = make_notification(owner=user)
+
+        class DeafNotificationsPubSub(InProcessNotificationsPubSub):
+            def wait(self, owner_id, min_cursor, timeout):
+                # Created by another process
+                _make_new_notification(owner=user)
+                return False
+
+        url = self._get_url()
+        headers = make_authentication_headers_for_user(user)
+
+        with mock.patch('openbook_notifications.views.get_notifications_pubsub',
+                        return_value=DeafNotificationsPubSub()):
+            response = self.client.get(url, {'min_cursor': _make_notification_cursor(notification), 'timeout': 1},
+                                       **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(json.loads(response.content)), 1)
+
+    def _get_url(self):
+        return reverse('new-notifications')
+
+
+class NewNotificationsLongPollAPITests(APITransactionTestCase):
+    """
+    NewNotificationsAPI, waiting for notifications created by other threads
+    """
+
+    fixtures = [
+        'openbook_circles/fixtures/circles.json'
+    ]
+
+    def test_retrieves_notification_created_while_waiting(self):
+        """
+        should answer with a notification as soon as it is created during the wait and return 200
+        """
+        user = make_user()
+
+        notification = make_notification(owner=user)
+
+        def create_notification():
+            _make_new_notification(owner=user)
+            connection.close()
+
+        notification_creator = threading.Timer(0.2, create_notification)
+
+        url = self._get_url()
+        headers = make_authentication_headers_for_user(user)
+
+        started = time.monotonic()
+        notification_creator.start()
+        response = self.client.get(url, {'min_cursor': _make_notification_cursor(notification), 'timeout': 10},
+                                   **headers)
+        notification_creator.join()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(json.loads(response.content)), 1)
+        self.assertLess(time.monotonic() - started, 10)
+
+    def test_retrieves_post_reaction_notification_brought_back_while_waiting(self):
+        """
+        should answer with the post reaction notification another reaction to the post brings back during the wait
+        and return 200
+        """
+        user = make_user()
+        post = user.create_public_post(text=make_fake_post_text())
+
+        emoji_group = make_reactions_emoji_group()
+        emoji = make_emoji(group=emoji_group)
+
+        reactors = [make_user(), make_user()]
+
+        for reactor in reactors:
+            reactor.follow_user_with_id(user.pk)
+
+        reactors[0].react_to_post_with_id(post.pk, emoji_id=emoji.pk, emoji_group_id=emoji_group.pk)
+        notification = Notification.objects.get(owner=user)
+
+        def react_to_post():
+            reactors[1].react_to_post_with_id(post.pk, emoji_id=emoji.pk, emoji_group_id=emoji_group.pk)
+            connection.close()
+
+        reactor = threading.Timer(0.2, react_to_post)
+
+        url = self._get_url()
+        headers = make_authentication_headers_for_user(user)
+
+        reactor.start()
+        response = self.client.get(url, {'min_cursor': _make_notification_cursor(notification), 'timeout': 10},
+                                   **headers)
+        reactor.join()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([response_notification['id'] for response_notification in json.loads(response.content)],
+                         [notification.pk])
+
+    def _get_url(self):
+        return reverse('new-notifications')
+
+
+def _make_notification_cursor(notification):
+    return make_cursor(created=notification.created, id=notification.pk)
+
+
+def _make_new_notification(owner):
+    # make_notification picks a random created
+    notification = make_notification(owner=owner)
+    Notification.objects.filter(pk=notification.pk).update(created=timezone.now())
+    return notification
+
+
 class ReadNotificationsAPITests(APITestCase):
     """
     ReadNotificationsAPI
@@ -123,6 +400,27 @@ class ReadNotificationsAPITests(APITestCase):
 
         self.assertTrue(Notification.objects.filter(owner=user, read=False, id__gt=max_id).exists())
 
+    def test_reading_notifications_updates_unread_notifications_count(self):
+        """
+        should count down the unread notifications count by the amount of read notifications
+        """
+        user = make_user()
+
+        notifications_ids = [make_notification(owner=user).pk for i in range(0, 5)]
+
+        user.refresh_from_db()
+        self.assertEqual(user.get_unread_notifications_count(), 5)
+
+        url = self._get_url()
+        headers = make_authentication_headers_for_user(user)
+        self.client.post(url, {
+            'max_id': notifications_ids[1]
+        }, **headers)
+
+        user.refresh_from_db()
+        self.assertEqual(user.get_unread_notifications_count(), 3)
+        self.assertEqual(user.get_unread_notifications_count(), user.count_unread_notifications())
+
     def _get_url(self):
         return reverse('read-notifications')
 
@@ -150,6 +448,23 @@ class NotificationItemAPITests(APITestCase):
 
         self.assertFalse(Notification.objects.filter(id=notification_id).exists())
 
+    def test_deleting_unread_notification_updates_unread_notifications_count(self):
+        """
+        should count down the unread notifications count when deleting an unread notification
+        """
+        user = make_user()
+
+        headers = make_authentication_headers_for_user(user)
+
+        notification = make_notification(owner=user)
+        make_notification(owner=user)
+
+        url = self._get_url(notification.pk)
+        self.client.delete(url, **headers)
+
+        user.refresh_from_db()
+        self.assertEqual(user.get_unread_notifications_count(), 1)
+
     def test_cannot_delete_foreign_notification(self):
         """
         should not be able to delete a foreign notification and return 200
@@ -198,6 +513,24 @@ class ReadNotificationAPITests(APITestCase):
 
         self.assertTrue(Notification.objects.filter(id=notification_id, read=True).exists())
 
+    def test_reading_notification_twice_counts_it_down_once(self):
+        """
+        should count down the unread notifications count only the first time a notification is read
+        """
+        user = make_user()
+
+        headers = make_authentication_headers_for_user(user)
+
+        notification = make_notification(owner=user)
+        make_notification(owner=user)
+
+        url = self._get_url(notification.pk)
+        self.client.post(url, **headers)
+        self.client.post(url, **headers)
+
+        user.refresh_from_db()
+        self.assertEqual(user.get_unread_notifications_count(), 1)
+
     def test_cannot_read_foreign_notification(self):
         """
         should not be able to read a foreign notification and return 400
@@ -1,12 +1,16 @@
 # Create your views here.
+import time
+
+from django.conf import settings
 from django.db import transaction
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from openbook_notifications.pubsub import get_notifications_pubsub
 from openbook_notifications.serializers import GetNotificationsSerializer, GetNotificationsNotificationSerializer, \
-    DeleteNotificationSerializer, ReadNotificationSerializer, ReadNotificationsSerializer
+    DeleteNotificationSerializer, ReadNotificationSerializer, ReadNotificationsSerializer, GetNewNotificationsSerializer
 
 
 class Notifications(APIView):
@@ -21,10 +25,12 @@ class Notifications(APIView):
 
         count = data.get('count', 10)
         max_id = data.get('max_id')
+        max_cursor = data.get('max_cursor')
 
         user = request.user
 
-        notifications = user.get_notifications(max_id=max_id).order_by('-created')[:count]
+        notifications = user.get_notifications(max_id=max_id, max_cursor=max_cursor).order_by('-created', '-id')[
+                        :count]
 
         response_serializer = GetNotificationsNotificationSerializer(notifications, many=True,
                                                                      context={"request": request})
@@ -40,6 +46,53 @@ class Notifications(APIView):
         return Response(status=status.HTTP_200_OK)
 
 
+class NewNotifications(APIView):
+    """
+    Long polls the notifications after min_cursor, answering as soon as there are some or with none
+    once the timeout passes
+    """
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request):
+        query_params = request.query_params.dict()
+        serializer = GetNewNotificationsSerializer(data=query_params)
+        serializer.is_valid(raise_exception=True)
+
+        data = serializer.validated_data
+
+        min_cursor = data.get('min_cursor')
+        count = data.get('count', 10)
+        timeout = data.get('timeout', settings.NOTIFICATIONS_LONG_POLL_MAX_TIMEOUT)
+
+        user = request.user
+
+        notifications_pubsub = get_notifications_pubsub()
+        deadline = time.monotonic() + timeout
+        published = False
+
+        # The pubsub may not hear about the notifications created by other processes, and the database may not
+        # return the ones it heard about yet, so the database is checked again every poll interval regardless
+        while not user.has_notifications_after_cursor(min_cursor):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return Response([], status=status.HTTP_200_OK)
+
+            poll_timeout = min(settings.NOTIFICATIONS_PUBSUB_POLL_INTERVAL, remaining)
+
+            if published:
+                # Waiting on the pubsub would return right away again
+                time.sleep(poll_timeout)
+            else:
+                published = notifications_pubsub.wait(owner_id=user.pk, min_cursor=min_cursor, timeout=poll_timeout)
+
+        notifications = user.get_notifications_after_cursor(min_cursor).order_by('-created', '-id')[:count]
+
+        response_serializer = GetNotificationsNotificationSerializer(notifications, many=True,
+                                                                     context={"request": request})
+
+        return Response(response_serializer.data, status=status.HTTP_200_OK)
+
+
 class ReadNotifications(APIView):
     permission_classes = (IsAuthenticated,)
 
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+import logging
+
+from django.db import transaction
+
+from openbook_common.utils.model_loaders import get_user_model, get_timeline_entry_model
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the materialized timeline entries of users from their follows, connections and communities'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', type=str, help='Only rebuild the timeline of the user with this username')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        TimelineEntry = get_timeline_entry_model()
+
+        users = User.objects.all()
+
+        username = options.get('username')
+        if username:
+            users = users.filter(username=username)
+
+        users_count = users.count()
+        logger.info('Rebuilding the timeline entries of %d users' % users_count)
+
+        for user in users.iterator():
+            with transaction.atomic():
+                TimelineEntry.rebuild_entries_for_owner(owner=user)
+            logger.info('Rebuilt timeline entries of user with id %d and username %s' % (user.pk, user.username))
+
+        self.stdout.write(self.style.SUCCESS('Successfully rebuilt the timeline entries of %d users' % users_count))
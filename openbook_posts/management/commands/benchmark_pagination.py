@@ -0,0 +1,79 @@
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from openbook_common.utils.model_loaders import get_user_model, get_post_model, get_circle_model
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the latency of fetching page N of the profile posts with offsets, max_id and cursors. ' \
+           'All generated data is rolled back.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=20000, help='Amount of posts of the benchmarked user')
+        parser.add_argument('--pages', type=str, default='1,10,100,1000',
+                            help='Comma separated page numbers to benchmark')
+        parser.add_argument('--runs', type=int, default=5, help='Amount of page fetches per page number')
+        parser.add_argument('--count', type=int, default=10, help='Amount of posts per page')
+
+    def handle(self, *args, **options):
+        pages = [int(page) for page in options['pages'].split(',')]
+        runs = options['runs']
+        count = options['count']
+
+        with transaction.atomic():
+            user = self._make_user_with_posts(options['posts'])
+
+            self.stdout.write('%10s %12s %12s %12s' % ('page', 'offset ms', 'max_id ms', 'cursor ms'))
+
+            for page in pages:
+                offset = (page - 1) * count
+                # The last post of the previous page, as a client would have it
+                previous_post = user.get_posts().order_by('-created', '-id')[offset - 1] if offset else None
+
+                offset_ms = self._time_fetch(runs, lambda: list(
+                    user.get_posts().order_by('-created', '-id')[offset:offset + count]))
+
+                max_id = previous_post.pk if previous_post else None
+                max_id_ms = self._time_fetch(runs, lambda: list(
+                    user.get_posts(max_id=max_id).order_by('-created')[:count]))
+
+                max_cursor = (previous_post.created, previous_post.pk) if previous_post else None
+                cursor_ms = self._time_fetch(runs, lambda: list(
+                    user.get_posts(max_cursor=max_cursor).order_by('-created', '-id')[:count]))
+
+                self.stdout.write('%10d %12.2f %12.2f %12.2f' % (page, offset_ms, max_id_ms, cursor_ms))
+
+            transaction.set_rollback(True)
+
+    def _time_fetch(self, runs, fetch):
+        start = time.perf_counter()
+        for i in range(runs):
+            fetch()
+        return (time.perf_counter() - start) * 1000 / runs
+
+    def _make_user_with_posts(self, posts_amount):
+        User = get_user_model()
+        Post = get_post_model()
+        Circle = get_circle_model()
+
+        user = User.create_user(username='b_%s' % uuid.uuid4().hex[:20],
+                                email='%s@openbook.benchmark' % uuid.uuid4().hex,
+                                password=uuid.uuid4().hex, name='Benchmark', is_of_legal_age=True)
+
+        now = timezone.now()
+        Post.objects.bulk_create(
+            [Post(creator_id=user.pk, text='Benchmark', created=now - timedelta(minutes=i)) for i in
+             range(posts_amount)])
+
+        world_circle_id = Circle.get_world_circle_id()
+        posts_ids = Post.objects.filter(creator_id=user.pk).values_list('id', flat=True)
+        CirclePost = Circle.posts.through
+        CirclePost.objects.bulk_create(
+            [CirclePost(circle_id=world_circle_id, post_id=post_id) for post_id in posts_ids])
+
+        return user
@@ -0,0 +1,84 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from openbook_common.utils.model_loaders import get_user_model, get_follow_model, get_post_model, get_circle_model
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the timeline query as the amount of followed users grows. All generated data is rolled back.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--follows', type=str, default='10,100,1000,5000',
+                            help='Comma separated amounts of followed users to benchmark')
+        parser.add_argument('--runs', type=int, default=5, help='Amount of timeline fetches per amount of follows')
+        parser.add_argument('--count', type=int, default=10, help='Amount of posts to retrieve per fetch')
+
+    def handle(self, *args, **options):
+        follows_amounts = [int(amount) for amount in options['follows'].split(',')]
+        runs = options['runs']
+        count = options['count']
+
+        self.stdout.write('%10s %10s %12s %12s' % ('follows', 'queries', 'sql length', 'avg ms'))
+
+        for follows_amount in follows_amounts:
+            with transaction.atomic():
+                user = self._make_user_following_users(follows_amount)
+
+                with CaptureQueriesContext(connection) as queries_context:
+                    start = time.perf_counter()
+                    for i in range(runs):
+                        list(user.get_timeline_posts()[:count])
+                    elapsed_ms = (time.perf_counter() - start) * 1000 / runs
+
+                queries_count = len(queries_context.captured_queries) // runs
+                sql_length = max(len(query['sql']) for query in queries_context.captured_queries)
+
+                self.stdout.write('%10d %10d %12d %12.2f' % (follows_amount, queries_count, sql_length, elapsed_ms))
+
+                transaction.set_rollback(True)
+
+    def _make_user_following_users(self, follows_amount):
+        User = get_user_model()
+        Follow = get_follow_model()
+        Post = get_post_model()
+        Circle = get_circle_model()
+
+        user = self._make_benchmark_user()
+
+        followed_users = User.objects.bulk_create(
+            [User(username=self._make_benchmark_username(), email='%s@openbook.benchmark' % uuid.uuid4().hex)
+             for i in range(follows_amount)])
+
+        # bulk_create does not set primary keys on every database backend
+        followed_users_ids = User.objects.filter(
+            username__in=[followed_user.username for followed_user in followed_users]).values_list('id', flat=True)
+
+        Follow.objects.bulk_create(
+            [Follow(user_id=user.pk, followed_user_id=followed_user_id) for followed_user_id in followed_users_ids])
+
+        now = timezone.now()
+        Post.objects.bulk_create(
+            [Post(creator_id=followed_user_id, text='Benchmark', created=now) for followed_user_id in
+             followed_users_ids])
+
+        world_circle_id = Circle.get_world_circle_id()
+        posts_ids = Post.objects.filter(creator_id__in=followed_users_ids).values_list('id', flat=True)
+        CirclePost = Circle.posts.through
+        CirclePost.objects.bulk_create(
+            [CirclePost(circle_id=world_circle_id, post_id=post_id) for post_id in posts_ids])
+
+        return user
+
+    def _make_benchmark_user(self):
+        User = get_user_model()
+        return User.create_user(username=self._make_benchmark_username(),
+                                email='%s@openbook.benchmark' % uuid.uuid4().hex,
+                                password=uuid.uuid4().hex, name='Benchmark', is_of_legal_age=True)
+
+    def _make_benchmark_username(self):
+        return 'b_%s' % uuid.uuid4().hex[:20]
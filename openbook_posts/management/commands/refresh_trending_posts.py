@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+import logging
+
+from openbook_common.utils.model_loaders import get_trending_post_model
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the trending posts ranking served by the trending posts endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float,
+                            help='Keep refreshing the ranking every this many seconds instead of once')
+
+    def handle(self, *args, **options):
+        TrendingPost = get_trending_post_model()
+
+        interval = options['interval']
+
+        while True:
+            trending_posts_count = TrendingPost.refresh_trending_posts()
+            logger.info('Ranked %d trending posts' % trending_posts_count)
+
+            if not interval:
+                break
+
+            time.sleep(interval)
+
+        self.stdout.write(self.style.SUCCESS('Ranked %d trending posts' % trending_posts_count))
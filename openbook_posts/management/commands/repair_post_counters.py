@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+import logging
+
+from django.db import transaction
+
+from openbook_common.utils.model_loaders import get_post_model, get_post_emoji_count_model
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the stored comments and emoji counts of posts and fixes the ones that drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Amount of posts to repair at once')
+
+    def handle(self, *args, **options):
+        Post = get_post_model()
+        PostEmojiCount = get_post_emoji_count_model()
+
+        chunk_size = options['chunk_size']
+        posts_ids = Post.objects.order_by('pk').values_list('pk', flat=True)
+
+        repaired_comments_counts = 0
+        repaired_emoji_counts = 0
+        last_post_id = 0
+
+        while True:
+            chunk_posts_ids = list(posts_ids.filter(pk__gt=last_post_id)[:chunk_size])
+            if not chunk_posts_ids:
+                break
+
+            with transaction.atomic():
+                repaired_comments_counts += Post.repair_comments_counts_for_posts_with_ids(chunk_posts_ids)
+                repaired_emoji_counts += PostEmojiCount.repair_counts_for_posts_with_ids(chunk_posts_ids)
+
+            last_post_id = chunk_posts_ids[-1]
+            logger.info('Repaired counters of posts up to id %d' % last_post_id)
+
+        self.stdout.write(self.style.SUCCESS('Repaired %d comments counts and %d emoji counts' % (
+            repaired_comments_counts, repaired_emoji_counts)))
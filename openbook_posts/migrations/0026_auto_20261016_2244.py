@@ -0,0 +1,37 @@
+# Generated by Django 2.2.28 on 2026-10-16 20:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('openbook_posts', '0025_auto_20261016_2239'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='timelineentry',
+            name='timeline_entry_owner_created',
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-created', '-id'], name='post_created_id'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['creator', '-created', '-id'], name='post_creator_created_id'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['community', '-created', '-id'], name='post_community_created_id'),
+        ),
+        migrations.AddIndex(
+            model_name='postcomment',
+            index=models.Index(fields=['post', '-created', '-id'], name='post_comment_post_created_id'),
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['owner', '-created', '-post'], name='timeline_entry_owner_created'),
+        ),
+    ]
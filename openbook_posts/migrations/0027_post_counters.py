@@ -0,0 +1,51 @@
+# Generated by Django 2.2.28 on 2026-10-16 20:52
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def populate_post_counters(apps, schema_editor):
+    Post = apps.get_model('openbook_posts', 'Post')
+    PostComment = apps.get_model('openbook_posts', 'PostComment')
+    PostReaction = apps.get_model('openbook_posts', 'PostReaction')
+    PostEmojiCount = apps.get_model('openbook_posts', 'PostEmojiCount')
+
+    comments_counts = PostComment.objects.values('post_id').annotate(count=Count('id')).values_list('post_id', 'count')
+    for post_id, count in comments_counts.iterator():
+        Post.objects.filter(pk=post_id).update(comments_count=count)
+
+    emoji_counts = PostReaction.objects.values('post_id', 'emoji_id').annotate(count=Count('id')).values_list(
+        'post_id', 'emoji_id', 'count')
+    PostEmojiCount.objects.bulk_create(
+        [PostEmojiCount(post_id=post_id, emoji_id=emoji_id, count=count) for post_id, emoji_id, count in
+         emoji_counts.iterator()], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('openbook_common', '0012_auto_20190202_1320'),
+        ('openbook_posts', '0026_auto_20261016_2244'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='PostEmojiCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('emoji', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='posts_counts', to='openbook_common.Emoji')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='emoji_counts', to='openbook_posts.Post')),
+            ],
+            options={
+                'unique_together': {('post', 'emoji')},
+            },
+        ),
+        migrations.RunPython(populate_post_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 2.2.28 on 2026-10-16 21:02
+
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count
+
+
+def populate_user_counts(apps, schema_editor):
+    User = apps.get_model('openbook_auth', 'User')
+    UserCounts = apps.get_model('openbook_auth', 'UserCounts')
+    Follow = apps.get_model('openbook_follows', 'Follow')
+    Connection = apps.get_model('openbook_connections', 'Connection')
+    Post = apps.get_model('openbook_posts', 'Post')
+
+    counts_queries = (
+        ('followers_count', Follow.objects.all(), 'followed_user_id'),
+        ('following_count', Follow.objects.all(), 'user_id'),
+        ('connections_count', Connection.objects.all(), 'user_id'),
+        ('posts_count', Post.objects.all(), 'creator_id'),
+        ('public_posts_count', Post.objects.filter(circles__id=settings.WORLD_CIRCLE_ID), 'creator_id'),
+    )
+
+    users_counts = {}
+
+    for count_name, queryset, user_field in counts_queries:
+        grouped_counts = queryset.order_by().values(user_field).annotate(count=Count('id')).values_list(user_field,
+                                                                                                       'count')
+        for user_id, count in grouped_counts.iterator():
+            users_counts.setdefault(user_id, {})[count_name] = count
+
+    UserCounts.objects.bulk_create(
+        [UserCounts(user_id=user_id, **users_counts.get(user_id, {})) for user_id in
+         User.objects.filter(counts__isnull=True).values_list('id', flat=True).iterator()], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('openbook_auth', '0030_user_counts'),
+        ('openbook_connections', '0009_auto_20181213_1347'),
+        ('openbook_follows', '0007_remove_follow_list'),
+        ('openbook_posts', '0027_post_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_user_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 2.2.28 on 2026-10-16 23:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('openbook_posts', '0028_populate_user_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingPost',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('scored', models.DateTimeField()),
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='trending_post', to='openbook_posts.Post')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='trendingpost',
+            index=models.Index(fields=['-score'], name='trending_post_score'),
+        ),
+    ]
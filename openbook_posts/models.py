@@ -1,13 +1,14 @@
 # Create your models here.
+import heapq
 import uuid
 from datetime import timedelta
 
 from django.core.files.storage import default_storage
-from django.db import models
-from django.db.models import Q
+from django.db import models, transaction, IntegrityError
+from django.db.models import Q, F
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
-from django.db.models import Count
+from django.db.models import Count, Sum
 
 # Create your views here.
 from pilkit.processors import ResizeToFit
@@ -19,7 +20,8 @@ from openbook_auth.models import User
 
 from openbook_common.models import Emoji
 from openbook_common.utils.model_loaders import get_post_reaction_model, get_emoji_model, \
-    get_circle_model, get_community_model
+    get_circle_model, get_community_model, get_community_membership_model, get_follow_model, get_connection_model, \
+    get_user_counts_model
 from imagekit.models import ProcessedImageField
 
 from openbook_posts.helpers import upload_to_post_image_directory, upload_to_post_video_directory
@@ -35,6 +37,16 @@ class Post(models.Model):
     community = models.ForeignKey('openbook_communities.Community', on_delete=models.CASCADE, related_name='posts',
                                   null=True,
                                   blank=False)
+    # Kept current by PostComment, see repair_post_counters for fixing drift
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        # Serve the (created, id) cursor pagination of the timeline, profiles and communities
+        indexes = [
+            models.Index(fields=['-created', '-id'], name='post_created_id'),
+            models.Index(fields=['creator', '-created', '-id'], name='post_creator_created_id'),
+            models.Index(fields=['community', '-created', '-id'], name='post_community_created_id'),
+        ]
 
     @classmethod
     def post_with_id_has_public_comments(cls, post_id):
@@ -79,14 +91,28 @@ class Post(models.Model):
             post.circles.add(*circles_ids)
         else:
             Community = get_community_model()
-            post.community = Community.objects.get(name=community_name)
+            post.community = Community.get_community_with_name(community_name)
 
         post.save()
 
+        UserCounts = get_user_counts_model()
+        UserCounts.increment_count_for_users_with_ids([creator.pk], 'posts_count')
+
+        if circles_ids:
+            Circle = get_circle_model()
+            if Circle.get_world_circle_id() in circles_ids:
+                UserCounts.increment_count_for_users_with_ids([creator.pk], 'public_posts_count')
+
+        if settings.FEATURE_MATERIALIZED_TIMELINE_ENABLED:
+            TimelineEntry.create_entries_for_post(post=post)
+
         return post
 
     @classmethod
     def get_emoji_counts_for_post_with_id(cls, post_id, emoji_id=None, reactor_id=None):
+        if not reactor_id:
+            return PostEmojiCount.get_emoji_counts_for_post_with_id(post_id, emoji_id=emoji_id)
+
         Emoji = get_emoji_model()
 
         emoji_query = Q(reactions__post_id=post_id, )
@@ -103,18 +129,35 @@ class Post(models.Model):
         return [{'emoji': emoji, 'count': emoji.reactions__count} for emoji in emojis]
 
     @classmethod
-    def get_trending_posts(cls):
-        Community = get_community_model()
+    def repair_comments_counts_for_posts_with_ids(cls, posts_ids):
+        """
+        Recomputes the comments count of the given posts from their comments.
+        :return: the amount of posts whose comments count had drifted
+        """
+        comments_counts = PostComment.objects.filter(post_id__in=posts_ids).values('post_id').annotate(
+            count=Count('id')).values_list('post_id', 'count')
+        actual_counts = dict(comments_counts)
 
-        trending_posts_query = Q(created__gte=timezone.now() - timedelta(
-            hours=12))
+        repaired_count = 0
 
-        trending_posts_sources_query = Q(community__type=Community.COMMUNITY_TYPE_PUBLIC)
+        for post_id, comments_count in cls.objects.filter(pk__in=posts_ids).values_list('id', 'comments_count'):
+            actual_count = actual_counts.get(post_id, 0)
+            if actual_count != comments_count:
+                cls.objects.filter(pk=post_id).update(comments_count=actual_count)
+                repaired_count += 1
 
-        trending_posts_query.add(trending_posts_sources_query, Q.AND)
+        return repaired_count
 
-        return cls.objects.annotate(Count('reactions')).filter(trending_posts_query).order_by(
-            '-reactions__count', '-created')
+    @classmethod
+    def get_trending_posts(cls):
+        """
+        Returns the posts of the latest trending posts ranking, see TrendingPost.refresh_trending_posts
+        """
+        Community = get_community_model()
+
+        return cls.objects.filter(trending_post__isnull=False,
+                                  community__type=Community.COMMUNITY_TYPE_PUBLIC).order_by('-trending_post__score',
+                                                                                            '-created')
 
     @classmethod
     def get_post_comment_notification_target_users(cls, post_id, post_commenter_id):
@@ -131,6 +174,19 @@ class Post(models.Model):
 
         return User.objects.filter(post_notification_target_users_query).distinct()
 
+    @classmethod
+    def get_post_comment_notification_recipients(cls, post_id, post_commenter_id):
+        """
+        Returns the post comment notification target users that have post comment notifications enabled
+        and have not muted the post.
+        :param post_id:
+        :param post_commenter_id:
+        :return:
+        """
+        return cls.get_post_comment_notification_target_users(post_id=post_id,
+                                                              post_commenter_id=post_commenter_id).filter(
+            notifications_settings__post_comment_notifications=True).exclude(post_mutes__post_id=post_id)
+
     def count_comments(self, commenter_id=None):
         return PostComment.count_comments_for_post_with_id(self.pk, commenter_id=commenter_id)
 
@@ -213,6 +269,11 @@ class PostComment(models.Model):
     text = models.CharField(_('text'), max_length=settings.POST_COMMENT_MAX_LENGTH, blank=False, null=False)
     is_edited = models.BooleanField(default=False, null=False, blank=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['post', '-created', '-id'], name='post_comment_post_created_id'),
+        ]
+
     @classmethod
     def create_comment(cls, text, commenter, post):
         return PostComment.objects.create(text=text, commenter=commenter, post=post)
@@ -227,10 +288,28 @@ class PostComment(models.Model):
         return cls.objects.filter(count_query).count()
 
     def save(self, *args, **kwargs):
-        ''' On save, update timestamps '''
-        if not self.id:
+        ''' On save, update timestamps and the post comments count '''
+        is_new = not self.id
+
+        if is_new:
             self.created = timezone.now()
-        return super(PostComment, self).save(*args, **kwargs)
+
+        post_comment = super(PostComment, self).save(*args, **kwargs)
+
+        if is_new:
+            Post.objects.filter(pk=self.post_id).update(comments_count=F('comments_count') + 1)
+
+        return post_comment
+
+    def delete(self, *args, **kwargs):
+        ''' On delete, update the post comments count '''
+        post_id = self.post_id
+
+        deleted = super(PostComment, self).delete(*args, **kwargs)
+
+        Post.objects.filter(pk=post_id, comments_count__gt=0).update(comments_count=F('comments_count') - 1)
+
+        return deleted
 
 
 class PostReaction(models.Model):
@@ -256,10 +335,106 @@ class PostReaction(models.Model):
         return cls.objects.filter(count_query).count()
 
     def save(self, *args, **kwargs):
-        ''' On save, update timestamps '''
+        ''' On save, update timestamps and the post emoji counts '''
+        previous_emoji_id = None
+
         if not self.id:
             self.created = timezone.now()
-        return super(PostReaction, self).save(*args, **kwargs)
+        else:
+            previous_emoji_id = PostReaction.objects.filter(pk=self.pk).values_list('emoji_id', flat=True).first()
+
+        post_reaction = super(PostReaction, self).save(*args, **kwargs)
+
+        if previous_emoji_id != self.emoji_id:
+            if previous_emoji_id:
+                PostEmojiCount.decrement_count_for_post_with_id_and_emoji_with_id(post_id=self.post_id,
+                                                                                   emoji_id=previous_emoji_id)
+            PostEmojiCount.increment_count_for_post_with_id_and_emoji_with_id(post_id=self.post_id,
+                                                                               emoji_id=self.emoji_id)
+
+        return post_reaction
+
+    def delete(self, *args, **kwargs):
+        ''' On delete, update the post emoji counts '''
+        post_id = self.post_id
+        emoji_id = self.emoji_id
+
+        deleted = super(PostReaction, self).delete(*args, **kwargs)
+
+        PostEmojiCount.decrement_count_for_post_with_id_and_emoji_with_id(post_id=post_id, emoji_id=emoji_id)
+
+        return deleted
+
+
+class PostEmojiCount(models.Model):
+    """
+    The amount of reactions with an emoji on a post. Kept current by PostReaction so rendering a post
+    does not need to count its reactions.
+    """
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='emoji_counts')
+    emoji = models.ForeignKey(Emoji, on_delete=models.CASCADE, related_name='posts_counts')
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('post', 'emoji',)
+
+    @classmethod
+    def get_emoji_counts_for_post_with_id(cls, post_id, emoji_id=None):
+        emoji_counts_query = Q(post_id=post_id)
+
+        if emoji_id:
+            emoji_counts_query.add(Q(emoji_id=emoji_id), Q.AND)
+
+        emoji_counts = cls.objects.select_related('emoji').filter(emoji_counts_query).order_by('-count', 'id')
+
+        return [{'emoji': emoji_count.emoji, 'count': emoji_count.count} for emoji_count in emoji_counts]
+
+    @classmethod
+    def increment_count_for_post_with_id_and_emoji_with_id(cls, post_id, emoji_id):
+        if cls.objects.filter(post_id=post_id, emoji_id=emoji_id).update(count=F('count') + 1):
+            return
+
+        try:
+            with transaction.atomic():
+                cls.objects.create(post_id=post_id, emoji_id=emoji_id, count=1)
+        except IntegrityError:
+            # Someone else created it since we tried to update it
+            cls.objects.filter(post_id=post_id, emoji_id=emoji_id).update(count=F('count') + 1)
+
+    @classmethod
+    def decrement_count_for_post_with_id_and_emoji_with_id(cls, post_id, emoji_id):
+        cls.objects.filter(post_id=post_id, emoji_id=emoji_id, count__gt=0).update(count=F('count') - 1)
+        cls.objects.filter(post_id=post_id, emoji_id=emoji_id, count=0).delete()
+
+    @classmethod
+    def repair_counts_for_posts_with_ids(cls, posts_ids):
+        """
+        Recomputes the emoji counts of the given posts from their reactions.
+        :return: the amount of emoji counts that had drifted
+        """
+        reactions_counts = PostReaction.objects.filter(post_id__in=posts_ids).values('post_id', 'emoji_id').annotate(
+            count=Count('id')).values_list('post_id', 'emoji_id', 'count')
+        actual_counts = {(post_id, emoji_id): count for post_id, emoji_id, count in reactions_counts}
+
+        stored_counts = cls.objects.filter(post_id__in=posts_ids).values_list('post_id', 'emoji_id', 'count')
+        stored_counts = {(post_id, emoji_id): count for post_id, emoji_id, count in stored_counts}
+
+        repaired_count = 0
+
+        for (post_id, emoji_id), count in stored_counts.items():
+            actual_count = actual_counts.get((post_id, emoji_id))
+            if actual_count is None:
+                cls.objects.filter(post_id=post_id, emoji_id=emoji_id).delete()
+                repaired_count += 1
+            elif actual_count != count:
+                cls.objects.filter(post_id=post_id, emoji_id=emoji_id).update(count=actual_count)
+                repaired_count += 1
+
+        missing_emoji_counts = [cls(post_id=post_id, emoji_id=emoji_id, count=count) for (post_id, emoji_id), count
+                                in actual_counts.items() if (post_id, emoji_id) not in stored_counts]
+        cls.objects.bulk_create(missing_emoji_counts, ignore_conflicts=True)
+
+        return repaired_count + len(missing_emoji_counts)
 
 
 class PostMute(models.Model):
@@ -272,3 +447,168 @@ class PostMute(models.Model):
     @classmethod
     def create_post_mute(cls, post_id, muter_id):
         return cls.objects.create(post_id=post_id, muter_id=muter_id)
+
+
+class TimelineEntry(models.Model):
+    """
+    A materialized home timeline row. Filled on write so reading a timeline page is a single
+    range scan on (owner, -created) instead of recomputing it from follows, connections and communities.
+    """
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='timeline_entries')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='timeline_entries')
+    # Copy of the post created, so entries can be ordered without joining posts
+    created = models.DateTimeField(editable=False)
+
+    class Meta:
+        unique_together = ('owner', 'post',)
+        indexes = [
+            models.Index(fields=['owner', '-created', '-post'], name='timeline_entry_owner_created'),
+        ]
+
+    @classmethod
+    def create_entries_for_post(cls, post):
+        owners_ids = {post.creator_id}
+
+        if post.community_id:
+            CommunityMembership = get_community_membership_model()
+            owners_ids.update(
+                CommunityMembership.objects.filter(community_id=post.community_id).values_list('user_id', flat=True))
+        else:
+            Follow = get_follow_model()
+            followers_query = Q(followed_user_id=post.creator_id)
+
+            Circle = get_circle_model()
+            world_circle_id = Circle.get_world_circle_id()
+
+            if not post.circles.filter(id=world_circle_id).exists():
+                # Only the followers we have in one of the post circles
+                Connection = get_connection_model()
+                encircled_users_ids = Connection.objects.filter(user_id=post.creator_id,
+                                                                circles__posts__id=post.pk).values('target_user_id')
+                followers_query.add(Q(user_id__in=encircled_users_ids), Q.AND)
+
+            owners_ids.update(Follow.objects.filter(followers_query).values_list('user_id', flat=True))
+
+        cls._create_entries_for_owners_with_ids(post=post, owners_ids=owners_ids)
+
+    @classmethod
+    def refresh_entries_for_owner_with_id_from_creator_with_id(cls, owner_id, creator_id):
+        """
+        Brings the owner entries for the circles posts of creator in line with the current
+        follow and connection circles.
+        """
+        if owner_id == creator_id:
+            return
+
+        Follow = get_follow_model()
+
+        if Follow.objects.filter(user_id=owner_id, followed_user_id=creator_id).exists():
+            owner = User.objects.get(pk=owner_id)
+            visible_posts_ids = owner._make_visible_posts_ids_query_for_users(Q(creator_id=creator_id))
+            visible_posts = Post.objects.filter(id__in=visible_posts_ids).exclude(
+                timeline_entries__owner_id=owner_id).only('id', 'created')
+            cls._create_entries_for_owner_with_id(owner_id=owner_id, posts=visible_posts)
+        else:
+            visible_posts_ids = Post.objects.none().values('id')
+
+        cls.objects.filter(owner_id=owner_id, post__creator_id=creator_id, post__community__isnull=True).exclude(
+            post_id__in=visible_posts_ids).delete()
+
+    @classmethod
+    def create_entries_for_owner_with_id_from_community_with_id(cls, owner_id, community_id):
+        community_posts = Post.objects.filter(community_id=community_id).exclude(
+            timeline_entries__owner_id=owner_id).only('id', 'created')
+        cls._create_entries_for_owner_with_id(owner_id=owner_id, posts=community_posts)
+
+    @classmethod
+    def delete_entries_for_owner_with_id_from_community_with_id(cls, owner_id, community_id):
+        # Own posts stay in the timeline
+        cls.objects.filter(owner_id=owner_id, post__community_id=community_id).exclude(
+            post__creator_id=owner_id).delete()
+
+    @classmethod
+    def delete_entries_for_owners_with_ids_from_community_with_id(cls, owners_ids, community_id):
+        # Own posts stay in the timelines
+        cls.objects.filter(owner_id__in=owners_ids, post__community_id=community_id).exclude(
+            post__creator_id=F('owner_id')).delete()
+
+    @classmethod
+    def rebuild_entries_for_owner(cls, owner):
+        cls.objects.filter(owner_id=owner.pk).delete()
+        timeline_posts = owner._get_timeline_posts_with_no_filters().only('id', 'created')
+        cls._create_entries_for_owner_with_id(owner_id=owner.pk, posts=timeline_posts)
+
+    @classmethod
+    def _create_entries_for_owner_with_id(cls, owner_id, posts):
+        entries = [cls(owner_id=owner_id, post_id=post.pk, created=post.created) for post in posts]
+        cls.objects.bulk_create(entries, ignore_conflicts=True)
+
+    @classmethod
+    def _create_entries_for_owners_with_ids(cls, post, owners_ids):
+        entries = [cls(owner_id=owner_id, post_id=post.pk, created=post.created) for owner_id in owners_ids]
+        cls.objects.bulk_create(entries, ignore_conflicts=True)
+
+
+class TrendingPost(models.Model):
+    """
+    A post of the trending posts ranking, the TRENDING_POSTS_COUNT public community posts of the last
+    TRENDING_POSTS_WINDOW_HOURS with the best time decayed score. Rewritten by the refresh_trending_posts command.
+    """
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, related_name='trending_post')
+    score = models.FloatField()
+    # When the ranking the post is part of was computed
+    scored = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-score'], name='trending_post_score'),
+        ]
+
+    @classmethod
+    def refresh_trending_posts(cls):
+        """
+        Scores every post of the window with reactions or comments and replaces the ranking with the best of them,
+        so the posts aging out of the window leave their place to the next best ones
+        :return: the amount of posts in the new ranking
+        """
+        Community = get_community_model()
+
+        now = timezone.now()
+        window_posts_query = Q(created__gte=now - timedelta(hours=settings.TRENDING_POSTS_WINDOW_HOURS),
+                               community__type=Community.COMMUNITY_TYPE_PUBLIC)
+        candidate_posts = Post.objects.filter(window_posts_query)
+
+        # Read from the counters, no reactions or comments are counted
+        reactions_counts = dict(
+            PostEmojiCount.objects.filter(post__in=candidate_posts).values('post_id').annotate(
+                count=Sum('count')).values_list('post_id', 'count'))
+
+        scored_posts = []
+
+        for post_id, created, comments_count in candidate_posts.values_list('id', 'created', 'comments_count'):
+            reactions_count = reactions_counts.get(post_id, 0)
+            if not reactions_count and not comments_count:
+                continue
+
+            score = _get_trending_score(reactions_count=reactions_count, comments_count=comments_count,
+                                        age=now - created)
+            scored_posts.append((score, post_id))
+
+        trending_posts = [cls(post_id=post_id, score=score, scored=now) for score, post_id in
+                          heapq.nlargest(settings.TRENDING_POSTS_COUNT, scored_posts)]
+
+        # Readers keep seeing the previous ranking until the new one is complete
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(trending_posts)
+
+        return len(trending_posts)
+
+
+def _get_trending_score(reactions_count, comments_count, age):
+    """
+    Weights the interactions with a post down by its age, so newer posts with fewer of them can rank above older ones
+    """
+    interactions = reactions_count + comments_count * settings.TRENDING_POSTS_COMMENT_WEIGHT
+    age_hours = age.total_seconds() / 3600
+    return interactions / (age_hours + 2) ** settings.TRENDING_POSTS_GRAVITY
@@ -1,9 +1,11 @@
 # Create your tests here.
 import json
 import tempfile
+from io import StringIO
 from os import access, F_OK
 
 from PIL import Image
+from django.core.management import call_command
 from django.urls import reverse
 from faker import Faker
 from rest_framework import status
@@ -19,7 +21,7 @@ from openbook_common.tests.helpers import make_authentication_headers_for_user,
     make_community
 from openbook_communities.models import Community
 from openbook_notifications.models import PostCommentNotification, PostReactionNotification, Notification
-from openbook_posts.models import Post, PostComment, PostReaction
+from openbook_posts.models import Post, PostComment, PostReaction, PostEmojiCount
 
 logger = logging.getLogger(__name__)
 fake = Faker()
@@ -115,6 +117,58 @@ class PostItemAPITests(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_filter_visible_post_ids_decides_many_posts_in_one_query(self):
+        """
+        should return only the ids of the visible posts among many posts, with a single query
+        """
+        user = make_user()
+        connected_user = make_user()
+        foreign_user = make_user()
+
+        connected_user_circle = make_circle(creator=connected_user)
+        connected_user.connect_with_user_with_id(user.pk, circles_ids=[connected_user_circle.pk])
+        user.confirm_connection_with_user_with_id(connected_user.pk)
+
+        foreign_user_circle = make_circle(creator=foreign_user)
+
+        public_community = make_community(creator=foreign_user, type=Community.COMMUNITY_TYPE_PUBLIC)
+        private_community = make_community(creator=foreign_user, type=Community.COMMUNITY_TYPE_PRIVATE)
+        joined_private_community = make_community(creator=foreign_user, type=Community.COMMUNITY_TYPE_PRIVATE)
+        foreign_user.invite_user_with_username_to_community_with_name(username=user.username,
+                                                                      community_name=joined_private_community.name)
+        user.join_community_with_name(joined_private_community.name)
+
+        visible_posts = [
+            user.create_encircled_post(text=make_fake_post_text(), circles_ids=[user.connections_circle_id]),
+            foreign_user.create_public_post(text=make_fake_post_text()),
+            connected_user.create_encircled_post(text=make_fake_post_text(), circles_ids=[connected_user_circle.pk]),
+            connected_user.create_encircled_post(text=make_fake_post_text(),
+                                                 circles_ids=[connected_user.connections_circle_id]),
+            foreign_user.create_community_post(text=make_fake_post_text(), community_name=public_community.name),
+            foreign_user.create_community_post(text=make_fake_post_text(),
+                                               community_name=joined_private_community.name),
+        ]
+
+        invisible_posts = [
+            foreign_user.create_encircled_post(text=make_fake_post_text(), circles_ids=[foreign_user_circle.pk]),
+            foreign_user.create_community_post(text=make_fake_post_text(), community_name=private_community.name),
+        ]
+
+        posts_ids = [post.pk for post in visible_posts + invisible_posts]
+
+        with self.assertNumQueries(1):
+            visible_posts_ids = user.filter_visible_post_ids(posts_ids)
+
+        self.assertEqual(visible_posts_ids, {post.pk for post in visible_posts})
+
+        for post in visible_posts:
+            self.assertEqual(self.client.get(self._get_url(post), **make_authentication_headers_for_user(
+                user)).status_code, status.HTTP_200_OK)
+
+        for post in invisible_posts:
+            self.assertEqual(self.client.get(self._get_url(post), **make_authentication_headers_for_user(
+                user)).status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_can_delete_own_post(self):
         """
         should be able to delete own post and return 200
@@ -130,6 +184,32 @@ class PostItemAPITests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(Post.objects.filter(pk=post.pk).count() == 0)
 
+    def test_deleting_own_post_decrements_posts_counts(self):
+        """
+        should decrement the posts counts of the creator when deleting a post
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+        public_post = user.create_public_post(text=make_fake_post_text())
+        circle = make_circle(creator=user)
+        encircled_post = user.create_encircled_post(text=make_fake_post_text(), circles_ids=[circle.pk])
+
+        user.refresh_from_db()
+        self.assertEqual(user.counts.posts_count, 2)
+        self.assertEqual(user.counts.public_posts_count, 1)
+
+        self.client.delete(self._get_url(public_post), **headers)
+
+        user.refresh_from_db()
+        self.assertEqual(user.counts.posts_count, 1)
+        self.assertEqual(user.counts.public_posts_count, 0)
+
+        self.client.delete(self._get_url(encircled_post), **headers)
+
+        user.refresh_from_db()
+        self.assertEqual(user.counts.posts_count, 0)
+        self.assertEqual(user.counts.public_posts_count, 0)
+
     def test_delete_image_post(self):
         """
         should be able to delete image post and file return True
@@ -195,6 +275,38 @@ class PostItemAPITests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(Post.objects.filter(pk=post.pk).count() == 0)
 
+    def test_deleting_post_of_community_as_mod_decrements_posts_count_of_creator(self):
+        """
+        should decrement the posts count of the creator of the post and not the one of the moderator deleting it
+        """
+        user = make_user()
+
+        community_creator = make_user()
+        community = make_community(creator=community_creator)
+
+        user.join_community_with_name(community_name=community.name)
+        community_creator.add_moderator_with_username_to_community_with_name(username=user.username,
+                                                                             community_name=community.name)
+        user.create_public_post(text=make_fake_post_text())
+
+        community_post_creator = make_user()
+        community_post_creator.join_community_with_name(community_name=community.name)
+
+        post = community_post_creator.create_community_post(text=make_fake_post_text(),
+                                                            community_name=community.name)
+
+        url = self._get_url(post)
+
+        headers = make_authentication_headers_for_user(user)
+        response = self.client.delete(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        user.refresh_from_db()
+        community_post_creator.refresh_from_db()
+        self.assertEqual(user.counts.posts_count, 1)
+        self.assertEqual(community_post_creator.counts.posts_count, 0)
+
     def test_can_delete_post_of_community_if_admin(self):
         """
         should be able to delete a community post if administrator and return 200
@@ -737,6 +849,41 @@ class PostCommentsAPITests(APITestCase):
         self.assertFalse(PostCommentNotification.objects.filter(post_comment__text=post_comment_text,
                                                                 notification__owner=foreign_user).exists())
 
+    def test_commenting_in_commented_post_creates_a_notification_per_enabled_foreign_user(self):
+        """
+         should create one notification for each foreign commenter with post comment notifications enabled
+         """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        post_creator = make_user()
+
+        post = post_creator.create_public_post(text=make_fake_post_text())
+
+        foreign_users = [make_user() for i in range(0, 3)]
+
+        for foreign_user in foreign_users:
+            foreign_user.comment_post_with_id(post_id=post.pk, text=make_fake_post_comment_text())
+
+        disabled_foreign_user = make_user()
+        disabled_foreign_user.comment_post_with_id(post_id=post.pk, text=make_fake_post_comment_text())
+        disabled_foreign_user.update_notifications_settings(post_comment_notifications=False)
+
+        post_comment_text = make_fake_post_comment_text()
+
+        data = self._get_create_post_comment_request_data(post_comment_text)
+
+        url = self._get_url(post)
+        self.client.put(url, data, **headers)
+
+        notifications_owners_ids = Notification.objects.filter(
+            notification_type=Notification.POST_COMMENT,
+            object_id__in=PostCommentNotification.objects.filter(post_comment__text=post_comment_text).values(
+                'id')).values_list('owner_id', flat=True)
+
+        self.assertEqual(sorted(notifications_owners_ids),
+                         sorted([post_creator.pk] + [foreign_user.pk for foreign_user in foreign_users]))
+
     def test_should_retrieve_all_comments_on_public_post(self):
         """
         should retrieve all comments on public post
@@ -847,6 +994,39 @@ class PostCommentsAPITests(APITestCase):
         for returned_id in response_ids:
             self.assertTrue(returned_id >= min_id)
 
+    def test_should_retrieve_comments_before_max_cursor_and_after_min_cursor(self):
+        """
+        should retrieve the comments older than the max cursor and newer than the min cursor of a comment
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+        post = user.create_public_post(text=make_fake_post_text())
+
+        amount_of_post_comments = 10
+        post_comments_ids = []
+
+        for i in range(amount_of_post_comments):
+            post_comment_text = make_fake_post_comment_text()
+            post_comments_ids.append(user.comment_post_with_id(post_id=post.pk, text=post_comment_text).pk)
+
+        url = self._get_url(post)
+        response = self.client.get(url, {'count_max': 4}, **headers)
+        cursor = json.loads(response.content)[-1]['cursor']
+
+        response = self.client.get(url, {
+            'max_cursor': cursor,
+            'min_cursor': cursor,
+            'count_max': 20,
+            'count_min': 20,
+        }, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_ids = [comment['id'] for comment in json.loads(response.content)]
+        cursor_comment_id = post_comments_ids[-4]
+
+        self.assertEqual(response_ids, [id for id in reversed(post_comments_ids) if id != cursor_comment_id])
+
     def test_should_retrieve_comments_slice_for_min_id_and_max_id(self):
         """
         should retrieve comments slice for post comments taking into account min_id and max_id
@@ -925,6 +1105,42 @@ class PostCommentsAPITests(APITestCase):
         self.assertTrue(len(comments_after_min_id) == count_min)
         self.assertTrue(len(comments_before_max_id) == count_max)
 
+    def test_commenting_increments_post_comments_count(self):
+        """
+        should increment the stored comments count of the post when commenting it
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+        post = user.create_public_post(text=make_fake_post_text())
+
+        data = self._get_create_post_comment_request_data(make_fake_post_comment_text())
+
+        url = self._get_url(post)
+        self.client.put(url, data, **headers)
+        self.client.put(url, data, **headers)
+
+        self.assertEqual(Post.objects.get(pk=post.pk).comments_count, 2)
+
+    def test_repair_post_counters_fixes_drifted_counts(self):
+        """
+        should recompute the stored comments and emoji counts of posts with the repair_post_counters command
+        """
+        user = make_user()
+        post = user.create_public_post(text=make_fake_post_text())
+        user.comment_post_with_id(post_id=post.pk, text=make_fake_post_comment_text())
+
+        emoji_group = make_reactions_emoji_group()
+        emoji = make_emoji(group=emoji_group)
+        user.react_to_post_with_id(post.pk, emoji_id=emoji.pk, emoji_group_id=emoji_group.pk)
+
+        Post.objects.filter(pk=post.pk).update(comments_count=5)
+        PostEmojiCount.objects.filter(post_id=post.pk).delete()
+
+        call_command('repair_post_counters', stdout=StringIO())
+
+        self.assertEqual(Post.objects.get(pk=post.pk).comments_count, 1)
+        self.assertEqual(PostEmojiCount.objects.get(post_id=post.pk, emoji_id=emoji.pk).count, 1)
+
     def _get_create_post_comment_request_data(self, post_comment_text):
         return {
             'text': post_comment_text
@@ -967,6 +1183,22 @@ class PostCommentItemAPITests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(PostComment.objects.filter(id=post_comment.pk).count() == 0)
 
+    def test_deleting_comment_decrements_post_comments_count(self):
+        """
+        should decrement the stored comments count of the post when deleting one of its comments
+        """
+        user = make_user()
+        post = user.create_public_post(text=make_fake_post_text())
+        post_comment = user.comment_post_with_id(post.pk, text=make_fake_post_comment_text())
+        user.comment_post_with_id(post.pk, text=make_fake_post_comment_text())
+
+        url = self._get_url(post_comment=post_comment, post=post)
+
+        headers = make_authentication_headers_for_user(user)
+        self.client.delete(url, **headers)
+
+        self.assertEqual(Post.objects.get(pk=post.pk).comments_count, 1)
+
     def test_can_delete_community_post_comment_if_mod(self):
         """
          should be able to delete a community post comment if is moderator and return 200
@@ -1713,6 +1945,131 @@ class PostReactionsAPITests(APITestCase):
         self.assertTrue(PostReactionNotification.objects.filter(post_reaction__emoji__id=post_reaction_emoji_id,
                                                                 notification__owner=user).exists())
 
+    def test_reacting_in_foreign_post_aggregates_notification(self):
+        """
+         should add the reactions to a foreign post to a single notification with the count and latest reactors
+         """
+        user = make_user()
+        post = user.create_public_post(text=make_fake_post_text())
+
+        emoji_group = make_reactions_emoji_group()
+
+        post_reaction_emoji_id = make_emoji(group=emoji_group).pk
+
+        reactors = [make_user() for i in range(0, 4)]
+
+        for reactor in reactors:
+            reactor.react_to_post_with_id(post.pk, emoji_id=post_reaction_emoji_id, emoji_group_id=emoji_group.pk)
+
+        post_reaction_notification = PostReactionNotification.objects.get(notification__owner=user)
+
+        self.assertEqual(post_reaction_notification.reactions_count, 4)
+        self.assertEqual(post_reaction_notification.post_reaction.reactor, reactors[-1])
+        self.assertEqual(post_reaction_notification.get_last_reactors_ids(),
+                         [reactor.pk for reactor in reversed(reactors)][:3])
+        self.assertEqual(Notification.objects.filter(owner=user).count(), 1)
+
+    def test_deleting_latest_reaction_keeps_aggregated_notification(self):
+        """
+         should point the aggregated notification to the previous reaction when the latest one is deleted
+         """
+        user = make_user()
+        post = user.create_public_post(text=make_fake_post_text())
+
+        emoji_group = make_reactions_emoji_group()
+
+        post_reaction_emoji_id = make_emoji(group=emoji_group).pk
+
+        first_post_reaction = make_user().react_to_post_with_id(post.pk, emoji_id=post_reaction_emoji_id,
+                                                                emoji_group_id=emoji_group.pk)
+        latest_reactor = make_user()
+        latest_post_reaction = latest_reactor.react_to_post_with_id(post.pk, emoji_id=post_reaction_emoji_id,
+                                                                    emoji_group_id=emoji_group.pk)
+
+        latest_reactor.delete_reaction_with_id_for_post_with_id(latest_post_reaction.pk, post.pk)
+
+        post_reaction_notification = PostReactionNotification.objects.get(notification__owner=user)
+
+        self.assertEqual(post_reaction_notification.reactions_count, 1)
+        self.assertEqual(post_reaction_notification.post_reaction, first_post_reaction)
+        self.assertEqual(post_reaction_notification.get_last_reactors_ids(), [first_post_reaction.reactor_id])
+
+    def test_deleting_latest_reaction_directly_keeps_aggregated_notification(self):
+        """
+         should point the aggregated notification to the previous reaction when the latest one is deleted
+         without going through delete_reaction_with_id_for_post_with_id
+         """
+        user = make_user()
+        post = user.create_public_post(text=make_fake_post_text())
+
+        emoji_group = make_reactions_emoji_group()
+
+        post_reaction_emoji_id = make_emoji(group=emoji_group).pk
+
+        first_post_reaction = make_user().react_to_post_with_id(post.pk, emoji_id=post_reaction_emoji_id,
+                                                                emoji_group_id=emoji_group.pk)
+        latest_reactor = make_user()
+        latest_reactor.react_to_post_with_id(post.pk, emoji_id=post_reaction_emoji_id,
+                                             emoji_group_id=emoji_group.pk)
+
+        latest_reactor.delete()
+
+        post_reaction_notification = PostReactionNotification.objects.get(notification__owner=user)
+
+        self.assertEqual(post_reaction_notification.reactions_count, 1)
+        self.assertEqual(post_reaction_notification.post_reaction, first_post_reaction)
+
+    def test_deleting_several_reactions_at_once_removes_them_all_from_aggregated_notification(self):
+        """
+         should subtract every reaction a cascade deletes from the aggregated notification and point it to the
+         latest one left
+         """
+        user = make_user()
+        post = user.create_public_post(text=make_fake_post_text())
+
+        emoji_group = make_reactions_emoji_group()
+
+        kept_emoji_id = make_emoji(group=emoji_group).pk
+        deleted_emoji = make_emoji(group=emoji_group)
+
+        kept_post_reaction = make_user().react_to_post_with_id(post.pk, emoji_id=kept_emoji_id,
+                                                               emoji_group_id=emoji_group.pk)
+
+        for i in range(0, 2):
+            make_user().react_to_post_with_id(post.pk, emoji_id=deleted_emoji.pk, emoji_group_id=emoji_group.pk)
+
+        deleted_emoji.delete()
+
+        post_reaction_notification = PostReactionNotification.objects.get(notification__owner=user)
+
+        self.assertEqual(post_reaction_notification.reactions_count, 1)
+        self.assertEqual(post_reaction_notification.post_reaction, kept_post_reaction)
+
+    def test_deleting_latest_reaction_directly_does_not_point_notification_to_own_reaction(self):
+        """
+         should not point the aggregated notification to a reaction of its owner when the latest one is deleted
+         """
+        user = make_user()
+        post = user.create_public_post(text=make_fake_post_text())
+
+        emoji_group = make_reactions_emoji_group()
+
+        post_reaction_emoji_id = make_emoji(group=emoji_group).pk
+
+        first_post_reaction = make_user().react_to_post_with_id(post.pk, emoji_id=post_reaction_emoji_id,
+                                                                emoji_group_id=emoji_group.pk)
+        latest_reactor = make_user()
+        latest_reactor.react_to_post_with_id(post.pk, emoji_id=post_reaction_emoji_id,
+                                             emoji_group_id=emoji_group.pk)
+        user.react_to_post_with_id(post.pk, emoji_id=post_reaction_emoji_id, emoji_group_id=emoji_group.pk)
+
+        latest_reactor.delete()
+
+        post_reaction_notification = PostReactionNotification.objects.get(notification__owner=user)
+
+        self.assertEqual(post_reaction_notification.reactions_count, 1)
+        self.assertEqual(post_reaction_notification.post_reaction, first_post_reaction)
+
     def test_reacting_in_own_post_does_not_create_notification(self):
         """
          should not create a notification when reacting on an own post
@@ -1734,6 +2091,30 @@ class PostReactionsAPITests(APITestCase):
         self.assertFalse(PostReactionNotification.objects.filter(post_reaction__emoji__id=post_reaction_emoji_id,
                                                                  notification__owner=user).exists())
 
+    def test_reacting_updates_post_emoji_counts(self):
+        """
+        should keep the stored emoji counts of the post current when reacting and changing the reaction emoji
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+        post = user.create_public_post(text=make_fake_post_text())
+
+        other_user = make_user()
+        emoji_group = make_reactions_emoji_group()
+        emoji = make_emoji(group=emoji_group)
+        other_emoji = make_emoji(group=emoji_group)
+        other_user.react_to_post_with_id(post.pk, emoji_id=emoji.pk, emoji_group_id=emoji_group.pk)
+
+        url = self._get_url(post)
+        self.client.put(url, self._get_create_post_reaction_request_data(emoji.pk, emoji_group.pk), **headers)
+
+        self.assertEqual(PostEmojiCount.objects.get(post_id=post.pk, emoji_id=emoji.pk).count, 2)
+
+        self.client.put(url, self._get_create_post_reaction_request_data(other_emoji.pk, emoji_group.pk), **headers)
+
+        self.assertEqual(PostEmojiCount.objects.get(post_id=post.pk, emoji_id=emoji.pk).count, 1)
+        self.assertEqual(PostEmojiCount.objects.get(post_id=post.pk, emoji_id=other_emoji.pk).count, 1)
+
     def _get_create_post_reaction_request_data(self, emoji_id, emoji_group_id):
         return {
             'emoji_id': emoji_id,
@@ -1780,6 +2161,24 @@ class PostReactionItemAPITests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(PostReaction.objects.filter(id=post_reaction.pk).count() == 0)
 
+    def test_deleting_last_reaction_with_emoji_removes_post_emoji_count(self):
+        """
+        should remove the stored emoji count of the post when deleting the last reaction with that emoji
+        """
+        user = make_user()
+        post = user.create_public_post(text=make_fake_post_text())
+
+        emoji_group = make_reactions_emoji_group()
+        emoji = make_emoji(group=emoji_group)
+        post_reaction = user.react_to_post_with_id(post.pk, emoji_id=emoji.pk, emoji_group_id=emoji_group.pk)
+
+        url = self._get_url(post_reaction=post_reaction, post=post)
+
+        headers = make_authentication_headers_for_user(user)
+        self.client.delete(url, **headers)
+
+        self.assertFalse(PostEmojiCount.objects.filter(post_id=post.pk).exists())
+
     def test_can_delete_own_reaction_in_foreign_public_post(self):
         """
           should be able to delete own reaction in foreign public post and return 200
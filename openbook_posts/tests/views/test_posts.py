@@ -1,12 +1,21 @@
 # Create your tests here.
 import tempfile
+from datetime import timedelta
+from io import StringIO
 
 from PIL import Image
+from django.core.management import call_command
+from django.conf import settings
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from faker import Faker
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.request import Request
+from rest_framework.test import APITestCase, APIRequestFactory
 from mixer.backend.django import mixer
 
 from openbook.settings import POST_MAX_LENGTH
@@ -18,8 +27,11 @@ import json
 
 from openbook_circles.models import Circle
 from openbook_common.tests.helpers import make_user, make_users, make_fake_post_text, \
-    make_authentication_headers_for_user, make_circle, make_community
+    make_authentication_headers_for_user, make_circle, make_community, make_fake_post_comment_text, make_emoji, \
+    make_reactions_emoji_group
 from openbook_lists.models import List
+from openbook_posts.models import TimelineEntry, Post
+from openbook_posts.views.posts.serializers import AuthenticatedUserPostSerializer
 
 logger = logging.getLogger(__name__)
 fake = Faker()
@@ -591,6 +603,55 @@ class PostsAPITests(APITestCase):
             self.assertIn(response_post_id, all_posts_ids)
             self.assertTrue(response_post_id < max_id)
 
+    def test_get_all_posts_with_max_cursor_and_count(self):
+        """
+        should be able to page through all posts with the max cursor of the last retrieved post
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        amount_of_posts = 7
+        posts_ids = []
+
+        for i in range(amount_of_posts):
+            user_to_follow = make_user()
+            user.follow_user_with_id(user_to_follow.pk)
+            post = user_to_follow.create_public_post(text=make_fake_post_text())
+            posts_ids.append(post.pk)
+
+        # Posts created at the same time are told apart by their id
+        created = timezone.now()
+        Post.objects.filter(id__in=posts_ids).update(created=created)
+        TimelineEntry.objects.filter(post_id__in=posts_ids).update(created=created)
+
+        url = self._get_url()
+        count = 3
+        retrieved_posts_ids = []
+        request_data = {'count': count}
+
+        for page in range(3):
+            response = self.client.get(url, request_data, **headers)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            response_posts = json.loads(response.content)
+            retrieved_posts_ids.extend([response_post['id'] for response_post in response_posts])
+            request_data['max_cursor'] = response_posts[-1]['cursor']
+
+        self.assertEqual(retrieved_posts_ids, sorted(posts_ids, reverse=True))
+
+    def test_cannot_get_posts_with_invalid_max_cursor(self):
+        """
+        should not be able to retrieve posts with an invalid max cursor and return 400
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        url = self._get_url()
+        response = self.client.get(url, {'max_cursor': 'notacursor'}, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_get_all_public_posts_for_unconnected_user(self):
         """
         should be able to retrieve all the public posts of an unconnected user
@@ -886,5 +947,349 @@ class PostsAPITests(APITestCase):
         for post_id in posts_ids:
             self.assertIn(post_id, response_posts_ids)
 
+    def test_retrieves_encircled_posts_of_followed_users_only_if_in_circle(self):
+        """
+        should retrieve the encircled posts of followed users only if we are part of the circle
+        """
+        user = make_user()
+
+        headers = make_authentication_headers_for_user(user)
+
+        user_to_connect_with = make_user()
+        user.connect_with_user_with_id(user_to_connect_with.pk)
+        user_to_connect_with.confirm_connection_with_user_with_id(user.pk)
+
+        circle_we_are_in = make_circle(creator=user_to_connect_with)
+        user_to_connect_with.update_connection_with_user_with_id(user.pk, circles_ids=[circle_we_are_in.pk])
+
+        circle_we_are_not_in = make_circle(creator=user_to_connect_with)
+
+        visible_post = user_to_connect_with.create_encircled_post(text=make_fake_post_text(),
+                                                                  circles_ids=[circle_we_are_in.pk])
+        user_to_connect_with.create_encircled_post(text=make_fake_post_text(),
+                                                   circles_ids=[circle_we_are_not_in.pk])
+
+        url = self._get_url()
+
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_posts = json.loads(response.content)
+
+        self.assertEqual(len(response_posts), 1)
+        self.assertEqual(response_posts[0]['id'], visible_post.pk)
+
+    def test_retrieves_no_posts_when_filtering_on_empty_list(self):
+        """
+        should retrieve no posts when filtering on a list without followed users
+        """
+        user = make_user()
+
+        list = mixer.blend(List, creator=user)
+
+        headers = make_authentication_headers_for_user(user)
+
+        amount_of_foreign_public_posts = 5
+
+        for i in range(amount_of_foreign_public_posts):
+            foreign_user = make_user()
+            foreign_user.create_public_post(text=make_fake_post_text())
+
+        url = self._get_url()
+
+        response = self.client.get(url, {'list_id': list.pk}, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_posts = json.loads(response.content)
+
+        self.assertEqual(len(response_posts), 0)
+
+    def test_get_posts_queries_count_does_not_grow_with_count(self):
+        """
+        should retrieve a page of posts with the same amount of queries no matter how many posts it has
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        emoji_group = make_reactions_emoji_group()
+        emoji = make_emoji(group=emoji_group)
+        circle = make_circle(creator=user)
+        community_creator = make_user()
+        community = make_community(creator=community_creator)
+        user.join_community_with_name(community_name=community.name)
+
+        for i in range(4):
+            followed_user = make_user()
+            user.follow_user_with_id(followed_user.pk)
+            followed_user_post = followed_user.create_public_post(text=make_fake_post_text())
+            user.react_to_post_with_id(followed_user_post.pk, emoji_id=emoji.pk, emoji_group_id=emoji_group.pk)
+            followed_user.comment_post_with_id(post_id=followed_user_post.pk, text=make_fake_post_comment_text())
+
+            community_post = community_creator.create_community_post(community_name=community.name,
+                                                                     text=make_fake_post_text())
+            user.mute_post_with_id(post_id=community_post.pk)
+
+            user.create_encircled_post(text=make_fake_post_text(), circles_ids=[circle.pk])
+
+        url = self._get_url()
+
+        with CaptureQueriesContext(connection) as small_page_queries:
+            response = self.client.get(url, {'count': 3}, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(json.loads(response.content)), 3)
+
+        with CaptureQueriesContext(connection) as big_page_queries:
+            response = self.client.get(url, {'count': 12}, **headers)
+
+        response_posts = json.loads(response.content)
+
+        self.assertEqual(len(response_posts), 12)
+        self.assertEqual(len(big_page_queries), len(small_page_queries))
+
+        # The prefetched values must be the same ones the fields query post by post
+        request = Request(APIRequestFactory().get(url))
+        request.user = user
+        for response_post in response_posts:
+            post = Post.objects.get(pk=response_post['id'])
+            post_data = AuthenticatedUserPostSerializer(post, context={'request': request}).data
+            self.assertEqual(response_post, json.loads(json.dumps(post_data)))
+
     def _get_url(self):
         return reverse('posts')
+
+
+@override_settings(FEATURE_MATERIALIZED_TIMELINE_ENABLED=True)
+class MaterializedTimelinePostsAPITests(PostsAPITests):
+    """
+    PostsAPI with the timeline served from the materialized timeline entries
+    """
+
+    def test_unfollowing_user_removes_their_posts_from_timeline(self):
+        """
+        should not retrieve the posts of a user after unfollowing them
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        user_to_follow = make_user()
+        user.follow_user_with_id(user_to_follow.pk)
+        user_to_follow.create_public_post(text=make_fake_post_text())
+
+        user.unfollow_user_with_id(user_to_follow.pk)
+
+        url = self._get_url()
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(json.loads(response.content)), 0)
+
+    def test_following_user_adds_their_existing_posts_to_timeline(self):
+        """
+        should retrieve the posts a user created before we followed them
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        user_to_follow = make_user()
+        post = user_to_follow.create_public_post(text=make_fake_post_text())
+
+        user.follow_user_with_id(user_to_follow.pk)
+
+        url = self._get_url()
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_posts = json.loads(response.content)
+
+        self.assertEqual(len(response_posts), 1)
+        self.assertEqual(response_posts[0]['id'], post.pk)
+
+    def test_removing_from_circle_removes_encircled_posts_from_timeline(self):
+        """
+        should not retrieve the encircled posts of a user after they removed us from the circle
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        user_to_connect_with = make_user()
+        user.connect_with_user_with_id(user_to_connect_with.pk)
+        circle = make_circle(creator=user_to_connect_with)
+        user_to_connect_with.confirm_connection_with_user_with_id(user.pk, circles_ids=[circle.pk])
+
+        user_to_connect_with.create_encircled_post(text=make_fake_post_text(), circles_ids=[circle.pk])
+
+        user_to_connect_with.remove_circle_with_id_from_connection_with_user_with_id(user.pk, circle.pk)
+
+        url = self._get_url()
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(json.loads(response.content)), 0)
+
+    def test_leaving_community_removes_its_posts_from_timeline(self):
+        """
+        should not retrieve the posts of a community after leaving it, except our own
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        community_creator = make_user()
+        community = make_community(creator=community_creator, type='P')
+        user.join_community_with_name(community_name=community.name)
+
+        community_creator.create_community_post(text=make_fake_post_text(), community_name=community.name)
+        own_post = user.create_community_post(text=make_fake_post_text(), community_name=community.name)
+
+        user.leave_community_with_name(community_name=community.name)
+
+        url = self._get_url()
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_posts = json.loads(response.content)
+
+        self.assertEqual(len(response_posts), 1)
+        self.assertEqual(response_posts[0]['id'], own_post.pk)
+
+    def test_backfill_timeline_entries_rebuilds_timeline(self):
+        """
+        should rebuild the timeline entries with the backfill_timeline_entries command
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        with self.settings(FEATURE_MATERIALIZED_TIMELINE_ENABLED=False):
+            user_to_follow = make_user()
+            user.follow_user_with_id(user_to_follow.pk)
+            post = user_to_follow.create_public_post(text=make_fake_post_text())
+
+        self.assertFalse(TimelineEntry.objects.filter(owner=user).exists())
+
+        call_command('backfill_timeline_entries', username=user.username, stdout=StringIO())
+
+        url = self._get_url()
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_posts = json.loads(response.content)
+
+        self.assertEqual(len(response_posts), 1)
+        self.assertEqual(response_posts[0]['id'], post.pk)
+
+
+class TrendingPostsAPITests(APITestCase):
+    """
+    TrendingPostsAPI
+    """
+
+    def test_retrieves_ranked_trending_posts(self):
+        """
+        should retrieve the reacted to or commented on public community posts of the last ranking, best first
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        community_creator = make_user()
+        community = make_community(creator=community_creator)
+
+        emoji_group = make_reactions_emoji_group()
+        emoji = make_emoji(group=emoji_group)
+
+        ignored_post = community_creator.create_community_post(community_name=community.name,
+                                                               text=make_fake_post_text())
+        older_post = community_creator.create_community_post(community_name=community.name,
+                                                             text=make_fake_post_text(),
+                                                             created=timezone.now() - timedelta(hours=6))
+        newer_post = community_creator.create_community_post(community_name=community.name,
+                                                             text=make_fake_post_text())
+
+        for post in (older_post, newer_post):
+            user.react_to_post_with_id(post.pk, emoji_id=emoji.pk, emoji_group_id=emoji_group.pk)
+
+        call_command('refresh_trending_posts', stdout=StringIO())
+
+        response = self.client.get(self._get_url(), **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_posts_ids = [response_post['id'] for response_post in json.loads(response.content)]
+
+        self.assertEqual(response_posts_ids, [newer_post.pk, older_post.pk])
+        self.assertNotIn(ignored_post.pk, response_posts_ids)
+
+    def test_refresh_adds_newly_active_posts(self):
+        """
+        should add the posts reacted to since the last ranking to the next one
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        community_creator = make_user()
+        community = make_community(creator=community_creator)
+
+        emoji_group = make_reactions_emoji_group()
+        emoji = make_emoji(group=emoji_group)
+
+        trending_post = community_creator.create_community_post(community_name=community.name,
+                                                                text=make_fake_post_text())
+        user.comment_post_with_id(trending_post.pk, text=make_fake_post_comment_text())
+
+        call_command('refresh_trending_posts', stdout=StringIO())
+
+        newly_active_post = community_creator.create_community_post(community_name=community.name,
+                                                                    text=make_fake_post_text())
+        user.react_to_post_with_id(newly_active_post.pk, emoji_id=emoji.pk, emoji_group_id=emoji_group.pk)
+
+        call_command('refresh_trending_posts', stdout=StringIO())
+
+        response = self.client.get(self._get_url(), **headers)
+
+        response_posts_ids = [response_post['id'] for response_post in json.loads(response.content)]
+
+        self.assertEqual(set(response_posts_ids), {trending_post.pk, newly_active_post.pk})
+
+    @override_settings(TRENDING_POSTS_COUNT=1)
+    def test_refresh_replaces_posts_aging_out_of_the_window(self):
+        """
+        should rank the next best post of the window once a ranked one ages out, even without new activity
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        community_creator = make_user()
+        community = make_community(creator=community_creator)
+
+        emoji_group = make_reactions_emoji_group()
+        emoji = make_emoji(group=emoji_group)
+
+        aging_post = community_creator.create_community_post(community_name=community.name,
+                                                             text=make_fake_post_text())
+        user.react_to_post_with_id(aging_post.pk, emoji_id=emoji.pk, emoji_group_id=emoji_group.pk)
+        user.comment_post_with_id(aging_post.pk, text=make_fake_post_comment_text())
+
+        next_best_post = community_creator.create_community_post(community_name=community.name,
+                                                                 text=make_fake_post_text(),
+                                                                 created=timezone.now() - timedelta(hours=6))
+        user.react_to_post_with_id(next_best_post.pk, emoji_id=emoji.pk, emoji_group_id=emoji_group.pk)
+
+        call_command('refresh_trending_posts', stdout=StringIO())
+
+        Post.objects.filter(pk=aging_post.pk).update(
+            created=timezone.now() - timedelta(hours=settings.TRENDING_POSTS_WINDOW_HOURS + 1))
+
+        call_command('refresh_trending_posts', stdout=StringIO())
+
+        response = self.client.get(self._get_url(), **headers)
+
+        response_posts_ids = [response_post['id'] for response_post in json.loads(response.content)]
+
+        self.assertEqual(response_posts_ids, [next_best_post.pk])
+
+    def _get_url(self):
+        return reverse('trending-posts')
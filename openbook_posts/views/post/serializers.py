@@ -7,7 +7,9 @@ from openbook_circles.models import Circle
 from openbook_common.models import Emoji, EmojiGroup
 from openbook_common.serializers_fields.post import PostCreatorField, ReactionsEmojiCountField, ReactionField, \
     CommentsCountField, CirclesField, IsMutedField
+from openbook_common.serializers_fields.cursor import ItemCursorField
 from openbook_common.serializers_fields.post_comment import PostCommenterField
+from openbook_common.serializers_fields.request import CursorField
 from openbook_common.validators import emoji_id_exists, emoji_group_id_exists
 from openbook_communities.models import CommunityMembership, Community
 from openbook_communities.serializers_fields import CommunityMembershipsField
@@ -59,6 +61,7 @@ class PostCommenterCommunityMembershipSerializer(serializers.ModelSerializer):
 class PostCommentSerializer(serializers.ModelSerializer):
     commenter = PostCommenterField(post_commenter_serializer=PostCommentCommenterSerializer,
                                    community_membership_serializer=PostCommenterCommunityMembershipSerializer)
+    cursor = ItemCursorField()
 
     class Meta:
         model = PostComment
@@ -67,7 +70,8 @@ class PostCommentSerializer(serializers.ModelSerializer):
             'text',
             'created',
             'is_edited',
-            'id'
+            'id',
+            'cursor'
         )
 
 
@@ -101,6 +105,12 @@ class GetPostCommentsSerializer(serializers.Serializer):
     min_id = serializers.IntegerField(
         required=False,
     )
+    max_cursor = CursorField(
+        required=False,
+    )
+    min_cursor = CursorField(
+        required=False,
+    )
     count_max = serializers.IntegerField(
         required=False,
         max_value=20
@@ -255,7 +265,8 @@ class PostReactionEmojiGroupSerializer(serializers.ModelSerializer):
     emojis = serializers.SerializerMethodField()
 
     def get_emojis(self, obj):
-        emojis = obj.emojis.all().order_by('order')
+        # Prefetched ordered by order, see EmojiGroup.get_emoji_groups
+        emojis = obj.emojis.all()
 
         request = self.context['request']
         return PostReactionEmojiSerializer(emojis, many=True, context={'request': request}).data
@@ -117,8 +117,8 @@ class UnmutePost(APIView):
 class PostComments(APIView):
     permission_classes = (IsAuthenticated,)
     SORT_CHOICE_TO_QUERY = {
-        'DESC': '-created',
-        'ASC': 'created'
+        'DESC': ('-created', '-id'),
+        'ASC': ('created', 'id')
     }
 
     def get(self, request, post_uuid):
@@ -130,6 +130,8 @@ class PostComments(APIView):
         data = serializer.validated_data
         max_id = data.get('max_id')
         min_id = data.get('min_id')
+        max_cursor = data.get('max_cursor')
+        min_cursor = data.get('min_cursor')
         count_max = data.get('count_max', 10)
         count_min = data.get('count_min', 10)
         sort = data.get('sort', 'DESC')
@@ -140,23 +142,28 @@ class PostComments(APIView):
 
         sort_query = self.SORT_CHOICE_TO_QUERY[sort]
 
-        if not max_id and not min_id:
-            all_comments = user.get_comments_for_post_with_id(post_id).order_by(sort_query)[:count_max].all()
+        if not max_id and not min_id and not max_cursor and not min_cursor:
+            all_comments = user.get_comments_for_post_with_id(post_id).order_by(*sort_query)[:count_max].all()
         else:
             post_comments_max = []
             post_comments_min = []
-            if max_id:
-                post_comments_max = user.get_comments_for_post_with_id(post_id,
-                                                                       max_id=max_id).order_by('-pk')[:count_max]
+            if max_id or max_cursor:
+                # Cursors page over (created, id), ids over the primary key
+                max_order = self.SORT_CHOICE_TO_QUERY['DESC'] if max_cursor else ('-pk',)
+                post_comments_max = user.get_comments_for_post_with_id(post_id, max_id=max_id,
+                                                                       max_cursor=max_cursor).order_by(
+                    *max_order)[:count_max]
                 post_comments_max = sorted(post_comments_max.all(),
-                                           key=operator.attrgetter('created'),
+                                           key=operator.attrgetter('created', 'id'),
                                            reverse=sort_query == self.SORT_CHOICE_TO_QUERY['DESC'])
 
-            if min_id:
-                post_comments_min = user.get_comments_for_post_with_id(post_id,
-                                                                       min_id=min_id).order_by('pk')[:count_min]
+            if min_id or min_cursor:
+                min_order = self.SORT_CHOICE_TO_QUERY['ASC'] if min_cursor else ('pk',)
+                post_comments_min = user.get_comments_for_post_with_id(post_id, min_id=min_id,
+                                                                       min_cursor=min_cursor).order_by(
+                    *min_order)[:count_min]
                 post_comments_min = sorted(post_comments_min.all(),
-                                           key=operator.attrgetter('created'),
+                                           key=operator.attrgetter('created', 'id'),
                                            reverse=sort_query == self.SORT_CHOICE_TO_QUERY['DESC'])
 
             if sort_query == self.SORT_CHOICE_TO_QUERY['ASC']:
@@ -367,7 +374,7 @@ class PostReactionEmojiGroups(APIView):
 
     def get(self, request):
         EmojiGroup = get_emoji_group_model()
-        emoji_groups = EmojiGroup.objects.filter(is_reaction_group=True).all().order_by('order')
+        emoji_groups = EmojiGroup.get_emoji_groups(is_reaction_group=True)
         serializer = PostReactionEmojiGroupSerializer(emoji_groups, many=True, context={'request': request})
 
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -8,8 +8,9 @@ from openbook_circles.models import Circle
 from openbook_circles.validators import circle_id_exists
 from openbook_common.models import Emoji
 from openbook_common.serializers_fields.post import ReactionField, CommentsCountField, ReactionsEmojiCountField, \
-    CirclesField, PostCreatorField, IsMutedField, IsEncircledField
-from openbook_common.serializers_fields.request import RestrictedImageFileSizeField
+    CirclesField, PostCreatorField, IsMutedField, IsEncircledField, PostsListSerializer
+from openbook_common.serializers_fields.cursor import ItemCursorField
+from openbook_common.serializers_fields.request import RestrictedImageFileSizeField, CursorField
 from openbook_communities.models import Community, CommunityMembership
 from openbook_communities.serializers_fields import CommunityMembershipsField
 from openbook_lists.validators import list_id_exists
@@ -28,6 +29,9 @@ class GetPostsSerializer(serializers.Serializer):
     max_id = serializers.IntegerField(
         required=False,
     )
+    max_cursor = CursorField(
+        required=False,
+    )
     count = serializers.IntegerField(
         required=False,
         max_value=20
@@ -186,9 +190,11 @@ class AuthenticatedUserPostSerializer(serializers.ModelSerializer):
     community = PostCommunitySerializer()
     is_muted = IsMutedField()
     is_encircled = IsEncircledField()
+    cursor = ItemCursorField()
 
     class Meta:
         model = Post
+        list_serializer_class = PostsListSerializer
         fields = (
             'id',
             'uuid',
@@ -205,7 +211,8 @@ class AuthenticatedUserPostSerializer(serializers.ModelSerializer):
             'circles',
             'community',
             'is_muted',
-            'is_encircled'
+            'is_encircled',
+            'cursor'
         )
 
 
@@ -216,9 +223,11 @@ class UnauthenticatedUserPostSerializer(serializers.ModelSerializer):
                                community_membership_serializer=CommunityMembershipSerializer)
     reactions_emoji_counts = ReactionsEmojiCountField(emoji_count_serializer=PostEmojiCountSerializer)
     comments_count = CommentsCountField()
+    cursor = ItemCursorField()
 
     class Meta:
         model = Post
+        list_serializer_class = PostsListSerializer
         fields = (
             'id',
             'uuid',
@@ -230,5 +239,6 @@ class UnauthenticatedUserPostSerializer(serializers.ModelSerializer):
             'video',
             'creator',
             'public_comments',
-            'public_reactions'
+            'public_reactions',
+            'cursor'
         )
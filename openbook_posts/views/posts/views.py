@@ -61,6 +61,7 @@ class Posts(APIView):
         circles_ids = data.get('circle_id')
         lists_ids = data.get('list_id')
         max_id = data.get('max_id')
+        max_cursor = data.get('max_cursor')
         count = data.get('count', 10)
         username = data.get('username')
 
@@ -68,23 +69,28 @@ class Posts(APIView):
 
         if username:
             if username == user.username:
-                posts = user.get_posts(max_id=max_id)
+                posts = user.get_posts(max_id=max_id, max_cursor=max_cursor)
             elif not user.is_connected_with_user_with_username(username):
                 User = get_user_model()
                 posts = User.get_public_posts_for_user_with_username(
                     max_id=max_id,
+                    max_cursor=max_cursor,
                     username=username
                 )
             else:
-                posts = user.get_posts_for_user_with_username(username, max_id=max_id)
+                posts = user.get_posts_for_user_with_username(username, max_id=max_id, max_cursor=max_cursor)
+
+            posts = posts.order_by('-created', '-id')
         else:
+            # Timeline posts come already ordered
             posts = user.get_timeline_posts(
                 circles_ids=circles_ids,
                 lists_ids=lists_ids,
-                max_id=max_id
+                max_id=max_id,
+                max_cursor=max_cursor
             )
 
-        posts = posts.order_by('-created')[:count]
+        posts = posts[:count]
 
         post_serializer_data = AuthenticatedUserPostSerializer(posts, many=True, context={"request": request}).data
 
@@ -98,6 +104,7 @@ class Posts(APIView):
         data = serializer.validated_data
 
         max_id = data.get('max_id')
+        max_cursor = data.get('max_cursor')
         count = data.get('count', 10)
         username = data.get('username')
 
@@ -105,8 +112,9 @@ class Posts(APIView):
 
         posts = User.get_public_posts_for_user_with_username(
             max_id=max_id,
+            max_cursor=max_cursor,
             username=username
-        ).order_by('-created')[:count]
+        ).order_by('-created', '-id')[:count]
 
         post_serializer = UnauthenticatedUserPostSerializer(posts, many=True, context={"request": request})
 